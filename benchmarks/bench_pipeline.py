@@ -0,0 +1,174 @@
+"""Times every stage of the merge pipeline on synthetic notebooks and records peak memory.
+
+Each stage (read, validate, merge, write, streamed write and an end-to-end CLI run) is timed separately for every
+notebook size. Timings are the best of several runs; peak memory is measured with ``tracemalloc`` in a separate,
+untimed run, and for the CLI as the peak resident set size of each CLI process on its own. Results are written as
+JSON so that runs on different commits can be compared.
+
+Run from the repository root, for example::
+
+    python -m benchmarks.bench_pipeline --cells 100 --cells 1000 --image-kb 64 --output results.json
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import click
+import nbformat
+
+from benchmarks.synthetic import write_templates
+from mltc import jsonio
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.validator import NotebookValidator
+from mltc.writer import NotebookWriter
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _measure(func: Callable[[], object], repeat: int) -> dict:
+    """Times a function and measures its peak traced memory.
+
+    Returns:
+        dict: The best and mean wall time in seconds and the peak memory allocated by Python in bytes.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "mean_seconds": sum(timings) / len(timings), "peak_bytes": peak}
+
+
+def _measure_cli(templates_dir: Path, output_path: Path, template_count: int, repeat: int) -> dict:
+    """Times end-to-end runs of the CLI in a fresh interpreter, selecting every template.
+
+    Every run is measured on its own by ``child_usage.py``, so the peak memory is that of the CLI process alone.
+
+    Returns:
+        dict: The best and mean wall time in seconds and the largest peak resident set size of the CLI processes
+              in bytes.
+    """
+    launcher = [sys.executable, str(Path(__file__).with_name("child_usage.py"))]
+    command = [sys.executable, "-m", "mltc.main", "--templates-dir", str(templates_dir)]
+    command += ["--output-path", str(output_path), "--force"]
+    selection = " ".join(str(index) for index in range(1, template_count + 1)) + "\n"
+    env = {**os.environ, "PYTHONPATH": str(REPOSITORY_ROOT), "MLTC_CACHE_DIR": str(templates_dir.parent / "cache")}
+
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(  # noqa: S603
+            [*launcher, *command], input=selection, capture_output=True, text=True, env=env, check=True
+        )
+        runs.append(json.loads(result.stdout))
+    timings = [run["seconds"] for run in runs]
+    peak = max(run["peak_rss_bytes"] for run in runs)
+    return {"seconds": min(timings), "mean_seconds": sum(timings) / len(timings), "peak_rss_bytes": peak}
+
+
+def _git_commit() -> str | None:
+    """Returns the commit the benchmark runs on, or None outside a git checkout."""
+    try:
+        result = subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            cwd=REPOSITORY_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _bench_size(  # noqa: PLR0913
+    work_dir: Path, cell_count: int, template_count: int, source_lines: int, image_size: int, repeat: int
+) -> dict:
+    """Runs every stage for one notebook size and returns the measurements keyed by stage."""
+    templates_dir = work_dir / f"templates-{cell_count}"
+    paths = [str(path) for path in write_templates(templates_dir, template_count, cell_count, source_lines, image_size)]
+    notebooks = [result.notebook for result in NotebookReader.read_notebooks(paths)]
+    validator = NotebookValidator()
+    merged = NotebookMerger(validator=validator).merge_notebooks(notebooks)
+    output_path = work_dir / f"merged-{cell_count}.ipynb"
+
+    return {
+        "read": _measure(lambda: NotebookReader.read_notebooks(paths), repeat),
+        "validate": _measure(lambda: [validator.is_valid(notebook) for notebook in notebooks], repeat),
+        "merge": _measure(lambda: NotebookMerger(validator=validator).merge_notebooks(notebooks), repeat),
+        "write": _measure(lambda: NotebookWriter.write_notebook(merged, str(output_path)), repeat),
+        "write_stream": _measure(lambda: NotebookWriter.write_notebook(merged, str(output_path), stream=True), repeat),
+        "cli": _measure_cli(templates_dir, output_path, template_count, repeat),
+    }
+
+
+@click.command()
+@click.option("--cells", "cell_counts", multiple=True, type=int, default=(100, 1000), show_default=True)
+@click.option("--templates", "template_count", default=5, type=click.IntRange(min=1), show_default=True)
+@click.option("--source-lines", default=5, type=click.IntRange(min=1), show_default=True)
+@click.option("--image-kb", default=32, type=click.IntRange(min=0), show_default=True, help="Image size per code cell.")
+@click.option("--repeat", default=3, type=click.IntRange(min=1), show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False, writable=True), help="Write the results as JSON to a file.")
+def main(  # noqa: PLR0913
+    cell_counts: tuple[int, ...],
+    template_count: int,
+    source_lines: int,
+    image_kb: int,
+    repeat: int,
+    output: str | None,
+) -> None:
+    """Times the read, validate, merge, write and CLI stages on synthetic templates.
+
+    Every size in --cells is the number of cells per template; each run merges all the templates.
+    """
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(tz=UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "nbformat": nbformat.__version__,
+        "orjson": jsonio.orjson is not None,
+        "parameters": {
+            "templates": template_count,
+            "source_lines": source_lines,
+            "image_bytes": image_kb * 1024,
+            "repeat": repeat,
+        },
+        "results": [],
+    }
+
+    click.echo(f"{'cells':>8} {'stage':<14} {'best (s)':>10} {'mean (s)':>10} {'peak (MiB)':>11}")
+    with tempfile.TemporaryDirectory(prefix="mltc-bench-") as work_dir:
+        for cell_count in cell_counts:
+            stages = _bench_size(Path(work_dir), cell_count, template_count, source_lines, image_kb * 1024, repeat)
+            for stage, measurement in stages.items():
+                report["results"].append({"cells": cell_count, "stage": stage, **measurement})
+                peak = measurement.get("peak_bytes", measurement.get("peak_rss_bytes")) / 2**20
+                click.echo(
+                    f"{cell_count:>8} {stage:<14} {measurement['seconds']:>10.4f} "
+                    f"{measurement['mean_seconds']:>10.4f} {peak:>11.1f}"
+                )
+
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2) + "\n")
+        click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
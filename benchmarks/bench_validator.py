@@ -0,0 +1,45 @@
+"""Compares the nbformat validation path with the compiled schema engine.
+
+Run from the repository root with ``python -m benchmarks.bench_validator``.
+"""
+
+import time
+from collections.abc import Callable
+
+import click
+import nbformat
+
+from benchmarks.synthetic import make_notebook
+from mltc.engine import CompiledSchemaEngine
+from mltc.validator import NotebookValidator
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    """Returns the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@click.command()
+@click.option("--cells", "cell_counts", multiple=True, type=int, default=(1000, 5000, 20000), show_default=True)
+@click.option("--repeat", default=3, type=click.IntRange(min=1), show_default=True)
+def main(cell_counts: tuple[int, ...], repeat: int) -> None:
+    """Times NotebookValidator with nbformat.validate and with the compiled schema engine."""
+    nbformat_validator = NotebookValidator()
+    compiled_validator = NotebookValidator(engine=CompiledSchemaEngine())
+    compiled_validator.is_valid(nbformat.v4.new_notebook())  # compile the schema outside the timed runs
+
+    click.echo(f"{'cells':>8} {'nbformat (s)':>14} {'compiled (s)':>14} {'speed-up':>10}")
+    for cell_count in cell_counts:
+        notebook = make_notebook(cell_count, image_size=4096)
+        baseline = _best_time(lambda notebook=notebook: nbformat_validator.is_valid(notebook), repeat)
+        compiled = _best_time(lambda notebook=notebook: compiled_validator.is_valid(notebook), repeat)
+        click.echo(f"{cell_count:>8} {baseline:>14.4f} {compiled:>14.4f} {baseline / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Runs a command and reports its wall time and peak resident set size as JSON on standard output.
+
+The pipeline benchmark runs the CLI through this script in a fresh interpreter, because on Linux the ``ru_maxrss``
+of a child starts from the peak RSS of the process that spawned it, which for the benchmark itself is far larger
+than the CLI's. The command inherits standard input and standard error; its standard output is discarded.
+
+Run it by path, so that it imports nothing but the standard library::
+
+    python benchmarks/child_usage.py COMMAND [ARG ...]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def run(command: list[str]) -> tuple[int, float, int]:
+    """Runs a command to completion and measures that process alone.
+
+    The child is reaped with ``os.wait4``, whose resource usage covers only that child, whereas
+    ``getrusage(RUSAGE_CHILDREN)`` reports the largest of every child waited for so far.
+
+    Args:
+        command (list[str]): The command and its arguments.
+
+    Returns:
+        tuple[int, float, int]: The exit code, the wall time in seconds and the peak resident set size in bytes.
+    """
+    start = time.perf_counter()
+    with subprocess.Popen(command, stdout=subprocess.DEVNULL) as process:  # noqa: S603
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return process.returncode, seconds, peak
+
+
+if __name__ == "__main__":
+    returncode, seconds, peak = run(sys.argv[1:])
+    json.dump({"seconds": seconds, "peak_rss_bytes": peak}, sys.stdout)
+    sys.exit(returncode)
@@ -0,0 +1,78 @@
+"""Generates synthetic notebooks for the benchmarks.
+
+The notebooks alternate markdown and code cells. Code cells carry a stream output and, optionally, a base64 encoded
+PNG payload like the plots saved in ``examples/iris/iris.ipynb``, which dominate the size of real notebooks.
+"""
+
+import base64
+import random
+from pathlib import Path
+
+import nbformat
+
+# A PNG signature, so that the payload looks like the images Jupyter stores; the rest is random bytes.
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def make_image(size: int, seed: int = 0) -> str:
+    """Returns a base64 encoded, PNG-like payload of the given size in bytes, split into lines like nbformat does."""
+    rng = random.Random(seed)  # noqa: S311
+    payload = _PNG_SIGNATURE + rng.randbytes(max(0, size - len(_PNG_SIGNATURE)))
+    return base64.encodebytes(payload).decode()
+
+
+def make_notebook(cell_count: int, source_lines: int = 5, image_size: int = 0, seed: int = 0) -> nbformat.NotebookNode:
+    """Builds a synthetic notebook.
+
+    Args:
+        cell_count (int): The number of cells, alternating markdown and code cells.
+        source_lines (int): The number of source lines per cell.
+        image_size (int): The size in bytes of the image output attached to each code cell, or 0 for no images.
+        seed (int): The seed for the image payloads, so that the same arguments give the same notebook.
+
+    Returns:
+        nbformat.NotebookNode: A valid v4 notebook.
+    """
+    image = make_image(image_size, seed) if image_size else None
+    notebook = nbformat.v4.new_notebook(
+        metadata={"kernelspec": {"name": "python3", "display_name": "Python 3", "language": "python"}}
+    )
+    for index in range(cell_count):
+        cell_id = f"cell-{seed}-{index}"
+        if index % 2 == 0:
+            source = "\n".join(f"Some explanation of step {index}, line {line}." for line in range(source_lines))
+            notebook.cells.append(nbformat.v4.new_markdown_cell(f"## Section {index}\n\n{source}", id=cell_id))
+            continue
+
+        source = "\n".join(f"value_{line} = compute({index}, {line})" for line in range(source_lines))
+        outputs = [nbformat.v4.new_output("stream", text=f"step {index}\n" * source_lines)]
+        if image is not None:
+            data = {"image/png": image, "text/plain": "<Figure size 640x480 with 1 Axes>"}
+            outputs.append(nbformat.v4.new_output("display_data", data=data))
+        notebook.cells.append(nbformat.v4.new_code_cell(source, id=cell_id, execution_count=index, outputs=outputs))
+    return notebook
+
+
+def write_templates(
+    directory: Path, template_count: int, cell_count: int, source_lines: int = 5, image_size: int = 0
+) -> list[Path]:
+    """Writes a templates directory of synthetic notebooks, grouped in subdirectories like ``mltc/templates``.
+
+    Args:
+        directory (Path): The templates directory to create.
+        template_count (int): The number of notebooks to write.
+        cell_count (int): The number of cells per notebook.
+        source_lines (int): The number of source lines per cell.
+        image_size (int): The size in bytes of the image output attached to each code cell.
+
+    Returns:
+        list[Path]: The paths of the notebooks, in the order the selector numbers them.
+    """
+    paths = []
+    for index in range(template_count):
+        path = directory / f"group-{index:03d}" / f"template-{index:03d}.ipynb"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            nbformat.write(make_notebook(cell_count, source_lines, image_size, seed=index), f)
+        paths.append(path)
+    return paths
@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import Executor
+
+import click
+import nbformat
+
+from mltc import packs
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.transforms import TransformPipeline
+from mltc.validator import NotebookValidationError, NotebookValidator, VerdictMemo
+from mltc.writer import NotebookWriter
+
+# The number of input files read at the same time by default.
+DEFAULT_CONCURRENCY = 8
+
+
+async def read_notebook(
+    path: str, executor: Executor | None = None, semaphore: asyncio.Semaphore | None = None
+) -> nbformat.NotebookNode:
+    """Reads a notebook without blocking the event loop.
+
+    The file is read in a thread, then parsed in the executor.
+
+    Args:
+        path (str): The file path to the notebook.
+        executor (Executor | None): The executor to parse in. Defaults to the event loop's default executor. A
+                                    ProcessPoolExecutor keeps parsing off the event loop's process entirely.
+        semaphore (asyncio.Semaphore | None): Limits the number of files read at the same time.
+
+    Returns:
+        nbformat.NotebookNode: The notebook object.
+
+    Raises:
+        FileNotFoundError: If the notebook file does not exist.
+        OSError: For other OS related issues.
+    """
+    loop = asyncio.get_running_loop()
+    async with semaphore or asyncio.Semaphore():
+        try:
+            data = await asyncio.to_thread(packs.read_bytes, path)
+        except FileNotFoundError as err:
+            err_msg = f"The notebook file {path} does not exist."
+            raise FileNotFoundError(err_msg) from err
+        except OSError as err:
+            err_msg = f"OS error reading {path}: {err}"
+            raise OSError(err_msg) from err
+    return await loop.run_in_executor(executor, NotebookReader.parse_notebook, data)
+
+
+async def _read_and_validate(
+    path: str, memo: VerdictMemo, executor: Executor | None, semaphore: asyncio.Semaphore
+) -> nbformat.NotebookNode | None:
+    """Reads and validates one input, leaving the verdict in the memo for the merger to replay.
+
+    Read failures are reported and give no notebook, as in the CLI.
+    """
+    try:
+        notebook = await read_notebook(path, executor, semaphore)
+    except FileNotFoundError as err:
+        click.echo(f"File not found: {err}")
+        return None
+    except OSError as err:
+        click.echo(f"Unexpected error reading notebook {path}: {err}")
+        return None
+    except (ValueError, nbformat.ValidationError, nbformat.NBFormatError) as err:
+        click.echo(f"Invalid notebook {path}: {err}")
+        return None
+
+    # Validation runs in a thread, since validators may not be picklable and may repair the notebook in place.
+    try:
+        await asyncio.to_thread(memo.is_valid, notebook, path)
+    except NotebookValidationError:
+        return notebook  # the merger reports and skips it, replaying the verdict
+    return notebook
+
+
+async def merge_paths(  # noqa: PLR0913
+    paths: list[str],
+    output: str | None = None,
+    *,
+    validator: NotebookValidator | None = None,
+    executor: Executor | None = None,
+    timeout: float | None = None,
+    stream: bool = False,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+    transforms: TransformPipeline | None = None,
+) -> nbformat.NotebookNode:
+    """Reads, validates and merges notebooks, and optionally writes the result, without blocking the event loop.
+
+    Every input is read and validated in its own task, so later inputs are read while earlier ones are validated.
+    The merged notebook is the same as the one ``NotebookMerger.merge_notebooks`` builds from the same inputs:
+    invalid notebooks are reported and skipped, and so are files that cannot be read.
+
+    Cancelling the call, or exceeding the timeout, cancels the reads and validations that are still pending. A
+    write that has already started finishes in its thread; with ``stream=True`` it is atomic, so the output is
+    either the previous file or the complete new notebook.
+
+    Example:
+        .. code-block:: python
+
+            merged = await merge_paths(["setup.ipynb", "modelling.ipynb"], "project.ipynb", timeout=10)
+
+    Args:
+        paths (list[str]): The ordered paths of the notebooks to merge.
+        output (str | None): The path to write the merged notebook to. Defaults to not writing it.
+        validator (NotebookValidator | None): The validator to use. Defaults to a plain NotebookValidator.
+        executor (Executor | None): The executor to parse notebooks in. Defaults to the loop's default executor.
+        timeout (float | None): The overall time limit in seconds. Defaults to no limit.
+        stream (bool): Whether to stream the merged notebook to disk cell by cell with an atomic replace.
+        max_concurrency (int): The maximum number of files read at the same time.
+        transforms (TransformPipeline | None): The transforms applied to the cells as they are merged.
+
+    Returns:
+        nbformat.NotebookNode: The merged notebook.
+
+    Raises:
+        TimeoutError: If the pipeline does not finish within the timeout.
+        OSError: If an error occurs while writing the merged notebook to file.
+    """
+    memo = VerdictMemo(validator)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async with asyncio.timeout(timeout):
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(_read_and_validate(path, memo, executor, semaphore)) for path in paths]
+
+        notebooks, sources = [], []
+        for path, task in zip(paths, tasks, strict=True):
+            notebook = task.result()
+            if notebook is not None:
+                notebooks.append(notebook)
+                sources.append(path)
+
+        merger = NotebookMerger(validator=memo, transforms=transforms)
+        merged = await asyncio.to_thread(merger.merge_notebooks, notebooks, sources)
+        if output is not None:
+            await asyncio.to_thread(NotebookWriter.write_notebook, merged, output, stream=stream)
+    return merged
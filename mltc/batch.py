@@ -0,0 +1,277 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache, partial
+from pathlib import Path
+
+from mltc import packs, profiling
+from mltc.compact import CompactNotebook
+from mltc.fingerprint import BuildFingerprint
+from mltc.locking import build_lock
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.transforms import TransformPipeline
+from mltc.validator import NotebookValidator
+from mltc.writer import NotebookWriter
+
+
+class InvalidManifestError(Exception):
+    """Exception raised for malformed batch manifests."""
+
+    def __init__(self, path: str, reason: str) -> None:
+        """Initializes the InvalidManifestError with the manifest path and the reason it was rejected.
+
+        Args:
+            path (str): The path to the manifest file.
+            reason (str): A description of what is wrong with the manifest.
+        """
+        self.path = path
+        self.reason = reason
+        super().__init__(f"Invalid manifest {path}: {reason}")
+
+
+@dataclass(frozen=True)
+class BatchEntry:
+    """A single notebook to build in a batch run.
+
+    Attributes:
+        output_path (str): The path where the merged notebook will be saved.
+        templates (tuple[str, ...]): The ordered paths of the templates to merge.
+    """
+
+    output_path: str
+    templates: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """The outcome of building a single batch entry.
+
+    Attributes:
+        output_path (str): The path of the notebook that was built.
+        error (str | None): A description of the failure, or None if the entry was built successfully.
+        status (str): One of ``BUILT``, ``UP_TO_DATE``, ``STALE`` (in a dry run) or ``FAILED``.
+        profile (tuple[profiling.StageRecord, ...]): The stage records measured in a worker process, if requested.
+    """
+
+    BUILT = "built"
+    UP_TO_DATE = "up-to-date"
+    STALE = "stale"
+    FAILED = "failed"
+
+    output_path: str
+    error: str | None = None
+    status: str = BUILT
+    profile: tuple[profiling.StageRecord, ...] = ()
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the entry was built successfully."""
+        return self.error is None
+
+
+def read_manifest(path: str, templates_dir: str) -> list[BatchEntry]:
+    """Reads a batch manifest from a JSON file.
+
+    The manifest is a JSON list of objects, each with an ``output`` path and an ordered list of ``templates``.
+    Relative template paths are resolved against the templates directory.
+
+    Example:
+        .. code-block:: json
+
+            [{"output": "project-a.ipynb", "templates": ["setup/setup.ipynb", "modelling/binary-classification.ipynb"]}]
+
+    Args:
+        path (str): The path to the manifest file.
+        templates_dir (str): The directory against which relative template paths are resolved.
+
+    Returns:
+        list[BatchEntry]: The entries described by the manifest, in manifest order.
+
+    Raises:
+        InvalidManifestError: If the manifest is not valid JSON or does not have the expected structure.
+        OSError: If the manifest cannot be read.
+    """
+    try:
+        raw_entries = json.loads(Path(path).read_bytes())
+    except ValueError as err:
+        raise InvalidManifestError(path, f"not valid JSON ({err})") from err
+
+    if not isinstance(raw_entries, list):
+        raise InvalidManifestError(path, "expected a list of entries")
+
+    entries = []
+    for position, raw_entry in enumerate(raw_entries, start=1):
+        if not isinstance(raw_entry, dict):
+            raise InvalidManifestError(path, f"entry {position} is not an object")
+        output_path = raw_entry.get("output")
+        templates = raw_entry.get("templates")
+        if not isinstance(output_path, str) or not output_path:
+            raise InvalidManifestError(path, f"entry {position} has no 'output' path")
+        if not isinstance(templates, list) or not all(isinstance(template, str) for template in templates):
+            raise InvalidManifestError(path, f"entry {position} has no 'templates' list")
+        entries.append(
+            BatchEntry(
+                output_path=str(Path(output_path).resolve()),
+                templates=tuple(str((Path(templates_dir) / template).resolve()) for template in templates),
+            )
+        )
+    return entries
+
+
+@lru_cache(maxsize=256)
+def _read_template(path: str, mtime_ns: int, size: int) -> CompactNotebook:  # noqa: ARG001
+    """Reads a template once per worker process.
+
+    The modification time and size are part of the cache key so that a template edited during a long batch run
+    is read again instead of being served stale. Templates are kept compact, since they are only merged.
+    """
+    return NotebookReader.read_notebook(path, compact=True)
+
+
+def _load_template(path: str) -> CompactNotebook:
+    """Loads a template through the per-worker cache.
+
+    Raises:
+        FileNotFoundError: If the template file does not exist.
+        OSError: For other OS related issues.
+    """
+    try:
+        stat = packs.stat(path)
+    except FileNotFoundError as err:
+        err_msg = f"The notebook file {path} does not exist."
+        raise FileNotFoundError(err_msg) from err
+    return _read_template(path, stat.st_mtime_ns, stat.st_size)
+
+
+def build_entry(  # noqa: PLR0913
+    entry: BatchEntry,
+    validator: NotebookValidator | None = None,
+    *,
+    stream: bool = False,
+    force: bool = False,
+    dry_run: bool = False,
+    profile: bool = False,
+    transforms: TransformPipeline | None = None,
+) -> BatchResult:
+    """Runs the read, merge and write pipeline for a single batch entry.
+
+    The entry is skipped if its output records a build fingerprint matching the current templates, including when
+    a concurrent build of the same output and templates finishes first; see ``build_lock``.
+
+    Args:
+        entry (BatchEntry): The entry to build.
+        validator (NotebookValidator | None): The validator used by the merger. Defaults to a plain NotebookValidator.
+        stream (bool): Whether to stream the merged notebook to disk cell by cell with an atomic replace.
+        force (bool): Whether to rebuild the entry even if its output is up to date.
+        dry_run (bool): Whether to only check if the output is up to date, without building it.
+        profile (bool): Whether to measure the pipeline stages and return their records with the result, for
+                        entries built in a worker process.
+        transforms (TransformPipeline | None): The transforms applied to the cells as they are merged.
+
+    Returns:
+        BatchResult: The outcome of the build. Errors are captured in the result instead of being raised,
+                     so that one failing entry does not abort the rest of the batch.
+    """
+    if profile:
+        with profiling.Profiler() as profiler:
+            result = build_entry(entry, validator, stream=stream, force=force, dry_run=dry_run, transforms=transforms)
+        return replace(result, profile=tuple(profiler.records))
+    try:
+        options = transforms.fingerprint_options() if transforms else {}
+        fingerprint = BuildFingerprint.compute(list(entry.templates), options=options)
+        up_to_date = fingerprint.is_up_to_date(entry.output_path)
+        if dry_run:
+            return BatchResult(entry.output_path, status=BatchResult.UP_TO_DATE if up_to_date else BatchResult.STALE)
+        if up_to_date and not force:
+            return BatchResult(entry.output_path, status=BatchResult.UP_TO_DATE)
+
+        with build_lock(entry.output_path, fingerprint, force=force) as needed:
+            if not needed:
+                return BatchResult(entry.output_path, status=BatchResult.UP_TO_DATE)
+            notebooks = [_load_template(template) for template in entry.templates]
+            merger = NotebookMerger(validator=validator or NotebookValidator(), transforms=transforms)
+            merged_notebook = merger.merge_notebooks(notebooks, sources=list(entry.templates))
+            fingerprint.stamp(merged_notebook)
+            NotebookWriter.write_notebook(merged_notebook, entry.output_path, stream=stream)
+    except Exception as err:  # noqa: BLE001
+        return BatchResult(entry.output_path, error=f"{type(err).__name__}: {err}", status=BatchResult.FAILED)
+    return BatchResult(entry.output_path)
+
+
+class BatchBuilder:
+    """Builds many merged notebooks in a process pool.
+
+    Each worker process keeps its own cache of parsed templates, so a template shared by many entries is read once
+    per worker rather than once per entry.
+
+    Attributes:
+        max_workers (int): The number of worker processes to use.
+        validator (NotebookValidator | None): The validator used by every worker's merger.
+        stream (bool): Whether the workers stream merged notebooks to disk cell by cell with an atomic replace.
+        force (bool): Whether entries are rebuilt even if their outputs are up to date.
+        dry_run (bool): Whether entries are only checked for staleness instead of being built.
+        transforms (TransformPipeline | None): The transforms applied to the cells as they are merged.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        max_workers: int | None = None,
+        validator: NotebookValidator | None = None,
+        *,
+        stream: bool = False,
+        force: bool = False,
+        dry_run: bool = False,
+        transforms: TransformPipeline | None = None,
+    ) -> None:
+        """Initializes the BatchBuilder.
+
+        Args:
+            max_workers (int | None): The number of worker processes to use. Defaults to the number of CPU cores.
+            validator (NotebookValidator | None): The validator used by every worker's merger. It is copied to the
+                                                  worker processes, so it must be picklable.
+            stream (bool): Whether to stream merged notebooks to disk cell by cell with an atomic replace.
+            force (bool): Whether to rebuild entries even if their outputs are up to date.
+            dry_run (bool): Whether to only check which outputs are stale, without building them.
+            transforms (TransformPipeline | None): The transforms applied to the cells as they are merged.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.validator = validator
+        self.stream = stream
+        self.force = force
+        self.dry_run = dry_run
+        self.transforms = transforms
+
+    def build(self, entries: list[BatchEntry]) -> list[BatchResult]:
+        """Builds all entries and returns their results in entry order.
+
+        Args:
+            entries (list[BatchEntry]): The entries to build.
+
+        Returns:
+            list[BatchResult]: One result per entry, in the same order as the entries.
+        """
+        if not entries:
+            return []
+        build = partial(
+            build_entry,
+            validator=self.validator,
+            stream=self.stream,
+            force=self.force,
+            dry_run=self.dry_run,
+            transforms=self.transforms,
+        )
+        if self.max_workers == 1 or len(entries) == 1:
+            return [build(entry) for entry in entries]
+
+        # Profiling hooks live in this process, so workers measure their stages and send the records back.
+        profile = profiling.is_active()
+        max_workers = min(self.max_workers, len(entries))
+        chunksize = max(1, len(entries) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(partial(build, profile=profile), entries, chunksize=chunksize))
+        for result in results:
+            for record in result.profile:
+                profiling.emit(record)
+        return results
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from mltc import jsonio
+
+if TYPE_CHECKING:
+    import nbformat
+
+
+def default_cache_dir() -> Path:
+    """Returns the directory where mltc keeps its caches.
+
+    The ``MLTC_CACHE_DIR`` environment variable takes precedence, followed by ``$XDG_CACHE_HOME/mltc`` and
+    ``~/.cache/mltc``.
+
+    Returns:
+        Path: The cache directory. It is not created by this function.
+    """
+    if os.environ.get("MLTC_CACHE_DIR"):
+        return Path(os.environ["MLTC_CACHE_DIR"])
+    if os.environ.get("XDG_CACHE_HOME"):
+        return Path(os.environ["XDG_CACHE_HOME"]) / "mltc"
+    return Path.home() / ".cache" / "mltc"
+
+
+def canonical_bytes(obj: object) -> bytes:
+    """Serializes a JSON-compatible object to canonical bytes, with sorted keys and no insignificant whitespace.
+
+    Args:
+        obj (object): The object to serialize, typically a notebook or a cell.
+
+    Returns:
+        bytes: The canonical UTF-8 encoded JSON representation of the object.
+    """
+    return jsonio.dumps(obj, sort_keys=True)
+
+
+class ValidationCache:
+    """Persistent cache of notebook validation verdicts.
+
+    Verdicts are keyed by a hash of the notebook's canonical bytes together with the installed nbformat version and
+    the name of the validation engine, so that upgrading nbformat (and with it the schema) invalidates every entry,
+    and the engines, whose error messages differ, do not share verdicts. Messages are stored without the notebook's
+    path, since the same content may be read from several paths. The cache is stored in a SQLite
+    database, which makes it safe to share between the processes of a batch run. When the number of entries
+    exceeds the configured maximum, the least recently used entries are evicted.
+
+    Attributes:
+        path (Path): The path to the cache database.
+        max_entries (int): The maximum number of verdicts to keep.
+    """
+
+    def __init__(self, path: str | None = None, max_entries: int = 4096) -> None:
+        """Initializes the ValidationCache.
+
+        Args:
+            path (str | None): The path to the cache database. Defaults to ``validation.sqlite3`` in the
+                               default cache directory.
+            max_entries (int): The maximum number of verdicts to keep before evicting the least recently used.
+        """
+        self.path = Path(path) if path is not None else default_cache_dir() / "validation.sqlite3"
+        self.max_entries = max_entries
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """Drops the database connection and lock so that the cache can be sent to worker processes."""
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the cache in a worker process with a fresh lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(notebook: "nbformat.NotebookNode", engine: str = "nbformat") -> str:
+        """Computes the cache key of a notebook.
+
+        Args:
+            notebook (nbformat.NotebookNode): The notebook object.
+            engine (str): The name of the engine the notebook is validated with.
+
+        Returns:
+            str: The hex digest identifying the notebook's content, the nbformat version and the engine.
+        """
+        import nbformat  # imported here so that the catalog, which shares default_cache_dir, stays nbformat-free
+
+        digest = hashlib.sha256(f"nbformat-{nbformat.__version__}\0{engine}\0".encode())
+        digest.update(canonical_bytes(notebook))
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts "
+                "(key TEXT PRIMARY KEY, valid INTEGER NOT NULL, message TEXT, last_used REAL NOT NULL)"
+            )
+        return self._connection
+
+    def get(self, key: str) -> tuple[bool, str | None] | None:
+        """Looks up a validation verdict.
+
+        Args:
+            key (str): The cache key, as returned by ``key``.
+
+        Returns:
+            tuple[bool, str | None] | None: The cached verdict and validation error message, or None if the
+                                            notebook has no cached verdict or the cache is unavailable.
+        """
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    row = connection.execute("SELECT valid, message FROM verdicts WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        connection.execute("UPDATE verdicts SET last_used = ? WHERE key = ?", (time.time(), key))
+            except (sqlite3.Error, OSError):
+                return None
+        if row is None:
+            return None
+        return bool(row[0]), row[1]
+
+    def put(self, key: str, *, valid: bool, message: str | None = None) -> None:
+        """Records a validation verdict, evicting the least recently used verdicts if the cache is full.
+
+        Failures to write to the cache are ignored, since the cache is only an optimization.
+
+        Args:
+            key (str): The cache key, as returned by ``key``.
+            valid (bool): Whether the notebook is valid.
+            message (str | None): The validation error message for invalid notebooks.
+        """
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO verdicts (key, valid, message, last_used) VALUES (?, ?, ?, ?)",
+                        (key, int(valid), message, time.time()),
+                    )
+                    connection.execute(
+                        "DELETE FROM verdicts WHERE key IN "
+                        "(SELECT key FROM verdicts ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+            except (sqlite3.Error, OSError):
+                return
+
+    def clear(self) -> None:
+        """Removes every verdict from the cache."""
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.execute("DELETE FROM verdicts")
+            except (sqlite3.Error, OSError):
+                return
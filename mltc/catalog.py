@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from mltc import jsonio, profiling
+from mltc.cache import default_cache_dir
+
+CATALOG_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """A notebook template recorded in the catalog.
+
+    Attributes:
+        path (Path): The absolute path to the notebook.
+        group (str): The name of the directory containing the notebook, used to group notebooks for display.
+        size (int): The size of the notebook file in bytes.
+        mtime_ns (int): The modification time of the notebook file in nanoseconds.
+        sha256 (str | None): The hex digest of the notebook file's contents, or None if it was not read, as for
+                             notebooks in a template pack.
+        cell_count (int | None): The number of cells in the notebook, or None if the file is not a readable notebook
+                                 or was not read.
+    """
+
+    path: Path
+    group: str
+    size: int
+    mtime_ns: int
+    sha256: str | None
+    cell_count: int | None
+
+
+def _count_cells(data: bytes) -> int | None:
+    """Counts the cells of a notebook without building a NotebookNode."""
+    try:
+        notebook = jsonio.loads(data)
+    except ValueError:
+        return None
+    cells = notebook.get("cells") if isinstance(notebook, dict) else None
+    return len(cells) if isinstance(cells, list) else None
+
+
+class TemplateCatalog:
+    """Persistent index of the notebook templates in a directory tree.
+
+    The catalog is built with an ``os.scandir`` walk that skips hidden entries such as ``.git`` and
+    ``.ipynb_checkpoints``, and is saved to the cache directory. When it is refreshed, directories whose
+    modification time has not changed are not listed again, since adding, removing or renaming a file updates the
+    directory's modification time. Every notebook is still stat-ed, because a file edited in place does not touch
+    its directory, and only the notebooks whose size or modification time changed are hashed again.
+
+    Entries are ordered by a depth-first walk with files before subdirectories, each sorted by name. This order
+    defines the numbering shown to users.
+
+    Attributes:
+        directory (Path): The root directory of the templates.
+        index_path (Path): The path where the catalog is saved.
+    """
+
+    def __init__(self, directory: str, index_path: str | None = None) -> None:
+        """Initializes the TemplateCatalog.
+
+        Args:
+            directory (str): The root directory of the templates.
+            index_path (str | None): The path where the catalog is saved. Defaults to a file in the cache directory
+                                     named after a hash of the templates directory.
+        """
+        self.directory = Path(directory).resolve()
+        if index_path is None:
+            digest = hashlib.sha256(str(self.directory).encode()).hexdigest()[:16]
+            index_path = default_cache_dir() / "catalogs" / f"{digest}.json"
+        self.index_path = Path(index_path)
+        self._entries = None
+
+    @property
+    def entries(self) -> list[CatalogEntry]:
+        """list[CatalogEntry]: The catalog entries, refreshed from disk on first access."""
+        if self._entries is None:
+            self.refresh()
+        return self._entries
+
+    def refresh(self, *, rescan: bool = False) -> list[CatalogEntry]:
+        """Brings the catalog up to date with the templates directory and saves it.
+
+        Args:
+            rescan (bool): Whether to ignore the saved index and list, stat and hash every notebook again.
+
+        Returns:
+            list[CatalogEntry]: The up-to-date catalog entries.
+        """
+        with profiling.stage("catalog", source=str(self.directory)) as metrics:
+            self._entries = self._refresh(rescan=rescan, metrics=metrics)
+            metrics.cells = sum(entry.cell_count or 0 for entry in self._entries)
+        return self._entries
+
+    def _refresh(self, *, rescan: bool, metrics: profiling.StageMetrics) -> list[CatalogEntry]:
+        saved = {} if rescan else self._load()
+        saved_dirs = saved.get("dirs", {})
+        saved_files = saved.get("files", {})
+        dirs = {}
+        files = {}
+        visited = set()
+
+        def walk(relative_dir: str) -> None:
+            directory = self.directory / relative_dir
+            try:
+                stat = directory.stat()
+            except OSError:
+                return
+            if (stat.st_dev, stat.st_ino) in visited:
+                return  # symlink loop
+            visited.add((stat.st_dev, stat.st_ino))
+
+            saved_dir = saved_dirs.get(relative_dir)
+            if saved_dir is not None and saved_dir["mtime_ns"] == stat.st_mtime_ns:
+                names, subdirs = saved_dir["files"], saved_dir["subdirs"]
+            else:
+                names, subdirs = self._list_directory(directory)
+            dirs[relative_dir] = {"mtime_ns": stat.st_mtime_ns, "files": names, "subdirs": subdirs}
+
+            for name in names:
+                relative_path = f"{relative_dir}/{name}" if relative_dir else name
+                saved_file = saved_files.get(relative_path)
+                record = self._record(relative_path, saved_file)
+                if record is not None:
+                    files[relative_path] = record
+                    if record is not saved_file:
+                        metrics.bytes_read += record["size"]
+            for name in subdirs:
+                walk(f"{relative_dir}/{name}" if relative_dir else name)
+
+        walk("")
+        self._save({"version": CATALOG_VERSION, "directory": str(self.directory), "dirs": dirs, "files": files})
+        return [self._entry(relative_path, record) for relative_path, record in files.items()]
+
+    @staticmethod
+    def _list_directory(directory: Path) -> tuple[list[str], list[str]]:
+        """Lists the notebooks and subdirectories of a directory, skipping hidden entries."""
+        names, subdirs = [], []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.name)
+                        elif entry.name.endswith(".ipynb") and entry.is_file():
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return [], []
+        return sorted(names), sorted(subdirs)
+
+    def _record(self, relative_path: str, saved: dict | None) -> dict | None:
+        """Returns the index record of a notebook, hashing it again only if its size or mtime changed."""
+        path = self.directory / relative_path
+        try:
+            stat = path.stat()
+            if saved is not None and saved["size"] == stat.st_size and saved["mtime_ns"] == stat.st_mtime_ns:
+                return saved
+            data = path.read_bytes()
+        except OSError:
+            return None
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "cell_count": _count_cells(data),
+        }
+
+    def _entry(self, relative_path: str, record: dict) -> CatalogEntry:
+        path = self.directory / relative_path
+        return CatalogEntry(path=path, group=path.parent.name, **record)
+
+    def _load(self) -> dict:
+        """Loads the saved index, returning an empty index if it is missing, unreadable or outdated."""
+        try:
+            saved = json.loads(self.index_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        if saved.get("version") != CATALOG_VERSION or saved.get("directory") != str(self.directory):
+            return {}
+        return saved
+
+    def _save(self, index: dict) -> None:
+        """Saves the index atomically. Failures are ignored, since the catalog can always be rebuilt."""
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(index))
+            temp_path.replace(self.index_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
@@ -0,0 +1,137 @@
+from collections.abc import Iterable
+
+import nbformat
+from nbformat.v4.rwbase import rejoin_lines, strip_transient
+
+
+class CompactCell:
+    """A notebook cell kept as the plain dict the JSON parser produced.
+
+    Building a NotebookNode converts every nested dict of a cell, including each output and its metadata, which
+    costs more time and memory than concatenating cells needs. A compact cell keeps the parsed JSON as is, in its
+    on-disk form with multiline strings as lists of lines, and converts it to a NotebookNode only when ``to_node``
+    is called. From then on it holds the node, so changes made through the node are kept.
+    """
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value: dict) -> None:
+        """Initializes the CompactCell.
+
+        Args:
+            value (dict): The cell as parsed from JSON, or a NotebookNode.
+        """
+        self._value = value
+
+    @property
+    def cell_type(self) -> str | None:
+        """The type of the cell, such as "code" or "markdown"."""
+        return self._value.get("cell_type")
+
+    def to_dict(self) -> dict:
+        """Returns the cell as a dict, without copying it. Multiline strings may be lists of lines."""
+        return self._value
+
+    def to_node(self) -> nbformat.NotebookNode:
+        """Returns the cell as a NotebookNode, the same one that ``NotebookReader.read_notebook`` would build."""
+        if not isinstance(self._value, nbformat.NotebookNode):
+            wrapper = nbformat.from_dict({"metadata": {}, "cells": [self._value]})
+            self._value = strip_transient(rejoin_lines(wrapper)).cells[0]
+        return self._value
+
+
+class CompactNotebook:
+    """A notebook whose cells are CompactCells, which the reader, merger and writer can pass through.
+
+    Only the top level of the notebook is an object; the metadata is a plain dict and the cells keep their parsed
+    JSON. Use ``to_notebook`` for a regular NotebookNode.
+
+    Attributes:
+        cells (list[CompactCell]): The cells.
+        metadata (dict): The notebook metadata.
+        nbformat (int): The major version of the notebook format.
+        nbformat_minor (int): The minor version of the notebook format.
+    """
+
+    __slots__ = ("cells", "metadata", "nbformat", "nbformat_minor")
+
+    def __init__(
+        self,
+        cells: Iterable[CompactCell] = (),
+        metadata: dict | None = None,
+        nbformat: int = nbformat.v4.nbformat,
+        nbformat_minor: int = nbformat.v4.nbformat_minor,
+    ) -> None:
+        """Initializes the CompactNotebook.
+
+        Args:
+            cells (Iterable[CompactCell]): The cells. Defaults to none.
+            metadata (dict | None): The notebook metadata. Defaults to empty metadata.
+            nbformat (int): The major version of the notebook format. Defaults to 4.
+            nbformat_minor (int): The minor version of the notebook format. Defaults to the current one.
+        """
+        self.cells = list(cells)
+        self.metadata = metadata if metadata is not None else {}
+        self.nbformat = nbformat
+        self.nbformat_minor = nbformat_minor
+
+    @classmethod
+    def from_dict(cls, nb_dict: dict) -> "CompactNotebook":
+        """Wraps a version 4 notebook parsed from JSON, without copying it.
+
+        Args:
+            nb_dict (dict): The parsed notebook.
+
+        Returns:
+            CompactNotebook: The compact notebook.
+
+        Raises:
+            nbformat.ValidationError: If the notebook has no list of cells.
+        """
+        cells = nb_dict.get("cells")
+        if not isinstance(cells, list):
+            err_msg = "The notebook is invalid and is missing an expected key: cells"
+            raise nbformat.ValidationError(err_msg)
+        metadata = nb_dict.get("metadata")
+        return cls(
+            cells=[CompactCell(cell) for cell in cells],
+            metadata=metadata if isinstance(metadata, dict) else {},
+            nbformat=nb_dict.get("nbformat"),
+            nbformat_minor=nb_dict.get("nbformat_minor"),
+        )
+
+    @classmethod
+    def from_notebook(cls, notebook: nbformat.NotebookNode) -> "CompactNotebook":
+        """Wraps a NotebookNode, sharing its cells and metadata.
+
+        Args:
+            notebook (nbformat.NotebookNode): The notebook.
+
+        Returns:
+            CompactNotebook: The compact notebook.
+        """
+        return cls(
+            cells=[CompactCell(cell) for cell in notebook.cells],
+            metadata=notebook.metadata,
+            nbformat=notebook.nbformat,
+            nbformat_minor=notebook.nbformat_minor,
+        )
+
+    def to_dict(self) -> dict:
+        """Returns the notebook as a plain dict sharing the cells' dicts, for validation and writing."""
+        return {
+            "cells": [cell.to_dict() for cell in self.cells],
+            "metadata": self.metadata,
+            "nbformat": self.nbformat,
+            "nbformat_minor": self.nbformat_minor,
+        }
+
+    def to_notebook(self) -> nbformat.NotebookNode:
+        """Returns the notebook as a NotebookNode, converting every cell.
+
+        Returns:
+            nbformat.NotebookNode: The notebook, the same one that ``NotebookReader.read_notebook`` would build.
+        """
+        notebook = nbformat.from_dict({**self.to_dict(), "cells": []})
+        notebook.cells = [cell.to_node() for cell in self.cells]
+        return strip_transient(notebook)
@@ -0,0 +1,160 @@
+import copy
+import json
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+
+import fastjsonschema
+import nbformat
+
+ValidateFunc = Callable[[dict], None]
+
+_CELL_DEFINITIONS = {"raw": "raw_cell", "markdown": "markdown_cell", "code": "code_cell"}
+_OUTPUT_DEFINITIONS = ("execute_result", "display_data", "stream", "error")
+
+
+class _CompiledSchema:
+    """Validators compiled from one nbformat v4 schema.
+
+    The schema describes cells and outputs with ``oneOf`` over every cell or output type, which makes the
+    generated validator try each branch in turn. Since ``cell_type`` and ``output_type`` are discriminating enums,
+    the same verdict is reached by dispatching on them to a validator per type. Each validator is compiled on first
+    use, and outputs are validated separately from their code cell. The generic ``cell`` and ``output`` validators
+    are only used to report unknown types with nbformat's own error messages.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        code_cell = copy.deepcopy(schema["definitions"]["code_cell"])
+        code_cell["properties"]["outputs"]["items"] = {}
+        envelope = {**schema, "properties": {**schema["properties"], "cells": {"type": "array"}}}
+        self._schema = schema
+        self._deferred_definitions = {**schema["definitions"], "code_cell": code_cell}
+        self._validators = {}
+        self.envelope = fastjsonschema.compile(envelope)
+
+    def _validator(self, name: str) -> ValidateFunc:
+        """Returns the validator for a schema definition, compiling it on first use."""
+        if name not in self._validators:
+            definitions = (
+                self._deferred_definitions if name in _CELL_DEFINITIONS.values() else self._schema["definitions"]
+            )
+            self._validators[name] = fastjsonschema.compile(
+                {"$schema": self._schema["$schema"], "definitions": definitions, "$ref": f"#/definitions/{name}"}
+            )
+        return self._validators[name]
+
+    def validate_cell(self, cell: dict) -> None:
+        """Validates a cell and its outputs.
+
+        Raises:
+            fastjsonschema.JsonSchemaException: If the cell or one of its outputs is invalid.
+        """
+        cell_type = cell.get("cell_type") if isinstance(cell, dict) else None
+        if cell_type not in _CELL_DEFINITIONS:
+            self._validator("cell")(cell)  # let the generic validator describe the problem
+            return
+        self._validator(_CELL_DEFINITIONS[cell_type])(cell)
+        for index, output in enumerate(cell.get("outputs", ())):
+            output_type = output.get("output_type") if isinstance(output, dict) else None
+            try:
+                self._validator(output_type if output_type in _OUTPUT_DEFINITIONS else "output")(output)
+            except fastjsonschema.JsonSchemaException as err:
+                err.message = f"output {index}: {err.message}"
+                raise
+
+
+@cache
+def _compiled_schema(minor: int) -> _CompiledSchema:
+    """Compiles the validators for a v4 minor version.
+
+    Compilation is the expensive part of schema validation, so it happens once per process and minor version.
+    Notebooks from a newer minor version than nbformat knows about are validated against the latest schema.
+
+    Returns:
+        _CompiledSchema: The compiled validators.
+    """
+    schema_name = nbformat.v4.nbformat_schema.get((nbformat.v4.nbformat, minor))
+    if schema_name is None:
+        schema_name = nbformat.v4.nbformat_schema[(None, None)]
+    with (Path(nbformat.v4.__file__).parent / schema_name).open(encoding="utf8") as f:
+        return _CompiledSchema(json.load(f))
+
+
+class CellValidationError(Exception):
+    """Describes a single cell that does not conform to the notebook format schema."""
+
+    def __init__(self, index: int, reason: str, source: str | None = None) -> None:
+        """Initializes the CellValidationError.
+
+        Args:
+            index (int): The 0-based index of the invalid cell in its notebook.
+            reason (str): A description of why the cell is invalid.
+            source (str | None): The notebook the cell belongs to, if known.
+        """
+        self.index = index
+        self.reason = reason
+        self.source = source
+        location = f"Cell {index}" if source is None else f"Cell {index} of {source}"
+        super().__init__(f"{location}: {reason}")
+
+
+class CompiledSchemaEngine:
+    """Validates notebooks with a schema compiled once per process.
+
+    Instead of running the schema over the whole notebook, the engine validates the notebook-level envelope
+    (metadata and version fields) and then each cell on its own. This avoids rebuilding validator state on every
+    call and allows every invalid cell to be reported individually, with its index and source notebook.
+
+    Attributes:
+        name (str): The name of the engine, which keeps its verdicts apart from others in the validation cache.
+    """
+
+    name = "compiled-schema"
+
+    @staticmethod
+    def find_errors(notebook: nbformat.NotebookNode, source: str | None = None) -> list[Exception]:
+        """Validates a notebook and returns every problem found.
+
+        Args:
+            notebook (nbformat.NotebookNode): The notebook object.
+            source (str | None): The notebook's path or name, used in error messages.
+
+        Returns:
+            list[Exception]: The problems found. Envelope problems are reported as ``nbformat.ValidationError``,
+                             cell problems as ``CellValidationError``. The list is empty if the notebook is valid.
+
+        Raises:
+            TypeError: If the object is not a notebook or its minor version is not an integer.
+            ValueError: If the notebook is not a version 4 notebook.
+        """
+        if not isinstance(notebook, dict) or not isinstance(notebook.get("cells"), list):
+            err_msg = "The provided object is not a notebook."
+            raise TypeError(err_msg)
+        if notebook.get("nbformat") != nbformat.v4.nbformat:
+            err_msg = f"Unsupported nbformat version {notebook.get('nbformat')}"
+            raise ValueError(err_msg)
+        minor = notebook.get("nbformat_minor")
+        if not isinstance(minor, int):
+            err_msg = f"Invalid nbformat_minor {minor!r}"
+            raise TypeError(err_msg)
+
+        schema = _compiled_schema(minor)
+        errors = []
+        try:
+            schema.envelope(notebook)
+        except fastjsonschema.JsonSchemaException as err:
+            errors.append(nbformat.ValidationError(err.message))
+
+        seen_ids = set()
+        for index, cell in enumerate(notebook["cells"]):
+            try:
+                schema.validate_cell(cell)
+            except fastjsonschema.JsonSchemaException as err:
+                errors.append(CellValidationError(index, err.message, source))
+                continue
+            cell_id = cell.get("id")
+            if cell_id is not None:
+                if cell_id in seen_ids:
+                    errors.append(CellValidationError(index, f"duplicate cell id {cell_id!r}", source))
+                seen_ids.add(cell_id)
+        return errors
@@ -0,0 +1,152 @@
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from mltc import packs
+from mltc.incremental import IncrementalNotebook
+
+if TYPE_CHECKING:
+    import nbformat
+
+    from mltc.compact import CompactNotebook
+
+METADATA_KEY = "mltc"
+
+
+def mltc_version() -> str:
+    """Returns the installed version of mltc, or "unknown" when running from a source tree."""
+    try:
+        return version("mltc")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _sha256(path: str) -> str:
+    """Hashes a file in chunks, or a notebook inside a template pack as a whole."""
+    if packs.split_pack_path(path) is not None:
+        return hashlib.sha256(packs.read_bytes(path)).hexdigest()
+    with Path(path).open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+@dataclass(frozen=True)
+class BuildFingerprint:
+    """Identifies the inputs a merged notebook was built from.
+
+    The fingerprint records the ordered input paths with the hashes of their contents, the mltc version and the
+    build options. It is stored in the merged notebook's metadata, so that a later run with the same inputs can
+    tell that the output is up to date without reading, validating and merging the inputs again.
+
+    Attributes:
+        inputs (tuple[tuple[str, str], ...]): The ordered input paths, each paired with the hex digest of its contents.
+        version (str): The mltc version that built the notebook.
+        options (dict): Build options that affect the output.
+    """
+
+    inputs: tuple[tuple[str, str], ...]
+    version: str = field(default_factory=mltc_version)
+    options: dict = field(default_factory=dict)
+
+    @classmethod
+    def compute(cls, paths: list[str], options: dict | None = None) -> "BuildFingerprint":
+        """Computes the fingerprint of a build from its input files.
+
+        Args:
+            paths (list[str]): The ordered paths of the notebooks to merge.
+            options (dict | None): Build options that affect the output.
+
+        Returns:
+            BuildFingerprint: The fingerprint of the build.
+
+        Raises:
+            OSError: If an input file cannot be read.
+        """
+        inputs = tuple((str(path), _sha256(path)) for path in paths)
+        return cls(inputs=inputs, options=dict(options or {}))
+
+    def with_changes(self, changed: Iterable[str]) -> "BuildFingerprint":
+        """Computes the fingerprint of the same build after some of its inputs changed.
+
+        Only the changed inputs are hashed again; the digests of the other inputs are reused.
+
+        Args:
+            changed (Iterable[str]): The paths of the inputs that changed. Paths that are not inputs are ignored.
+
+        Returns:
+            BuildFingerprint: The fingerprint with the new digests of the changed inputs.
+
+        Raises:
+            OSError: If a changed input cannot be read.
+        """
+        changed = {str(path) for path in changed}
+        digests = {path: _sha256(path) for path, _ in self.inputs if path in changed}
+        return replace(self, inputs=tuple((path, digests.get(path, sha256)) for path, sha256 in self.inputs))
+
+    @classmethod
+    def from_metadata(cls, metadata: dict) -> "BuildFingerprint | None":
+        """Reads a fingerprint from notebook metadata.
+
+        Args:
+            metadata (dict): The metadata of a merged notebook.
+
+        Returns:
+            BuildFingerprint | None: The recorded fingerprint, or None if the metadata has no valid fingerprint.
+        """
+        try:
+            recorded = metadata[METADATA_KEY]["fingerprint"]
+            return cls(
+                inputs=tuple((item["path"], item["sha256"]) for item in recorded["inputs"]),
+                version=recorded["version"],
+                options=dict(recorded.get("options", {})),
+            )
+        except (KeyError, TypeError, AttributeError):
+            return None
+
+    @classmethod
+    def read(cls, path: str) -> "BuildFingerprint | None":
+        """Reads the fingerprint recorded in a merged notebook file.
+
+        Args:
+            path (str): The path to the merged notebook.
+
+        Only the notebook-level fields are parsed, so the cells of a large merged notebook are never loaded.
+
+        Returns:
+            BuildFingerprint | None: The recorded fingerprint, or None if the file does not exist, cannot be parsed
+                                     or has no fingerprint.
+        """
+        try:
+            with IncrementalNotebook(path) as notebook:
+                return cls.from_metadata(notebook.metadata)
+        except (OSError, ValueError):
+            return None
+
+    def to_metadata(self) -> dict:
+        """Returns the fingerprint in the form it is stored in notebook metadata."""
+        return {
+            "inputs": [{"path": path, "sha256": sha256} for path, sha256 in self.inputs],
+            "version": self.version,
+            "options": self.options,
+        }
+
+    def stamp(self, notebook: "nbformat.NotebookNode | CompactNotebook") -> None:
+        """Records the fingerprint in a merged notebook's metadata.
+
+        Args:
+            notebook (nbformat.NotebookNode | CompactNotebook): The merged notebook.
+        """
+        notebook.metadata.setdefault(METADATA_KEY, {})["fingerprint"] = self.to_metadata()
+
+    def is_up_to_date(self, output_path: str) -> bool:
+        """Checks whether a merged notebook was built from exactly these inputs.
+
+        Args:
+            output_path (str): The path to the merged notebook.
+
+        Returns:
+            bool: True if the notebook exists and records this fingerprint.
+        """
+        return self.read(output_path) == self
@@ -0,0 +1,262 @@
+import mmap
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from mltc import jsonio, packs
+
+if TYPE_CHECKING:  # mltc.compact imports nbformat, which reading the notebook-level fields does not need
+    from mltc.compact import CompactCell
+
+# The next token at the top level of the notebook: a string, a structural character or a scalar such as 4 or null.
+_TOKEN = re.compile(rb'[ \t\n\r]*+("(?:[^"\\]++|\\.)*+"|[\[\]{},:]|[^ \t\n\r"\[\]{},:]++)', re.DOTALL)
+# The characters that matter when skipping over a value: brackets, and quotes, which start strings to skip.
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+_OPENING = (b"{", b"[")
+
+
+class MalformedNotebookError(ValueError):
+    """Exception raised when a notebook read incrementally is not a well-formed JSON object with a list of cells."""
+
+    def __init__(self, path: str, reason: str) -> None:
+        """Initializes the MalformedNotebookError with the notebook path and what is wrong with it.
+
+        Args:
+            path (str): The path to the notebook.
+            reason (str): A description of the problem.
+        """
+        self.path = path
+        self.reason = reason
+        super().__init__(f"Notebook {path} is not valid JSON: {reason}")
+
+
+class IncrementalNotebook:
+    """A version 4 notebook that is read one cell at a time instead of being parsed whole.
+
+    The file is memory-mapped, and a scanner finds where each cell starts and ends without parsing it: it only
+    tracks the brackets outside of strings, and skips strings by searching for their closing quote. Each cell is
+    then parsed on its own when it is iterated over, so that the largest cell, rather than the whole notebook,
+    bounds the memory used for parsing, and the first cell is available as soon as it has been scanned. Only the
+    positions of the cells are kept, and the mapped pages of a parsed cell are released where the OS supports it.
+
+    The notebook-level fields are available before any cell is iterated over. Since they follow the cells in the
+    files nbformat writes, accessing them scans the rest of the file first, which records the positions of all
+    cells on the way.
+
+    A notebook inside a zip or tar template pack is read from the archive into memory first, since a compressed
+    member cannot be mapped.
+
+    Example:
+        .. code-block:: python
+
+            with IncrementalNotebook("large.ipynb") as notebook:
+                print(notebook.metadata)
+                for cell in notebook.iter_cells():
+                    ...
+
+    Attributes:
+        path (str): The path to the notebook.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens a notebook for incremental reading.
+
+        Args:
+            path (str): The path to the notebook, which may be inside a template pack.
+
+        Raises:
+            FileNotFoundError: If the notebook file does not exist.
+            OSError: For other OS related issues.
+        """
+        self.path = str(path)
+        self._mmap = None
+        try:
+            if packs.split_pack_path(path) is not None:
+                self._buffer = packs.read_bytes(path)
+            else:
+                with Path(path).open("rb") as f:
+                    try:
+                        self._mmap = self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:  # an empty file cannot be mapped
+                        self._buffer = b""
+        except FileNotFoundError as err:
+            err_msg = f"The notebook file {path} does not exist."
+            raise FileNotFoundError(err_msg) from err
+        except OSError as err:
+            err_msg = f"OS error reading {path}: {err}"
+            raise OSError(err_msg) from err
+        self._spans = []
+        self._fields = {}
+        self._scanner = self._scan()
+        self._scanned = False
+
+    @property
+    def envelope(self) -> dict:
+        """dict: The notebook-level fields, such as ``metadata`` and ``nbformat``, without the cells."""
+        self._scan_all()
+        return self._fields
+
+    @property
+    def metadata(self) -> dict:
+        """dict: The notebook metadata."""
+        metadata = self.envelope.get("metadata")
+        return metadata if isinstance(metadata, dict) else {}
+
+    @property
+    def nbformat(self) -> int | None:
+        """The major version of the notebook format, or None if the notebook has none."""
+        return self.envelope.get("nbformat")
+
+    @property
+    def nbformat_minor(self) -> int | None:
+        """The minor version of the notebook format, or None if the notebook has none."""
+        return self.envelope.get("nbformat_minor")
+
+    @property
+    def cell_count(self) -> int:
+        """int: The number of cells, counted without parsing them."""
+        self._scan_all()
+        return len(self._spans)
+
+    def iter_cells(self) -> Iterator["CompactCell"]:
+        """Parses and yields the cells one at a time, scanning the file only as far as needed.
+
+        Yields:
+            CompactCell: The cells, in their on-disk form.
+
+        Raises:
+            MalformedNotebookError: If the file is not a well-formed JSON object with a list of cells.
+        """
+        from mltc.compact import CompactCell
+
+        index = 0
+        while True:
+            while index >= len(self._spans):
+                if self._scanned:
+                    return
+                next(self._scanner, None)
+            start, end = self._spans[index]
+            cell = CompactCell(jsonio.loads(self._buffer[start:end]))
+            self._release(start, end)
+            yield cell
+            index += 1
+
+    def _scan_all(self) -> None:
+        for _ in self._scanner:
+            pass
+
+    def _release(self, start: int, end: int) -> None:
+        """Drops the mapped pages of a parsed range from memory; they are read from the file again if needed."""
+        if self._mmap is not None and hasattr(mmap, "MADV_DONTNEED"):
+            offset = start - start % mmap.PAGESIZE
+            self._mmap.madvise(mmap.MADV_DONTNEED, offset, end - offset)
+
+    def _parse(self, data: bytes) -> object:
+        try:
+            return jsonio.loads(data)
+        except ValueError as err:
+            raise MalformedNotebookError(self.path, str(err)) from err
+
+    def _token(self, position: int) -> tuple[bytes, int]:
+        match = _TOKEN.match(self._buffer, position)
+        if match is None:
+            raise MalformedNotebookError(self.path, "unexpected end of file")
+        return match.group(1), match.end()
+
+    def _next_item(self, position: int, closing: bytes) -> tuple[bytes, int]:
+        """Reads the separator after a value, and returns the first token of the next item or the closing bracket."""
+        token, position = self._token(position)
+        if token == b",":
+            return self._token(position)
+        if token != closing:
+            raise MalformedNotebookError(self.path, f"expected ',' or {closing.decode()!r}")
+        return token, position
+
+    def _skip(self, position: int) -> int:
+        """Returns the position after the end of the object or array whose opening bracket ends at ``position``."""
+        depth = 1
+        while depth:
+            match = _STRUCTURE.search(self._buffer, position)
+            if match is None:
+                raise MalformedNotebookError(self.path, "unexpected end of file")
+            position = match.end()
+            if match.group() == b'"':
+                position = self._skip_string(position)
+            else:
+                depth += 1 if match.group() in _OPENING else -1
+        return position
+
+    def _skip_string(self, position: int) -> int:
+        """Returns the position after the end of the string whose opening quote ends at ``position``.
+
+        Strings, such as base64 encoded images, make up most of a large notebook, so they are skipped by searching
+        for the next quote rather than by looking at every character.
+        """
+        while True:
+            end = self._buffer.find(b'"', position)
+            if end < 0:
+                raise MalformedNotebookError(self.path, "unexpected end of file")
+            backslashes = 0
+            while self._buffer[end - 1 - backslashes] == ord("\\"):
+                backslashes += 1
+            position = end + 1
+            if backslashes % 2 == 0:  # the quote is not escaped
+                return position
+
+    def _scan(self) -> Iterator[bool]:
+        """Scans the top-level object, recording cell positions and parsing the other fields.
+
+        Yields True after each cell it finds, so that cells can be parsed before the rest of the file is scanned.
+        """
+        try:
+            token, position = self._token(0)
+            if token != b"{":
+                raise MalformedNotebookError(self.path, "expected an object")
+            token, position = self._token(position)
+            while token != b"}":
+                if not token.startswith(b'"'):
+                    raise MalformedNotebookError(self.path, "expected a key")
+                position = yield from self._scan_field(self._parse(token), position)
+                token, position = self._next_item(position, b"}")
+        finally:
+            self._scanned = True
+
+    def _scan_field(self, key: str, position: int) -> Iterator[bool]:
+        colon, position = self._token(position)
+        if colon != b":":
+            raise MalformedNotebookError(self.path, f"expected ':' after {key!r}")
+        start = position
+        token, position = self._token(position)
+        if key == "cells" and token == b"[":
+            return (yield from self._scan_cells(position))
+        if token in _OPENING:
+            position = self._skip(position)
+        self._fields[key] = self._parse(self._buffer[start:position])
+        return position
+
+    def _scan_cells(self, position: int) -> Iterator[bool]:
+        token, position = self._token(position)
+        while token != b"]":
+            if token != b"{":
+                raise MalformedNotebookError(self.path, "expected the cells to be objects")
+            start = position - 1
+            position = self._skip(position)
+            self._spans.append((start, position))
+            self._release(start, position)
+            yield True
+            token, position = self._next_item(position, b"]")
+        return position
+
+    def close(self) -> None:
+        """Closes the memory mapping of the file."""
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> "IncrementalNotebook":
+        """Returns the open notebook."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Closes the notebook."""
+        self.close()
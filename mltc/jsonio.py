@@ -0,0 +1,44 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def loads(data: bytes | str) -> object:
+    """Parses JSON, using orjson when it is installed.
+
+    Args:
+        data (bytes | str): The JSON document. Bytes are parsed directly, without being decoded to a string first.
+
+    Returns:
+        object: The parsed value.
+
+    Raises:
+        ValueError: If the data is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: object, *, sort_keys: bool = False) -> bytes:
+    """Serializes a value as compact JSON, using orjson when it is installed.
+
+    Both serializers produce the same bytes for the values mltc stores: no insignificant whitespace and UTF-8
+    without escaping non-ASCII characters.
+
+    Args:
+        value (object): The value to serialize.
+        sort_keys (bool): Whether to sort the keys of objects, for a canonical representation.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON representation of the value.
+
+    Raises:
+        TypeError: If the value is not JSON serializable.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(value, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode()
@@ -0,0 +1,149 @@
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mltc.fingerprint import BuildFingerprint
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+
+class _PathLock:
+    """The lock of one output path within this process, and the lock file it holds for other processes."""
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_path_locks: dict[Path, _PathLock] = {}
+_path_locks_lock = threading.Lock()
+
+
+def lock_path(path: str | Path) -> Path:
+    """Returns the lock file of an output path: a hidden file next to it, present only while the lock is held.
+
+    Args:
+        path (str | Path): The output path.
+
+    Returns:
+        Path: The path of the lock file.
+    """
+    path = Path(path)
+    return path.with_name(f".{path.name}.lock")
+
+
+def _lock_file(path: Path) -> int:
+    """Opens and locks the lock file, retrying if the holder it waited for removed the file in the meantime."""
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            locked = os.fstat(fd)
+            current = path.stat()
+        except FileNotFoundError:
+            os.close(fd)
+            continue
+        except BaseException:
+            os.close(fd)
+            raise
+        if (locked.st_dev, locked.st_ino) == (current.st_dev, current.st_ino):
+            return fd
+        os.close(fd)
+
+
+def _unlock_file(path: Path, fd: int) -> None:
+    """Removes the lock file while it is still locked, so that waiters see it is gone, and then unlocks it."""
+    try:
+        path.unlink(missing_ok=True)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+@contextmanager
+def output_lock(path: str | Path) -> Iterator[None]:
+    """Holds an exclusive lock on an output path, for as long as it is written or built.
+
+    Threads of this process are serialized by a lock per path, and processes by an advisory ``flock`` on a hidden
+    lock file next to the output, which is removed when the lock is released. The lock is reentrant, so a build
+    holding it can write its output with NotebookWriter, which takes it too. Where ``fcntl`` is not available,
+    only the threads of this process are serialized.
+
+    Example:
+        .. code-block:: python
+
+            with output_lock("merged.ipynb"):
+                ...
+
+    Args:
+        path (str | Path): The output path.
+
+    Raises:
+        OSError: If the lock file cannot be created.
+    """
+    path = Path(path).absolute()
+    with _path_locks_lock:
+        path_lock = _path_locks.setdefault(path, _PathLock())
+    with path_lock.lock:
+        if path_lock.depth == 0 and fcntl is not None:
+            path_lock.fd = _lock_file(lock_path(path))
+        path_lock.depth += 1
+        try:
+            yield
+        finally:
+            path_lock.depth -= 1
+            if path_lock.depth == 0 and path_lock.fd is not None:
+                fd, path_lock.fd = path_lock.fd, None
+                _unlock_file(lock_path(path), fd)
+
+
+def _version(path: str | Path) -> tuple[int, int, int] | None:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def build_lock(path: str | Path, fingerprint: "BuildFingerprint | None", *, force: bool = False) -> Iterator[bool]:
+    """Holds the lock of an output while it is built, coalescing concurrent builds of the same inputs.
+
+    Whoever gets the lock first builds the output; the others wait for it. Once they get the lock, they check the
+    fingerprint recorded in the output again, and skip their build if the output was built from the same inputs
+    meanwhile. A forced build is only skipped if the output was replaced while it waited, so that concurrent
+    forced builds are coalesced too, but a forced build on its own always goes ahead.
+
+    Example:
+        .. code-block:: python
+
+            with build_lock(output_path, fingerprint) as needed:
+                if needed:
+                    ...  # merge and write the output
+
+    Args:
+        path (str | Path): The output path.
+        fingerprint (BuildFingerprint | None): The fingerprint of the build, or None if it is not known, in which
+                                               case the build always goes ahead.
+        force (bool): Whether to build even if the output is up to date, unless it was built while waiting.
+
+    Yields:
+        bool: Whether the output still needs to be built.
+
+    Raises:
+        OSError: If the lock file cannot be created.
+    """
+    before = _version(path)
+    with output_lock(path):
+        coalesced = (
+            fingerprint is not None and (not force or _version(path) != before) and fingerprint.is_up_to_date(str(path))
+        )
+        yield not coalesced
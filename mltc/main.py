@@ -1,26 +1,42 @@
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-import nbformat
 
-from mltc.merger import NotebookMerger
+from mltc import packs, profiling
+from mltc.locking import build_lock
 from mltc.parser import IndexParser, InvalidIndexError, InvalidInputError
-from mltc.reader import NotebookReader
+from mltc.registry import RegistryError, TemplateRegistry, is_registry_url
+from mltc.search import InvalidQueryError
 from mltc.selector import NotebookSelector
-from mltc.validator import NotebookValidator
-from mltc.writer import NotebookWriter
+from mltc.spill import DEFAULT_SPILL_THRESHOLD
 
+# Modules that import nbformat (and through it jsonschema) are imported where they are first needed, so that
+# listing templates and checking for up-to-date outputs stay fast.
+if TYPE_CHECKING:
+    from mltc.fingerprint import BuildFingerprint
+    from mltc.reader import ReadResult
+    from mltc.transforms import TransformPipeline
+    from mltc.validator import NotebookValidator
+    from mltc.watch import TemplateWatcher
 
-def _select_notebooks(directory: Path) -> list:
+
+def _select_notebooks(directory: Path, query: str | None = None) -> list:
     """Display available notebooks and prompt the user for selection.
 
+    With a query, the notebooks that match it are selected in catalog order instead, without prompting.
+
     Args:
         directory (Path): The directory from which to list notebooks.
+        query (str | None): A search query selecting the notebooks, if any.
 
     Returns:
         list: A list of selected notebook paths.
     """
     notebook_selector = NotebookSelector(directory)
+    if query is not None:
+        return _search_notebooks(notebook_selector, query)
     notebook_selector.display_notebooks()
     indices = click.prompt(
         "Please enter the indices of the notebooks to merge, separated by spaces (e.g. 3 1 2)",
@@ -44,46 +60,314 @@ def _select_notebooks(directory: Path) -> list:
     return [notebooks[idx] for idx in selected_indices]
 
 
-def _read_notebooks(selected_notebooks: list[str]) -> list[nbformat.NotebookNode]:
-    """Read the selected notebooks and return a list of notebook objects.
+def _resolve_templates_dir(ctx: click.Context, templates_dir: str, *, offline: bool) -> Path:
+    """Resolve the templates directory, syncing a template registry into its local copy and reporting what changed.
+
+    The report is written to standard error, so that the output of ``--list`` stays the same as for a directory. If
+    the registry cannot be synced, the error is reported and the command exits.
+
+    Args:
+        ctx (click.Context): The click context, used to exit on errors.
+        templates_dir (str): The templates directory, template pack or registry URL.
+        offline (bool): Whether to use the local copy of a registry without connecting to it.
+
+    Returns:
+        Path: The templates directory or pack, or the local copy of the registry.
+    """
+    if not is_registry_url(templates_dir):
+        return Path(templates_dir).resolve()
+    registry = TemplateRegistry(templates_dir, offline=offline)
+    try:
+        directory = registry.sync()
+    except RegistryError as e:
+        click.echo(str(e), err=True)
+        ctx.exit(1)
+    url = templates_dir
+    if offline:
+        click.echo(f"Using the local copy of {url}.", err=True)
+    else:
+        click.echo(
+            f"Synced {url}: {registry.downloaded} downloaded, {registry.unchanged} unchanged, "
+            f"{registry.removed} removed.",
+            err=True,
+        )
+    return directory
+
+
+def _search_notebooks(notebook_selector: NotebookSelector, query: str) -> list:
+    """Select the notebooks that match a search query, and report the selection.
+
+    Args:
+        notebook_selector (NotebookSelector): The selector of the templates to search.
+        query (str): The search query.
+
+    Returns:
+        list: The paths of the matching notebooks, in catalog order.
+    """
+    try:
+        entries = notebook_selector.search(query)
+    except InvalidQueryError as e:
+        click.echo(str(e))
+        return []
+    if not entries:
+        click.echo(f"No templates match {query!r}.")
+        return []
+
+    click.echo(f"Selected {len(entries)} templates matching {query!r}:")
+    for entry in entries:
+        click.echo(f"  {entry.path}")
+    return [entry.path for entry in entries]
+
+
+def _read_notebooks(selected_notebooks: list[str]) -> "list[ReadResult]":
+    """Read the selected notebooks and return the ones that were read successfully.
+
+    The notebooks are read concurrently, as CompactNotebooks, since they are only merged and written. Notebooks that
+    cannot be read are reported and left out of the result.
 
     Args:
         selected_notebooks (list[str]): A list of paths to the selected notebooks.
 
     Returns:
-        list[nbformat.NotebookNode]: A list of notebook objects.
+        list[ReadResult]: The successful reads, each holding a notebook object and its path.
     """
-    reader = NotebookReader()
+    from mltc.reader import NotebookReader
+
     notebooks = []
-    for notebook_path in selected_notebooks:
-        try:
-            notebook = reader.read_notebook(notebook_path)
-            notebooks.append(notebook)
-        except FileNotFoundError as e:
-            click.echo(f"File not found: {e}")
-        except OSError as e:
-            click.echo(f"Unexpected error reading notebook {notebook_path}: {e}")
+    for result in NotebookReader.read_notebooks(selected_notebooks, compact=True):
+        if result.ok:
+            notebooks.append(result)
+        elif isinstance(result.error, FileNotFoundError):
+            click.echo(f"File not found: {result.error}")
+        elif isinstance(result.error, OSError):
+            click.echo(f"Unexpected error reading notebook {result.path}: {result.error}")
+        else:
+            click.echo(f"Invalid notebook {result.path}: {result.error}")
     return notebooks
 
 
-def _merge_and_save_notebooks(selected_notebooks: list[nbformat.NotebookNode], output_path: Path) -> None:
+def _check_fingerprint(
+    selected_notebooks: list[str], output_path: Path, *, force: bool, dry_run: bool, options: dict | None = None
+) -> "tuple[BuildFingerprint | None, bool]":
+    """Compare the selected notebooks with the fingerprint recorded in the output notebook.
+
+    Args:
+        selected_notebooks (list[str]): The paths of the selected notebooks, in merge order.
+        output_path (Path): The path where the merged notebook will be saved.
+        force (bool): Whether to rebuild the output even if it is up to date.
+        dry_run (bool): Whether to only report whether the output is stale.
+        options (dict | None): The build options that affect the output, such as the cell transforms.
+
+    Returns:
+        tuple[BuildFingerprint | None, bool]: The fingerprint of the build, or None if an input could not be read,
+                                              and whether the merge should go ahead.
+    """
+    from mltc.fingerprint import BuildFingerprint
+
+    try:
+        fingerprint = BuildFingerprint.compute([str(path) for path in selected_notebooks], options=options)
+    except OSError:
+        fingerprint = None
+    up_to_date = fingerprint is not None and fingerprint.is_up_to_date(str(output_path))
+
+    if dry_run:
+        click.echo(f"{'Up to date' if up_to_date else 'Stale'}: {output_path}")
+        return fingerprint, False
+    if up_to_date and not force:
+        click.echo(f"Merged notebook at {output_path} is up to date.")
+        return fingerprint, False
+    return fingerprint, True
+
+
+def _merge_and_save_notebooks(  # noqa: PLR0913
+    selected_notebooks: "list[ReadResult]",
+    output_path: Path,
+    validator: "NotebookValidator | None" = None,
+    *,
+    stream: bool = False,
+    fingerprint: "BuildFingerprint | None" = None,
+    validation_workers: int = 1,
+    transforms: "TransformPipeline | None" = None,
+) -> None:
     """Merge selected notebooks and save the result to a specified path.
 
     Args:
-        selected_notebooks (list[nbformat.NotebookNode]): A list of notebooks to be merged.
+        selected_notebooks (list[ReadResult]): The notebooks to be merged, as read by the NotebookReader.
         output_path (Path): The path where the merged notebook will be saved.
+        validator (NotebookValidator | None): The validator used by the merger. Defaults to a plain NotebookValidator.
+        stream (bool): Whether to stream the merged notebook to disk cell by cell with an atomic replace.
+        fingerprint (BuildFingerprint | None): The fingerprint of the build, recorded in the merged notebook.
+        validation_workers (int): The number of processes used to validate the notebooks.
+        transforms (TransformPipeline | None): The transforms applied to the cells as they are merged.
 
     Raises:
         RuntimeError: If an error occurs during the merging of notebooks.
         OSError: If an error occurs while writing the merged notebook to file.
     """
-    validator = NotebookValidator()
-    merger = NotebookMerger(validator=validator)
+    from mltc.merger import NotebookMerger
+    from mltc.validator import NotebookValidator
+    from mltc.writer import NotebookWriter
+
+    merger = NotebookMerger(
+        validator=validator or NotebookValidator(), max_workers=validation_workers, transforms=transforms
+    )
     writer = NotebookWriter()
 
     try:
-        merged_notebook = merger.merge_notebooks(selected_notebooks)
-        writer.write_notebook(merged_notebook, output_path)
+        merged_notebook = merger.merge_notebooks(
+            [result.notebook for result in selected_notebooks],
+            sources=[result.path for result in selected_notebooks],
+        )
+        if fingerprint is not None:
+            fingerprint.stamp(merged_notebook)
+        writer.write_notebook(merged_notebook, output_path, stream=stream)
+        click.echo(f"Merged notebook saved at {output_path}")
+    except OSError as e:
+        click.echo(f"Error writing to file {output_path}: {e}")
+    except Exception as e:  # noqa: BLE001
+        click.echo(f"Unexpected error during merging: {e}")
+
+
+def _build(  # noqa: PLR0913
+    selected_notebooks: list[Path],
+    output_path: Path,
+    validator: "NotebookValidator",
+    fingerprint: "BuildFingerprint | None",
+    *,
+    stream: bool,
+    force: bool,
+    update: bool,
+    incremental: bool,
+    memory_budget: int | None,
+    spill_threshold: int,
+    validation_workers: int,
+    transforms: "TransformPipeline",
+) -> None:
+    """Build the merged notebook by updating it, or by merging incrementally, within a memory budget or in memory.
+
+    The output is locked while it is built. A build that had to wait for a concurrent build of the same templates
+    is skipped, since the output it would write is already there.
+
+    Args:
+        selected_notebooks (list[Path]): The paths of the selected notebooks, in order.
+        output_path (Path): The path where the merged notebook will be saved.
+        validator (NotebookValidator): The validator used to check the notebooks.
+        fingerprint (BuildFingerprint | None): The fingerprint of the build, or None if an input could not be read.
+        stream (bool): Whether to stream the notebook to a temporary file that atomically replaces the output.
+        force (bool): Whether to build even if the output is up to date, unless it was built while waiting.
+        update (bool): Whether to update an existing merged notebook rather than overwrite it.
+        incremental (bool): Whether to read the templates and write the output one cell at a time.
+        memory_budget (int | None): The MiB of outputs to keep in memory while merging, if limited.
+        spill_threshold (int): The size in bytes above which outputs are always spilled with a memory budget.
+        validation_workers (int): The number of processes used to validate the selected notebooks.
+        transforms (TransformPipeline): The cell transforms to apply while merging.
+    """
+    with build_lock(output_path, fingerprint, force=force) as needed:
+        if not needed:
+            click.echo(f"Merged notebook at {output_path} was built by a concurrent run and is up to date.")
+            return
+        can_update = update and fingerprint is not None and output_path.exists()
+        if can_update and _update_notebook(output_path, validator, fingerprint, stream=stream, transforms=transforms):
+            return
+        if incremental:
+            _merge_incrementally(
+                selected_notebooks, output_path, validator, fingerprint=fingerprint, transforms=transforms
+            )
+            return
+        if memory_budget is not None:
+            _merge_within_budget(
+                selected_notebooks,
+                output_path,
+                validator,
+                memory_budget=memory_budget * 1024 * 1024,
+                spill_threshold=spill_threshold,
+                fingerprint=fingerprint,
+                transforms=transforms,
+            )
+            return
+        _merge_and_save_notebooks(
+            _read_notebooks(selected_notebooks),
+            output_path,
+            validator,
+            stream=stream,
+            fingerprint=fingerprint,
+            validation_workers=validation_workers,
+            transforms=transforms,
+        )
+
+
+def _update_notebook(
+    output_path: Path,
+    validator: "NotebookValidator",
+    fingerprint: "BuildFingerprint",
+    *,
+    stream: bool = False,
+    transforms: "TransformPipeline | None" = None,
+) -> bool:
+    """Update an existing merged notebook with the templates that changed, keeping the user's edits.
+
+    Args:
+        output_path (Path): The path to the merged notebook.
+        validator (NotebookValidator): The validator used to check the changed templates.
+        fingerprint (BuildFingerprint): The fingerprint of the selected templates.
+        stream (bool): Whether to stream the notebook to a temporary file that atomically replaces the output.
+        transforms (TransformPipeline | None): The cell transforms to apply to the changed templates.
+
+    Returns:
+        bool: False if the notebook cannot be updated in place and has to be merged again, True otherwise.
+    """
+    import nbformat
+
+    from mltc.merger import NotebookMerger, UntrackedNotebookError
+    from mltc.reader import NotebookReader
+    from mltc.writer import NotebookWriter
+
+    try:
+        existing = NotebookReader.read_notebook(str(output_path), compact=True)
+        updated = NotebookMerger(validator=validator, transforms=transforms).update_notebook(existing, fingerprint)
+    except UntrackedNotebookError as e:
+        click.echo(f"Cannot update {output_path}: {e}. Merging it again.")
+        return False
+    except (OSError, ValueError, nbformat.ValidationError, nbformat.NBFormatError) as e:
+        click.echo(f"Cannot read {output_path} to update it: {e}. Merging it again.")
+        return False
+
+    try:
+        NotebookWriter.write_notebook(updated, output_path, stream=stream)
+        click.echo(f"Updated notebook saved at {output_path}")
+    except OSError as e:
+        click.echo(f"Error writing to file {output_path}: {e}")
+    return True
+
+
+def _merge_incrementally(
+    selected_notebooks: list[Path],
+    output_path: Path,
+    validator: "NotebookValidator",
+    *,
+    fingerprint: "BuildFingerprint | None" = None,
+    transforms: "TransformPipeline | None" = None,
+) -> None:
+    """Merge the selected notebooks one cell at a time, streaming the merged cells to file as they are produced.
+
+    Args:
+        selected_notebooks (list[Path]): The paths of the selected notebooks, in order.
+        output_path (Path): The path where the merged notebook will be saved.
+        validator (NotebookValidator): The validator used to check the notebooks.
+        fingerprint (BuildFingerprint | None): The fingerprint of the build, recorded in the merged notebook.
+        transforms (TransformPipeline | None): The cell transforms to apply while merging.
+    """
+    from mltc.compact import CompactNotebook
+    from mltc.merger import NotebookMerger
+    from mltc.writer import NotebookWriter
+
+    merger = NotebookMerger(validator=validator, transforms=transforms)
+    merged_notebook = CompactNotebook()
+    if fingerprint is not None:
+        fingerprint.stamp(merged_notebook)
+    try:
+        cells = merger.iter_merged_cells([str(path) for path in selected_notebooks])
+        NotebookWriter.write_notebook(merged_notebook, output_path, cells=cells)
         click.echo(f"Merged notebook saved at {output_path}")
     except OSError as e:
         click.echo(f"Error writing to file {output_path}: {e}")
@@ -91,12 +375,232 @@ def _merge_and_save_notebooks(selected_notebooks: list[nbformat.NotebookNode], o
         click.echo(f"Unexpected error during merging: {e}")
 
 
-@click.command()
+def _merge_within_budget(  # noqa: PLR0913
+    selected_notebooks: list[Path],
+    output_path: Path,
+    validator: "NotebookValidator",
+    *,
+    memory_budget: int,
+    spill_threshold: int,
+    fingerprint: "BuildFingerprint | None" = None,
+    transforms: "TransformPipeline | None" = None,
+) -> None:
+    """Merge the selected notebooks one at a time, spilling large outputs to disk, and stream the result to file.
+
+    Args:
+        selected_notebooks (list[Path]): The paths of the selected notebooks, in order.
+        output_path (Path): The path where the merged notebook will be saved.
+        validator (NotebookValidator): The validator used to check the notebooks.
+        memory_budget (int): The total size in bytes of the outputs to keep in memory.
+        spill_threshold (int): The size in bytes above which outputs are always spilled.
+        fingerprint (BuildFingerprint | None): The fingerprint of the build, recorded in the merged notebook.
+        transforms (TransformPipeline | None): The cell transforms to apply while merging.
+    """
+    from mltc.merger import NotebookMerger
+    from mltc.spill import SpillStore
+    from mltc.writer import NotebookWriter
+
+    merger = NotebookMerger(validator=validator, transforms=transforms)
+    try:
+        with SpillStore(threshold=spill_threshold, budget=memory_budget, directory=str(output_path.parent)) as spill:
+            merged_notebook = merger.merge_paths([str(path) for path in selected_notebooks], spill=spill)
+            if fingerprint is not None:
+                fingerprint.stamp(merged_notebook)
+            NotebookWriter.write_notebook(
+                merged_notebook, output_path, cells=spill.restore_cells(merged_notebook.cells)
+            )
+        click.echo(f"Merged notebook saved at {output_path}")
+        if spill.spilled_outputs:
+            click.echo(f"Spilled {spill.spilled_outputs} outputs ({spill.spilled_bytes} bytes) to disk while merging.")
+    except OSError as e:
+        click.echo(f"Error writing to file {output_path}: {e}")
+    except Exception as e:  # noqa: BLE001
+        click.echo(f"Unexpected error during merging: {e}")
+
+
+def _watch(  # noqa: PLR0913
+    selected_notebooks: list[Path],
+    output_path: Path,
+    validator: "NotebookValidator",
+    *,
+    stream: bool = False,
+    force: bool = False,
+    transforms: "TransformPipeline | None" = None,
+    watcher: "TemplateWatcher | None" = None,
+    max_rebuilds: int | None = None,
+) -> None:
+    """Build the merged notebook, then rebuild it whenever selected templates change, until interrupted.
+
+    Only the templates that changed are read, validated and hashed again; the others are merged from memory. Every
+    build holds the output's build lock, so a rebuild waits for a concurrent build of the same output and is skipped
+    if that build left the output up to date.
+
+    Args:
+        selected_notebooks (list[Path]): The paths of the selected notebooks, in merge order.
+        output_path (Path): The path where the merged notebook will be saved.
+        validator (NotebookValidator): The validator used for notebooks that are new or changed.
+        stream (bool): Whether to stream the merged notebook to disk with an atomic replace.
+        force (bool): Whether to build the output at the start even if it is up to date.
+        transforms (TransformPipeline | None): The transforms applied to the cells as they are merged.
+        watcher (TemplateWatcher | None): The watcher to wait for changes with. Defaults to watching the selected
+                                          notebooks.
+        max_rebuilds (int | None): The number of rebuilds after which to stop. Defaults to watching until interrupted.
+    """
+    from mltc.fingerprint import BuildFingerprint
+    from mltc.validator import VerdictMemo
+    from mltc.watch import TemplateWatcher
+
+    memo = VerdictMemo(validator)
+    options = transforms.fingerprint_options() if transforms else {}
+    paths = [str(path) for path in selected_notebooks]
+    watcher = watcher or TemplateWatcher(selected_notebooks)
+    results = {}
+    fingerprint = None
+    changed = paths
+    rebuilds = 0
+    with watcher:
+        try:
+            while True:
+                started = time.perf_counter()
+                for path in changed:
+                    results.pop(path, None)
+                results.update((result.path, result) for result in _read_notebooks(changed))
+                try:
+                    if fingerprint is None:
+                        fingerprint = BuildFingerprint.compute(paths, options=options)
+                    else:
+                        fingerprint = fingerprint.with_changes(changed)
+                except OSError:
+                    fingerprint = None
+                with build_lock(output_path, fingerprint, force=force and rebuilds == 0) as needed:
+                    if needed:
+                        notebooks = [results[path] for path in paths if path in results]
+                        _merge_and_save_notebooks(
+                            notebooks, output_path, memo, stream=stream, fingerprint=fingerprint, transforms=transforms
+                        )
+                        memo.retain(result.notebook for result in notebooks)
+                        latency = (time.perf_counter() - started) * 1000
+                        verb = "Rebuilt" if rebuilds else "Built"
+                        click.echo(f"{verb} in {latency:.0f} ms ({len(changed)} of {len(paths)} notebooks read).")
+                    else:
+                        click.echo(f"Merged notebook at {output_path} is up to date.")
+
+                if max_rebuilds is not None and rebuilds >= max_rebuilds:
+                    return
+                if rebuilds == 0:
+                    click.echo(
+                        f"Watching {len(paths)} templates for changes ({watcher.backend}). Press Ctrl+C to stop."
+                    )
+                changed = [str(path) for path in watcher.wait()]
+                rebuilds += 1
+        except KeyboardInterrupt:
+            click.echo("Stopped watching.")
+
+
+def _start_profiler(ctx: click.Context, cprofile_path: str | None, report_format: str | None) -> None:
+    """Start profiling the pipeline and report the measurements once the command, including subcommands, finishes.
+
+    Args:
+        ctx (click.Context): The click context, which stops the profiler when it is closed.
+        cprofile_path (str | None): The file to dump cProfile statistics to, if any.
+        report_format (str | None): The format of the report, either "table" or "json", or None to not report.
+    """
+    profiler = profiling.Profiler(cprofile_path=cprofile_path)
+
+    def report() -> None:
+        try:
+            profiler.stop()
+        except OSError as e:
+            click.echo(f"Error writing profile to {cprofile_path}: {e}", err=True)
+        if report_format == "json":
+            click.echo(profiler.to_json(), err=True)
+        elif report_format == "table":
+            click.echo(profiler.format_table(), err=True)
+
+    profiler.start()
+    ctx.call_on_close(report)
+
+
+def _build_transforms(  # noqa: PLR0913
+    *,
+    drop_cell_types: tuple[str, ...],
+    drop_tags: tuple[str, ...],
+    clear_execution_counts: bool,
+    strip_outputs: bool,
+    max_output_bytes: int | None,
+    dedup: bool,
+    dedup_cell_types: tuple[str, ...],
+    dedup_tags: tuple[str, ...],
+    transform_names: tuple[str, ...],
+) -> "TransformPipeline":
+    """Build the cell transform pipeline selected on the command line.
+
+    Cells are dropped before the remaining transforms run, duplicates are dropped once the cells are cleaned up,
+    and transforms named with --transform run last. Restricting deduplication to cell types or tags enables it.
+
+    Returns:
+        TransformPipeline: The transforms to apply while merging, possibly none.
+
+    Raises:
+        UnknownTransformError: If a transform named with --transform is not registered.
+    """
+    from mltc.transforms import TransformPipeline
+
+    specs = []
+    if drop_cell_types:
+        specs.append(("drop-cell-types", {"cell_types": sorted(set(drop_cell_types))}))
+    if drop_tags:
+        specs.append(("drop-tags", {"tags": sorted(set(drop_tags))}))
+    if clear_execution_counts:
+        specs.append(("clear-execution-counts", {}))
+    if strip_outputs:
+        specs.append(("strip-outputs", {}))
+    if max_output_bytes is not None:
+        specs.append(("cap-outputs", {"max_bytes": max_output_bytes}))
+    if dedup or dedup_cell_types or dedup_tags:
+        specs.append(("dedup", {"cell_types": sorted(set(dedup_cell_types)), "tags": sorted(set(dedup_tags))}))
+    specs.extend((name, {}) for name in transform_names)
+    return TransformPipeline(specs)
+
+
+class _TemplatesSource(click.Path):
+    """A templates directory or template pack, which must exist, or the URL of a template registry."""
+
+    def convert(self, value: str, param: click.Parameter | None, ctx: click.Context | None) -> str:
+        """Returns a registry URL as it is, and checks and resolves a path like click.Path."""
+        if is_registry_url(value):
+            return value
+        return super().convert(value, param, ctx)
+
+
+def _check_templates_dir(_ctx: click.Context, _param: click.Parameter, value: str) -> str:
+    """Accepts a templates directory or registry URL, or a file only if it is a readable template pack.
+
+    Raises:
+        click.BadParameter: If the value is a file that is not a zip or tar template pack.
+    """
+    if is_registry_url(value) or Path(value).is_dir():
+        return value
+    try:
+        packs.open_pack(value)
+    except (packs.InvalidPackError, OSError) as err:
+        raise click.BadParameter(str(err)) from err
+    return value
+
+
+@click.group(invoke_without_command=True)
 @click.option(
     "--templates-dir",
     default=str(Path(__file__).resolve().parent / "templates"),
-    type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True, resolve_path=True),
-    help="Directory containing Jupyter notebook templates.",
+    type=_TemplatesSource(exists=True, file_okay=True, dir_okay=True, readable=True, resolve_path=True),
+    callback=_check_templates_dir,
+    help="Directory containing Jupyter notebook templates, a .zip or .tar template pack, or the http(s) URL of a "
+    "template registry's manifest.",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Use the local copy of the template registry given with --templates-dir without connecting to it.",
 )
 @click.option(
     "--output-path",
@@ -104,22 +608,397 @@ def _merge_and_save_notebooks(selected_notebooks: list[nbformat.NotebookNode], o
     type=click.Path(exists=False, writable=True, dir_okay=False, resolve_path=True),
     help="Output path for the merged notebook.",
 )
-def main(templates_dir: click.Path, output_path: click.Path) -> None:
+@click.option(
+    "--validation-cache/--no-validation-cache",
+    default=False,
+    help="Reuse validation verdicts of unchanged notebooks from an on-disk cache.",
+)
+@click.option(
+    "--clear-validation-cache",
+    is_flag=True,
+    help="Remove all cached validation verdicts before running.",
+)
+@click.option(
+    "--validator-engine",
+    default="nbformat",
+    type=click.Choice(["nbformat", "compiled"]),
+    help="Validate whole notebooks with nbformat, or the envelope and each cell against a precompiled schema.",
+)
+@click.option(
+    "--validation-workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Validate the selected notebooks in this many processes. Small selections are validated in process.",
+)
+@click.option("--strip-outputs", is_flag=True, help="Remove the outputs of code cells.")
+@click.option("--clear-execution-counts", is_flag=True, help="Reset the execution counts of code cells.")
+@click.option("--drop-tag", "drop_tags", multiple=True, help="Leave out cells with this tag. Can be repeated.")
+@click.option(
+    "--drop-cell-type",
+    "drop_cell_types",
+    multiple=True,
+    type=click.Choice(["code", "markdown", "raw"]),
+    help="Leave out cells of this type. Can be repeated.",
+)
+@click.option(
+    "--max-output-bytes",
+    default=None,
+    type=click.IntRange(min=0),
+    help="Replace outputs larger than this many bytes, such as embedded images, with a short note.",
+)
+@click.option(
+    "--dedup",
+    is_flag=True,
+    help="Leave out cells that repeat an earlier cell's source and attachments, and repeated attachments.",
+)
+@click.option(
+    "--dedup-cell-type",
+    "dedup_cell_types",
+    multiple=True,
+    type=click.Choice(["code", "markdown", "raw"]),
+    help="Only deduplicate cells of this type. Can be repeated. Implies --dedup.",
+)
+@click.option(
+    "--dedup-tag",
+    "dedup_tags",
+    multiple=True,
+    help="Only deduplicate cells with this tag. Can be repeated. Implies --dedup.",
+)
+@click.option(
+    "--transform",
+    "transform_names",
+    multiple=True,
+    help="Apply a registered cell transform, after the built-in ones. Can be repeated.",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Write the merged notebook cell by cell to a temporary file that atomically replaces the output path.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Read the templates one cell at a time from memory-mapped files and stream the merged cells to the output, "
+    "so that no notebook is held in memory whole.",
+)
+@click.option(
+    "--memory-budget",
+    default=None,
+    type=click.IntRange(min=0),
+    help="Merge the templates one at a time and keep at most this many MiB of outputs in memory, spilling the rest "
+    "to a temporary file next to the output.",
+)
+@click.option(
+    "--spill-threshold",
+    default=DEFAULT_SPILL_THRESHOLD,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="With --memory-budget, always spill outputs larger than this many bytes.",
+)
+@click.option(
+    "--update",
+    is_flag=True,
+    help="Update an existing merged notebook instead of overwriting it: only the sections of changed templates are "
+    "replaced, new templates are appended and cells you added or edited are kept.",
+)
+@click.option("--force", is_flag=True, help="Rebuild merged notebooks even if their inputs are unchanged.")
+@click.option("--dry-run", is_flag=True, help="Only report which merged notebooks are stale.")
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and rebuild the merged notebook whenever one of the selected templates changes.",
+)
+@click.option(
+    "--query",
+    default=None,
+    help="Select the templates whose contents match a search query, such as 'tag:classification heading:\"Missing "
+    "Data\"', instead of prompting. With --list, only list the matching templates.",
+)
+@click.option(
+    "--list",
+    "list_templates",
+    is_flag=True,
+    help="List the available templates and exit, without loading the notebook libraries.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report wall time, CPU time, bytes read and written, cells and peak RSS for each stage and notebook.",
+)
+@click.option(
+    "--profile-format",
+    default="table",
+    type=click.Choice(["table", "json"]),
+    help="Format of the --profile report, which is written to standard error.",
+)
+@click.option(
+    "--cprofile",
+    "cprofile_path",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+    help="Run the whole pipeline under cProfile and dump the statistics to this file.",
+)
+@click.pass_context
+def main(  # noqa: PLR0913
+    ctx: click.Context,
+    templates_dir: click.Path,
+    offline: bool,  # noqa: FBT001
+    output_path: click.Path,
+    validation_cache: bool,  # noqa: FBT001
+    clear_validation_cache: bool,  # noqa: FBT001
+    validator_engine: str,
+    validation_workers: int,
+    strip_outputs: bool,  # noqa: FBT001
+    clear_execution_counts: bool,  # noqa: FBT001
+    drop_tags: tuple[str, ...],
+    drop_cell_types: tuple[str, ...],
+    max_output_bytes: int | None,
+    dedup: bool,  # noqa: FBT001
+    dedup_cell_types: tuple[str, ...],
+    dedup_tags: tuple[str, ...],
+    transform_names: tuple[str, ...],
+    stream: bool,  # noqa: FBT001
+    incremental: bool,  # noqa: FBT001
+    memory_budget: int | None,
+    spill_threshold: int,
+    update: bool,  # noqa: FBT001
+    force: bool,  # noqa: FBT001
+    dry_run: bool,  # noqa: FBT001
+    watch: bool,  # noqa: FBT001
+    query: str | None,
+    list_templates: bool,  # noqa: FBT001
+    profile: bool,  # noqa: FBT001
+    profile_format: str,
+    cprofile_path: click.Path | None,
+) -> None:
     """Main function to execute the notebook merging tool.
 
+    Without a subcommand, the available templates are listed and the user is prompted for the ones to merge.
+
     Args:
-        templates_dir (click.Path): The directory containing notebook templates.
+        ctx (click.Context): The click context, used to share the templates directory with subcommands.
+        templates_dir (click.Path): The directory containing notebook templates, a template pack, or the URL of a
+                                    template registry.
+        offline (bool): Whether to use the local copy of a template registry without connecting to it.
         output_path (click.Path): The path where the merged notebook will be saved.
+        validation_cache (bool): Whether to use the on-disk validation cache.
+        clear_validation_cache (bool): Whether to clear the validation cache before running.
+        validator_engine (str): The validation engine to use, either "nbformat" or "compiled".
+        validation_workers (int): The number of processes used to validate the selected notebooks.
+        strip_outputs (bool): Whether to remove the outputs of code cells.
+        clear_execution_counts (bool): Whether to reset the execution counts of code cells.
+        drop_tags (tuple[str, ...]): Tags of cells to leave out.
+        drop_cell_types (tuple[str, ...]): Types of cells to leave out.
+        max_output_bytes (int | None): The size above which outputs are replaced with a note.
+        dedup (bool): Whether to leave out duplicate cells and attachments.
+        dedup_cell_types (tuple[str, ...]): The cell types to deduplicate, if not all of them.
+        dedup_tags (tuple[str, ...]): The tags of the cells to deduplicate, if not all cells.
+        transform_names (tuple[str, ...]): Registered cell transforms to apply.
+        stream (bool): Whether to stream the merged notebook to disk with an atomic replace.
+        incremental (bool): Whether to read the templates and write the output one cell at a time.
+        memory_budget (int | None): The MiB of outputs to keep in memory while merging one template at a time, if
+                                    limited.
+        spill_threshold (int): The size in bytes above which outputs are always spilled with a memory budget.
+        update (bool): Whether to update an existing merged notebook rather than overwrite it.
+        force (bool): Whether to rebuild merged notebooks even if their inputs are unchanged.
+        dry_run (bool): Whether to only report which merged notebooks are stale.
+        watch (bool): Whether to rebuild the merged notebook whenever a selected template changes.
+        query (str | None): A search query selecting the templates to merge, or the templates to list.
+        list_templates (bool): Whether to only list the available templates.
+        profile (bool): Whether to report measurements of each pipeline stage when the command finishes.
+        profile_format (str): The format of the profiling report, either "table" or "json".
+        cprofile_path (click.Path | None): The file to dump cProfile statistics to, if any.
     """
-    templates_dir = Path(templates_dir).resolve()
     output_path = Path(output_path).resolve()
+    if profile or cprofile_path is not None:
+        _start_profiler(ctx, cprofile_path, profile_format if profile else None)
+    templates_dir = _resolve_templates_dir(ctx, str(templates_dir), offline=offline)
+    if list_templates:
+        try:
+            NotebookSelector(templates_dir).display_notebooks(query=query)
+        except InvalidQueryError as e:
+            click.echo(str(e))
+            ctx.exit(1)
+        return
+
+    from mltc.cache import ValidationCache
+    from mltc.engine import CompiledSchemaEngine
+    from mltc.validator import NotebookValidator
+
+    cache = ValidationCache() if validation_cache or clear_validation_cache else None
+    if clear_validation_cache:
+        cache.clear()
+        click.echo("Validation cache cleared.")
+    validator = NotebookValidator(
+        cache=cache if validation_cache else None,
+        engine=CompiledSchemaEngine() if validator_engine == "compiled" else None,
+    )
+    from mltc.transforms import UnknownTransformError
+
+    try:
+        transforms = _build_transforms(
+            drop_cell_types=drop_cell_types,
+            drop_tags=drop_tags,
+            clear_execution_counts=clear_execution_counts,
+            strip_outputs=strip_outputs,
+            max_output_bytes=max_output_bytes,
+            dedup=dedup,
+            dedup_cell_types=dedup_cell_types,
+            dedup_tags=dedup_tags,
+            transform_names=transform_names,
+        )
+    except UnknownTransformError as e:
+        click.echo(f"Invalid transform: {e}")
+        ctx.exit(1)
 
-    selected_notebooks = _select_notebooks(templates_dir)
+    ctx.obj = {
+        "templates_dir": templates_dir,
+        "validator": validator,
+        "transforms": transforms,
+        "stream": stream,
+        "force": force,
+        "dry_run": dry_run,
+    }
+    if ctx.invoked_subcommand is not None:
+        return
+
+    selected_notebooks = _select_notebooks(templates_dir, query)
     if not selected_notebooks:
         return
+    if watch and not dry_run:
+        _watch(selected_notebooks, output_path, validator, stream=stream, force=force, transforms=transforms)
+        return
+
+    fingerprint, build = _check_fingerprint(
+        selected_notebooks, output_path, force=force, dry_run=dry_run, options=transforms.fingerprint_options()
+    )
+    if not build:
+        return
+    _build(
+        selected_notebooks,
+        output_path,
+        validator,
+        fingerprint,
+        stream=stream,
+        force=force,
+        update=update,
+        incremental=incremental,
+        memory_budget=memory_budget,
+        spill_threshold=spill_threshold,
+        validation_workers=validation_workers,
+        transforms=transforms,
+    )
+
+
+@main.command()
+@click.argument(
+    "manifest",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, resolve_path=True),
+)
+@click.option(
+    "--workers",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Number of worker processes. Defaults to the number of CPU cores.",
+)
+@click.pass_context
+def batch(ctx: click.Context, manifest: click.Path, workers: int | None) -> None:
+    """Build every notebook described in a JSON manifest without prompting.
+
+    The manifest is a list of entries, each with an "output" path and an ordered list of "templates" relative to
+    the templates directory. Exits with a non-zero status if any entry fails.
+
+    Args:
+        ctx (click.Context): The click context carrying the templates directory.
+        manifest (click.Path): The path to the batch manifest.
+        workers (int | None): The number of worker processes to use.
+    """
+    from mltc.batch import BatchBuilder, BatchResult, InvalidManifestError, read_manifest
+
+    try:
+        entries = read_manifest(str(manifest), str(ctx.obj["templates_dir"]))
+    except (InvalidManifestError, OSError) as e:
+        click.echo(f"Error reading manifest: {e}")
+        ctx.exit(1)
+
+    builder = BatchBuilder(
+        max_workers=workers,
+        validator=ctx.obj["validator"],
+        stream=ctx.obj["stream"],
+        force=ctx.obj["force"],
+        dry_run=ctx.obj["dry_run"],
+        transforms=ctx.obj["transforms"],
+    )
+    results = builder.build(entries)
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.ok:
+            click.echo(f"{result.status.upper()}: {result.output_path}")
+        else:
+            click.echo(f"FAILED: {result.output_path}: {result.error}")
+
+    summary = ", ".join(f"{count} {status}" for status, count in counts.items())
+    click.echo(f"Processed {len(results)} notebooks: {summary}.")
+    if counts.get(BatchResult.FAILED):
+        ctx.exit(1)
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Host to listen on.")
+@click.option("--port", default=8765, show_default=True, type=click.IntRange(min=0, max=65535), help="Port.")
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    type=click.Path(dir_okay=False, resolve_path=True),
+    help="Listen on a Unix socket instead of a TCP port.",
+)
+@click.option(
+    "--output-dir",
+    default=None,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, writable=True, resolve_path=True),
+    help="Directory that merge requests may write notebooks to. Without it, merged notebooks are only returned.",
+)
+@click.option("--verbose", is_flag=True, help="Log every request to standard error.")
+@click.pass_context
+def serve(  # noqa: PLR0913
+    ctx: click.Context,
+    host: str,
+    port: int,
+    socket_path: click.Path | None,
+    output_dir: click.Path | None,
+    verbose: bool,  # noqa: FBT001
+) -> None:
+    """Run a merge server that keeps parsed and validated templates in memory.
 
-    selected_notebooks = _read_notebooks(selected_notebooks)
-    _merge_and_save_notebooks(selected_notebooks, output_path)
+    Templates are identified by their path relative to the templates directory. See the README for the API.
+
+    Args:
+        ctx (click.Context): The click context carrying the templates directory and the validator.
+        host (str): The host to listen on.
+        port (int): The TCP port to listen on.
+        socket_path (click.Path | None): The Unix socket to listen on instead of a TCP port.
+        output_dir (click.Path | None): The directory merge requests may write notebooks to.
+        verbose (bool): Whether to log every request.
+    """
+    from mltc.server import MergeServer, TemplateStore
+
+    store = TemplateStore(str(ctx.obj["templates_dir"]), validator=ctx.obj["validator"])
+    server = MergeServer(
+        store, output_dir=output_dir, stream=ctx.obj["stream"], verbose=verbose, transforms=ctx.obj["transforms"]
+    )
+    try:
+        address = server.bind(host=host, port=port, socket_path=socket_path)
+    except OSError as e:
+        click.echo(f"Error starting server: {e}")
+        ctx.exit(1)
+
+    click.echo(f"Serving templates from {store.directory} on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("Server stopped.")
 
 
 if __name__ == "__main__":
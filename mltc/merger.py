@@ -1,8 +1,33 @@
+import hashlib
+import json
+import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import click
 import nbformat
 
+from mltc import profiling
+from mltc.compact import CompactCell, CompactNotebook
+from mltc.fingerprint import METADATA_KEY, BuildFingerprint
+from mltc.incremental import IncrementalNotebook
+from mltc.reader import NotebookReader
+from mltc.spill import SpillStore
+from mltc.transforms import TransformPipeline
 from mltc.validator import NotebookValidationError, NotebookValidator
 
+# Cell ids as defined by nbformat 4.5.
+_CELL_ID = re.compile(r"[a-zA-Z0-9-_]{1,64}")
+
+
+class UntrackedNotebookError(Exception):
+    """Exception raised when a notebook cannot be updated because it does not record where its cells came from."""
+
+    def __init__(self) -> None:
+        """Initializes the UntrackedNotebookError."""
+        super().__init__("The notebook has no build fingerprint or source tags, so it cannot be updated in place")
+
 
 class NotebookMerger:
     """Merges multiple Jupyter notebooks into a single notebook.
@@ -12,21 +37,56 @@ class NotebookMerger:
     It utilizes the NotebookValidator to ensure that each notebook is valid before merging.
     The merging process preserves the order of the notebooks.
 
+    With more than one worker, the notebooks are validated at the same time in a process pool, unless there are
+    fewer than ``PARALLEL_MIN_NOTEBOOKS`` notebooks or ``PARALLEL_MIN_CELLS`` cells in total, where starting the
+    pool would take longer than validating in process. Either way, the result and the reported errors are the same.
+
+    CompactNotebooks are merged without converting their cells to NotebookNodes, unless there are transforms to
+    apply, and give a CompactNotebook. If the inputs are a mix, the result is a NotebookNode.
+
+    The merged notebook is an nbformat 4.5 notebook with unique cell ids, so that validating and saving it does not
+    have to repair them. Ids that are valid and not used by an earlier cell are kept. Cells without an id, such as
+    the cells of notebooks older than 4.5, and cells whose id is invalid or taken get a new id, derived from their
+    old id and a counter, so that merging the same inputs always gives the same ids. Renamed cells are copies; the
+    input notebooks are not modified.
+
+    When the sources of the notebooks are known, every merged cell is a copy tagged in its ``mltc`` metadata with
+    the template it came from and a hash of its content, which ``update_notebook`` uses to tell template cells
+    from cells the user added or edited.
+
     Attributes:
         validator (NotebookValidator): An instance of NotebookValidator used for validating and preprocessing
                                        notebooks before merging.
+        max_workers (int): The number of processes used to validate notebooks. 1 validates in this process.
+        transforms (TransformPipeline | None): The transforms applied to the cells of each valid notebook as they
+                                               are merged. Every merge runs a fresh copy, so that transforms such as
+                                               deduplication start from a clean state, and their summaries are
+                                               reported when the merge is done.
     """
 
-    def __init__(self, validator: NotebookValidator) -> None:
+    PARALLEL_MIN_NOTEBOOKS = 4
+    PARALLEL_MIN_CELLS = 2000
+
+    def __init__(
+        self, validator: NotebookValidator, max_workers: int = 1, transforms: TransformPipeline | None = None
+    ) -> None:
         """Initializes the NotebookMerger with a NotebookValidator.
 
         Args:
             validator (NotebookValidator): The notebook validator to be used for validating the notebooks
-                                           before merging them.
+                                           before merging them. For parallel validation it must be picklable.
+            max_workers (int): The number of processes used to validate notebooks. Defaults to validating in this
+                               process.
+            transforms (TransformPipeline | None): The transforms applied to the cells of each valid notebook, in a
+                                                   single pass, as they are merged. Defaults to copying cells as is.
         """
         self.validator = validator
+        self.max_workers = max_workers
+        self.transforms = transforms
 
-    def merge_notebooks(self, notebooks: list[nbformat.NotebookNode]) -> nbformat.NotebookNode:
+    def merge_notebooks(
+        self, notebooks: list[nbformat.NotebookNode | CompactNotebook], sources: list[str] | None = None
+    ) -> nbformat.NotebookNode | CompactNotebook:
         """Merges a list of Jupyter notebooks into a single notebook.
 
         This method sequentially processes each notebook in the provided list, validates and preprocesses
@@ -34,22 +94,381 @@ class NotebookMerger:
         notebook is returned in the Jupyter notebook format.
 
         Args:
-            notebooks (list[nbformat.NotebookNode]): A list of Jupyter notebooks to be merged into a single notebook.
+            notebooks (list[nbformat.NotebookNode | CompactNotebook]): A list of Jupyter notebooks to be merged into a
+                                                                      single notebook.
+            sources (list[str] | None): The paths or names of the notebooks, in the same order, used by the validator
+                                        to report which notebook an invalid cell came from.
+
+        Returns:
+            nbformat.NotebookNode | CompactNotebook: The merged notebook, represented as a NotebookNode object which
+                                                     is the standard format for Jupyter notebooks, or as a
+                                                     CompactNotebook if every input is one.
+        """
+        with profiling.stage("merge") as metrics:
+            merged = self._merge(notebooks, sources)
+            metrics.cells = len(merged.cells)
+        return merged
+
+    def _merge(
+        self, notebooks: list[nbformat.NotebookNode | CompactNotebook], sources: list[str] | None
+    ) -> nbformat.NotebookNode | CompactNotebook:
+        compact = bool(notebooks) and all(isinstance(notebook, CompactNotebook) for notebook in notebooks)
+        merged = CompactNotebook() if compact else nbformat.v4.new_notebook()
+        transforms = self.transforms.fresh() if self.transforms else None
+        if sources is None:
+            sources = [None] * len(notebooks)
+        for notebook, source, verdict in zip(notebooks, sources, self._verdicts(notebooks, sources), strict=True):
+            if _accepted(verdict):
+                merged.cells.extend(_tag_cells(self._cells(notebook.cells, transforms, compact=compact), source))
+        for summary in transforms.summaries() if transforms else ():
+            click.echo(summary)
+        _normalize_cell_ids(merged.cells)
+        return merged
+
+    def merge_paths(self, paths: list[str], spill: SpillStore | None = None) -> CompactNotebook:
+        """Reads and merges notebooks one at a time, so that only one input is held in memory at once.
+
+        Each input is read as a CompactNotebook, validated, transformed and released before the next one is read.
+        With a SpillStore, large outputs are moved to its spill file as the cells are merged; write the result with
+        ``NotebookWriter.write_notebook(merged, path, cells=spill.restore_cells(merged.cells))`` to read them back
+        one cell at a time. Notebooks are always validated in this process.
+
+        Args:
+            paths (list[str]): The ordered paths of the notebooks to merge.
+            spill (SpillStore | None): The store to spill large outputs to. Defaults to keeping them in memory.
 
         Returns:
-            nbformat.NotebookNode: The merged notebook, represented as a NotebookNode object which is
-                                   the standard format for Jupyter notebooks.
+            CompactNotebook: The merged notebook. Notebooks that cannot be read or are invalid are reported and left
+                             out, as in ``merge_notebooks``.
         """
-        merged = nbformat.v4.new_notebook()
-        for notebook in notebooks:
-            try:
-                if not self.validator.is_valid(notebook):
-                    continue  # Skip this notebook due to validation error
-                merged.cells.extend(notebook.cells)
-            except FileNotFoundError as err:
-                click.echo(f"File not found: {err}")
-                continue  # Skip this notebook and proceed with the next one
-            except NotebookValidationError as err:
-                click.echo(f"Validation error: {err}")
-                continue  # Skip this notebook due to validation error
+        with profiling.stage("merge") as metrics:
+            merged = CompactNotebook()
+            transforms = self.transforms.fresh() if self.transforms else None
+            for path in paths:
+                notebook = _read_compact(path)
+                if notebook is None or not _accepted(_verdict(self.validator, notebook, path)):
+                    continue
+                cells = _tag_cells(self._cells(notebook.cells, transforms, compact=True), path)
+                merged.cells.extend(map(spill.spill_cell, cells) if spill is not None else cells)
+                del notebook, cells  # release the input before the next one is read
+            for summary in transforms.summaries() if transforms else ():
+                click.echo(summary)
+            _normalize_cell_ids(merged.cells)
+            metrics.cells = len(merged.cells)
         return merged
+
+    def update_notebook(self, existing: CompactNotebook, fingerprint: BuildFingerprint) -> CompactNotebook:
+        """Updates a merged notebook in place of merging its templates again, keeping the user's changes.
+
+        Only the templates whose contents changed since the notebook was built, according to its build fingerprint,
+        are read, validated and transformed. Their sections are spliced in where their old cells were, and newly
+        selected templates are appended. Cells without a source tag, which the user added, and tagged cells whose
+        content no longer matches their hash, which the user edited, are kept: an edited cell takes the place of the
+        new template cell with the same key, which is its id in the template or, without ids, its position. All
+        other cells are kept as they are, without being converted or validated. Sections of templates that are no
+        longer selected are kept too. A template that cannot be read or is
+        invalid keeps its old section and its old fingerprint entry, so that the next update tries it again.
+
+        If the build options or the mltc version changed, every section is replaced.
+
+        Args:
+            existing (CompactNotebook): The merged notebook, as read from disk.
+            fingerprint (BuildFingerprint): The fingerprint of the templates to update it from.
+
+        Returns:
+            CompactNotebook: The updated notebook, stamped with the fingerprint of the sections it now contains.
+
+        Raises:
+            UntrackedNotebookError: If the notebook has no build fingerprint or none of its cells has a source tag.
+        """
+        recorded = BuildFingerprint.from_metadata(existing.metadata)
+        if recorded is None or not any(_source_tag(cell) for cell in existing.cells):
+            raise UntrackedNotebookError
+        previous = dict(recorded.inputs)
+        added = sum(path not in previous for path, _ in fingerprint.inputs)
+        if (recorded.version, recorded.options) != (fingerprint.version, fingerprint.options):
+            previous = {}
+        changed = [path for path, sha256 in fingerprint.inputs if previous.get(path) != sha256]
+
+        with profiling.stage("merge") as metrics:
+            transforms = self.transforms.fresh() if self.transforms else None
+            sections = {}
+            for path in changed:
+                notebook = _read_compact(path)
+                if notebook is not None and _accepted(_verdict(self.validator, notebook, path)):
+                    sections[path] = list(_tag_cells(self._cells(notebook.cells, transforms, compact=True), path))
+            for summary in transforms.summaries() if transforms else ():
+                click.echo(summary)
+            failed = set(changed) - set(sections)
+            cells, kept = _splice(existing.cells, sections)
+            cells.extend(cell for path, _ in fingerprint.inputs if path in sections for cell in sections.pop(path))
+            _normalize_cell_ids(cells)
+            metrics.cells = len(cells)
+
+        inputs = tuple(
+            (path, previous[path] if path in failed else sha256)
+            for path, sha256 in fingerprint.inputs
+            if path not in failed or path in previous
+        )
+        metadata = {**existing.metadata, METADATA_KEY: dict(existing.metadata.get(METADATA_KEY, {}))}
+        updated = CompactNotebook(cells, metadata, existing.nbformat, existing.nbformat_minor)
+        BuildFingerprint(inputs=inputs, version=fingerprint.version, options=fingerprint.options).stamp(updated)
+        click.echo(
+            f"Updated {len(changed) - added} and added {added} of {len(fingerprint.inputs)} templates, "
+            f"keeping {kept} edited cells."
+        )
+        return updated
+
+    def iter_merged_cells(self, paths: list[str]) -> Iterator[CompactCell]:
+        """Merges notebooks read incrementally, yielding the merged cells one at a time.
+
+        Each notebook is opened as an IncrementalNotebook, validated one cell at a time, and then read again as its
+        cells are transformed, tagged and yielded. Neither the inputs nor the merged notebook are ever held in
+        memory whole; pass the cells to ``NotebookWriter.write_notebook`` to stream them to disk as they are merged.
+
+        Cell ids are made unique as the cells are yielded, so a cell keeps its id unless an earlier cell has it. The
+        ids match those of ``merge_notebooks``, except where a template has a cell id that an earlier cell was
+        already renamed to, such as ``setup-1``: that cell is renamed in turn.
+
+        Args:
+            paths (list[str]): The ordered paths of the notebooks to merge.
+
+        Yields:
+            CompactCell: The merged cells. Notebooks that cannot be read or are invalid are reported and left out,
+                         as in ``merge_paths``.
+        """
+        transforms = self.transforms.fresh() if self.transforms else None
+        cell_ids = _CellIds()
+        for path in paths:
+            notebook = _open_incremental(path)
+            if notebook is None:
+                continue
+            with notebook:
+                if _accepted_incremental(self.validator, notebook, path):
+                    cells = _tag_cells(self._cells(notebook.iter_cells(), transforms, compact=True), path)
+                    yield from map(cell_ids.assign, cells)
+        for summary in transforms.summaries() if transforms else ():
+            click.echo(summary)
+
+    @staticmethod
+    def _cells(
+        cells: Iterable[nbformat.NotebookNode | CompactCell], transforms: TransformPipeline | None, *, compact: bool
+    ) -> Iterable[nbformat.NotebookNode | CompactCell]:
+        """Returns the cells of a notebook to merge, transformed, and converted to NotebookNodes where needed."""
+        if compact and not transforms:
+            return cells
+        cells = (cell.to_node() if isinstance(cell, CompactCell) else cell for cell in cells)
+        if transforms:
+            cells = transforms(cells)
+        return map(CompactCell, cells) if compact else cells
+
+    def _verdicts(
+        self, notebooks: list[nbformat.NotebookNode], sources: list[str | None]
+    ) -> Iterable[bool | Exception]:
+        """Validates the notebooks in order, in this process or in a process pool."""
+        check = partial(_verdict, self.validator)
+        cell_count = sum(
+            len(notebook.cells if isinstance(notebook, CompactNotebook) else notebook.get("cells", ()))
+            for notebook in notebooks
+            if isinstance(notebook, dict | CompactNotebook)
+        )
+        if (
+            self.max_workers <= 1
+            or len(notebooks) < self.PARALLEL_MIN_NOTEBOOKS
+            or cell_count < self.PARALLEL_MIN_CELLS
+        ):
+            return map(check, notebooks, sources)  # lazily, so messages interleave with merging as before
+
+        max_workers = min(self.max_workers, len(notebooks))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(check, notebooks, sources))
+
+
+def _accepted(verdict: bool | Exception) -> bool:
+    """Reports why a notebook is skipped, and returns True if it is merged."""
+    if isinstance(verdict, FileNotFoundError):
+        click.echo(f"File not found: {verdict}")
+        return False  # Skip this notebook and proceed with the next one
+    if isinstance(verdict, NotebookValidationError):
+        click.echo(f"Validation error: {verdict}")
+        return False  # Skip this notebook due to validation error
+    return bool(verdict)
+
+
+def _read_compact(path: str) -> CompactNotebook | None:
+    """Reads a notebook for ``merge_paths``, reporting read errors as the CLI does."""
+    try:
+        return NotebookReader.read_notebook(path, compact=True)
+    except FileNotFoundError as err:
+        click.echo(f"File not found: {err}")
+    except OSError as err:
+        click.echo(f"Unexpected error reading notebook {path}: {err}")
+    except (ValueError, nbformat.ValidationError, nbformat.NBFormatError) as err:
+        click.echo(f"Invalid notebook {path}: {err}")
+    return None
+
+
+def _content_hash(cell: dict) -> str:
+    """Hashes the parts of a cell that a user edits: its type, source and attachments."""
+    source = cell.get("source", "")
+    content = [cell.get("cell_type"), "".join(source) if isinstance(source, list) else source, cell.get("attachments")]
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def _tag_cells(
+    cells: Iterable[nbformat.NotebookNode | CompactCell], source: str | None
+) -> Iterable[nbformat.NotebookNode | CompactCell]:
+    """Yields copies of the cells tagged with their source, key and content hash, or the cells as is without a source.
+
+    The key identifies a cell within its template across builds: it is the cell's id in the template, before ids are
+    made unique in the merged notebook, or its position in the template for cells without an id, as in notebooks
+    older than nbformat 4.5.
+    """
+    if source is None:
+        return cells
+    return (_tag_cell(cell, source, position) for position, cell in enumerate(cells))
+
+
+def _tag_cell(
+    cell: nbformat.NotebookNode | CompactCell, source: str, position: int
+) -> nbformat.NotebookNode | CompactCell:
+    value = cell.to_dict() if isinstance(cell, CompactCell) else cell
+    cell_id = value.get("id")
+    tag = {
+        "template": source,
+        "cell": cell_id if isinstance(cell_id, str) else position,
+        "sha256": _content_hash(value),
+    }
+    metadata = {**value.get("metadata", {}), METADATA_KEY: tag}
+    if isinstance(cell, CompactCell):
+        return CompactCell({**value, "metadata": metadata})
+    return nbformat.NotebookNode({**value, "metadata": nbformat.NotebookNode(metadata)})
+
+
+def _source_tag(cell: CompactCell) -> dict | None:
+    """Returns the source tag of a merged cell, or None if the cell has none."""
+    metadata = cell.to_dict().get("metadata")
+    tag = metadata.get(METADATA_KEY) if isinstance(metadata, dict) else None
+    return tag if isinstance(tag, dict) and isinstance(tag.get("template"), str) else None
+
+
+def _splice(cells: list[CompactCell], sections: dict[str, list[CompactCell]]) -> tuple[list[CompactCell], int]:
+    """Replaces the cells of the given templates with their new sections, keeping the cells the user edited.
+
+    Each section is inserted where the first cell of its template was, and removed from ``sections``; sections of
+    templates without cells are left in it. An edited cell takes the place of the new cell with the same key in its
+    template. Returns the spliced cells and the number of edited cells that were kept.
+    """
+    replaced = set(sections)
+    edited = {}
+    for cell in cells:
+        tag = _source_tag(cell)
+        if tag is not None and tag["template"] in replaced and tag.get("sha256") != _content_hash(cell.to_dict()):
+            edited.setdefault(tag["template"], {})[_cell_key(tag) or ("unkeyed", id(cell))] = cell
+    kept = sum(len(section_edits) for section_edits in edited.values())
+
+    spliced = []
+    for cell in cells:
+        tag = _source_tag(cell)
+        template = tag["template"] if tag is not None else None
+        if template not in replaced:
+            spliced.append(cell)  # a cell the user added, or a cell of an unchanged template
+            continue
+        section_edits = edited.get(template, {})
+        if template in sections:
+            spliced.extend(section_edits.pop(_cell_key(_source_tag(new)), new) for new in sections.pop(template))
+        if any(edit is cell for edit in section_edits.values()):
+            spliced.append(cell)  # an edited cell that is no longer in the template stays where it was
+    return spliced, kept
+
+
+def _cell_key(tag: dict) -> tuple[str, str | int] | None:
+    """Returns the key of a tagged cell within its template, typed so that an id never matches a position."""
+    key = tag.get("cell")
+    if isinstance(key, str):
+        return "id", key
+    if isinstance(key, int) and not isinstance(key, bool):
+        return "position", key
+    return None
+
+
+def _open_incremental(path: str) -> IncrementalNotebook | None:
+    """Opens a notebook for ``iter_merged_cells``, reporting read errors as the CLI does."""
+    try:
+        return IncrementalNotebook(path)
+    except FileNotFoundError as err:
+        click.echo(f"File not found: {err}")
+    except OSError as err:
+        click.echo(f"Unexpected error reading notebook {path}: {err}")
+    return None
+
+
+def _accepted_incremental(validator: NotebookValidator, notebook: IncrementalNotebook, source: str) -> bool:
+    """Validates an incrementally read notebook, reporting why it is skipped, and returns True if it is merged."""
+    try:
+        return validator.is_valid_incremental(notebook, source=source)
+    except NotebookValidationError as err:
+        click.echo(f"Validation error: {err}")
+    except (ValueError, nbformat.ValidationError) as err:
+        click.echo(f"Invalid notebook {source}: {err}")
+    return False
+
+
+def _unused_id(cell_id: object, seen: set[str], counters: dict[str, int]) -> str:
+    """Returns a new id for a cell whose id is missing, invalid or taken, derived from its old id and a counter."""
+    base = cell_id[:54] if isinstance(cell_id, str) and _CELL_ID.fullmatch(cell_id) else "cell"
+    number = counters.get(base, 1)
+    while f"{base}-{number}" in seen:
+        number += 1
+    counters[base] = number + 1
+    new_id = f"{base}-{number}"
+    seen.add(new_id)
+    return new_id
+
+
+class _CellIds:
+    """Gives cells unique, valid ids as they are merged one at a time, replacing renamed cells with copies."""
+
+    def __init__(self) -> None:
+        self._seen = set()
+        self._counters = {}
+
+    def assign(self, cell: CompactCell) -> CompactCell:
+        cell_id = cell.to_dict().get("id")
+        if isinstance(cell_id, str) and _CELL_ID.fullmatch(cell_id) and cell_id not in self._seen:
+            self._seen.add(cell_id)
+            return cell
+        return CompactCell({**cell.to_dict(), "id": _unused_id(cell_id, self._seen, self._counters)})
+
+
+def _normalize_cell_ids(cells: list[nbformat.NotebookNode | CompactCell]) -> None:
+    """Gives every cell a unique, valid id, replacing renamed cells with copies in the list."""
+    seen = set()
+    renamed = []
+    for position, cell in enumerate(cells):
+        cell_id = cell.to_dict().get("id") if isinstance(cell, CompactCell) else cell.get("id")
+        if isinstance(cell_id, str) and _CELL_ID.fullmatch(cell_id) and cell_id not in seen:
+            seen.add(cell_id)
+        else:
+            renamed.append((position, cell_id))
+
+    counters = {}
+    for position, cell_id in renamed:
+        new_id = _unused_id(cell_id, seen, counters)
+        cell = cells[position]
+        if isinstance(cell, CompactCell):
+            cells[position] = CompactCell({**cell.to_dict(), "id": new_id})
+        else:
+            cells[position] = nbformat.NotebookNode({**cell, "id": new_id})
+
+
+def _verdict(validator: NotebookValidator, notebook: nbformat.NotebookNode, source: str | None) -> bool | Exception:
+    """Validates a notebook and returns the verdict, or the error that makes the merger skip it.
+
+    Errors are returned rather than raised so that one invalid notebook does not stop the others from being
+    validated in a process pool. Any other exception propagates, as it does in sequential validation.
+    """
+    try:
+        return validator.is_valid(notebook, source=source)
+    except (FileNotFoundError, NotebookValidationError) as err:
+        return err
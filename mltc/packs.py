@@ -0,0 +1,378 @@
+import errno
+import io
+import mmap
+import os
+import tarfile
+import threading
+import weakref
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+
+from mltc import profiling
+from mltc.catalog import CatalogEntry, TemplateCatalog
+
+# The archive formats that can be used as a templates directory. Compressed tarballs are not supported, since
+# their members cannot be read without decompressing everything before them.
+PACK_SUFFIXES = (".zip", ".tar")
+
+_open_packs: dict[Path, tuple[tuple[int, int], "TemplatePack"]] = {}
+_open_packs_lock = threading.Lock()
+
+
+class InvalidPackError(Exception):
+    """Exception raised when a template pack is not a readable zip or tar archive."""
+
+    def __init__(self, path: str, reason: str) -> None:
+        """Initializes the InvalidPackError with the pack path and the reason it cannot be read.
+
+        Args:
+            path (str): The path to the pack.
+            reason (str): A description of what is wrong with the pack.
+        """
+        self.path = path
+        self.reason = reason
+        super().__init__(f"Invalid template pack {path}: {reason}")
+
+
+@dataclass(frozen=True)
+class PackMember:
+    """A notebook stored in a template pack.
+
+    Attributes:
+        name (str): The path of the member inside the archive, with forward slashes.
+        size (int): The uncompressed size of the member in bytes.
+        mtime_ns (int): The modification time recorded in the archive, in nanoseconds.
+    """
+
+    name: str
+    size: int
+    mtime_ns: int
+
+
+class _MappedFile(io.RawIOBase):
+    """A seekable, read-only file over a memory mapping, for the archive readers of the standard library."""
+
+    def __init__(self, buffer: mmap.mmap) -> None:
+        super().__init__()
+        self._buffer = buffer
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b: bytearray | memoryview) -> int:
+        data = self._buffer[self._position : self._position + len(b)]
+        b[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: len(self._buffer)}[whence]
+        if base + offset < 0:
+            raise OSError(errno.EINVAL, "Invalid seek position")
+        self._position = base + offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+def is_pack(path: str | Path) -> bool:
+    """Returns True if the path is an existing file with a template pack suffix."""
+    path = Path(path)
+    return path.suffix.lower() in PACK_SUFFIXES and path.is_file()
+
+
+def split_pack_path(path: str | Path) -> tuple[Path, str] | None:
+    """Splits the path of a notebook inside a template pack into the pack and the member name.
+
+    Only the parents with a pack suffix are checked on disk, so ordinary paths cost no system calls.
+
+    Args:
+        path (str | Path): A path such as ``templates.zip/setup/setup.ipynb``.
+
+    Returns:
+        tuple[Path, str] | None: The path to the pack and the member name, or None if the path is not inside a pack.
+    """
+    path = Path(path)
+    for parent in path.parents:
+        if parent.suffix.lower() in PACK_SUFFIXES and parent.is_file():
+            return parent, path.relative_to(parent).as_posix()
+    return None
+
+
+def _member_order(name: str) -> tuple[tuple[int, str], ...]:
+    """Sorts members as the catalog walks a directory: depth first, files before subdirectories, each by name."""
+    parts = name.split("/")
+    return (*((1, part) for part in parts[:-1]), (0, parts[-1]))
+
+
+class TemplatePack:
+    """Read-only access to the notebooks in a zip or tar archive, without extracting it.
+
+    The archive is memory-mapped once. The members of a zip archive are listed from its central directory and
+    read, and decompressed if necessary, on demand. A tar archive has no central directory, so its headers are
+    scanned once when the pack is opened; members are then sliced straight out of the mapping.
+
+    Hidden members such as ``.ipynb_checkpoints`` and ``__MACOSX`` entries are skipped, like hidden entries of a
+    templates directory. The archive is closed by ``close``, or at the latest once the pack is no longer referenced.
+
+    Attributes:
+        path (Path): The path to the archive.
+        members (list[PackMember]): The notebooks in the archive, in catalog order.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Opens a template pack.
+
+        Args:
+            path (str | Path): The path to the archive.
+
+        Raises:
+            InvalidPackError: If the archive is empty, has an unsupported suffix or cannot be parsed.
+            OSError: If the archive cannot be opened.
+        """
+        self.path = Path(path)
+        suffix = self.path.suffix.lower()
+        if suffix not in PACK_SUFFIXES:
+            raise InvalidPackError(str(path), f"expected one of {', '.join(PACK_SUFFIXES)}")
+
+        with self.path.open("rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as err:
+                raise InvalidPackError(str(path), "the archive is empty") from err
+
+        self._zip = None
+        self._tar_offsets = {}
+        try:
+            members = self._open_zip() if suffix == ".zip" else self._open_tar()
+        except (zipfile.BadZipFile, tarfile.TarError) as err:
+            self._release(self._zip, self._mmap)
+            raise InvalidPackError(str(path), str(err)) from err
+        self._finalizer = weakref.finalize(self, TemplatePack._release, self._zip, self._mmap)
+        self.members = sorted(members, key=lambda member: _member_order(member.name))
+        self._members = {member.name: member for member in self.members}
+
+    def _open_zip(self) -> list[PackMember]:
+        self._zip = zipfile.ZipFile(_MappedFile(self._mmap))
+        members = []
+        for info in self._zip.infolist():
+            if info.is_dir() or not self._is_template(info.filename):
+                continue
+            mtime = datetime(*info.date_time).timestamp()  # noqa: DTZ001 - zip times are local times
+            members.append(PackMember(info.filename, info.file_size, int(mtime * 1_000_000_000)))
+        return members
+
+    def _open_tar(self) -> list[PackMember]:
+        members = []
+        with tarfile.open(fileobj=_MappedFile(self._mmap), mode="r:") as tar:
+            for info in tar:
+                name = info.name.removeprefix("./")
+                if not info.isfile() or not self._is_template(name):
+                    continue
+                self._tar_offsets[name] = (info.offset_data, info.size)
+                members.append(PackMember(name, info.size, int(info.mtime) * 1_000_000_000))
+        return members
+
+    @staticmethod
+    def _is_template(name: str) -> bool:
+        parts = PurePosixPath(name).parts
+        return name.endswith(".ipynb") and not any(part.startswith((".", "__MACOSX")) for part in parts)
+
+    @staticmethod
+    def _release(archive: zipfile.ZipFile | None, buffer: mmap.mmap) -> None:
+        """Closes the zip reader and the memory mapping of a pack."""
+        if archive is not None:
+            archive.close()
+        buffer.close()
+
+    def __contains__(self, name: str) -> bool:
+        """Returns True if the pack has a notebook with the given member name."""
+        return name in self._members
+
+    def read(self, name: str) -> bytes:
+        """Reads the contents of a member.
+
+        Args:
+            name (str): The path of the member inside the archive.
+
+        Returns:
+            bytes: The uncompressed contents.
+
+        Raises:
+            FileNotFoundError: If the archive has no such member.
+            InvalidPackError: If the member is corrupt.
+        """
+        if name not in self._members:
+            raise FileNotFoundError(name)
+        if self._zip is not None:
+            try:
+                return self._zip.read(name)
+            except (zipfile.BadZipFile, OSError) as err:
+                raise InvalidPackError(str(self.path), f"cannot read {name}: {err}") from err
+        start, size = self._tar_offsets[name]
+        return self._mmap[start : start + size]
+
+    def close(self) -> None:
+        """Closes the archive and its memory mapping."""
+        self._finalizer()
+
+    def __enter__(self) -> "TemplatePack":
+        """Returns the open pack."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Closes the pack."""
+        self.close()
+
+
+def open_pack(path: str | Path) -> TemplatePack:
+    """Returns an open template pack, shared by every caller until the archive changes on disk.
+
+    When the archive changes, the pack is replaced by a newly opened one. The replaced pack is not closed right away,
+    since other threads may still be reading from it, but as soon as the last of them drops it.
+
+    Args:
+        path (str | Path): The path to the archive.
+
+    Returns:
+        TemplatePack: The open pack.
+
+    Raises:
+        InvalidPackError: If the archive cannot be parsed.
+        OSError: If the archive cannot be opened.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _open_packs_lock:
+        cached = _open_packs.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        pack = TemplatePack(path)
+        _open_packs[path] = (version, pack)
+        return pack
+
+
+def read_bytes(path: str | Path) -> bytes:
+    """Reads a file, which may be a notebook inside a template pack.
+
+    Args:
+        path (str | Path): The path to the file.
+
+    Returns:
+        bytes: The contents of the file.
+
+    Raises:
+        FileNotFoundError: If the file, or the pack member, does not exist.
+        OSError: For other OS related issues, including corrupt packs.
+    """
+    split = split_pack_path(path)
+    if split is None:
+        return Path(path).read_bytes()
+    pack_path, name = split
+    try:
+        return open_pack(pack_path).read(name)
+    except InvalidPackError as err:
+        raise OSError(str(err)) from err
+
+
+def stat(path: str | Path) -> os.stat_result:
+    """Stats a file, or for a notebook inside a template pack, the pack.
+
+    The result is meant for detecting changes: any change to a pack member changes the pack.
+
+    Args:
+        path (str | Path): The path to the file.
+
+    Returns:
+        os.stat_result: The status of the file or of the pack containing it.
+
+    Raises:
+        FileNotFoundError: If the file, or the pack member, does not exist.
+        OSError: For other OS related issues.
+    """
+    split = split_pack_path(path)
+    if split is None:
+        return Path(path).stat()
+    pack_path, name = split
+    try:
+        pack = open_pack(pack_path)
+    except InvalidPackError as err:
+        raise OSError(str(err)) from err
+    if name not in pack:
+        raise FileNotFoundError(str(path))
+    return pack_path.stat()
+
+
+class PackCatalog:
+    """The catalog of a template pack, with the same interface as a TemplateCatalog.
+
+    Entries are listed from the archive without reading any member, so the size and modification time come from
+    the archive and the digest and cell count are not known. Notebooks at the top level of the archive are grouped
+    under the archive's name without its suffix, as if the pack had been extracted to a directory of that name.
+
+    Attributes:
+        directory (Path): The path to the pack.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initializes the PackCatalog.
+
+        Args:
+            directory (str): The path to the pack.
+        """
+        self.directory = Path(directory).resolve()
+        self._entries = None
+
+    @property
+    def entries(self) -> list[CatalogEntry]:
+        """list[CatalogEntry]: The catalog entries, read from the pack on first access."""
+        if self._entries is None:
+            self.refresh()
+        return self._entries
+
+    def refresh(self, *, rescan: bool = False) -> list[CatalogEntry]:  # noqa: ARG002
+        """Lists the notebooks in the pack again if it changed.
+
+        Args:
+            rescan (bool): Accepted for compatibility with TemplateCatalog. A pack is always listed in full.
+
+        Returns:
+            list[CatalogEntry]: The catalog entries.
+
+        Raises:
+            InvalidPackError: If the pack cannot be parsed.
+        """
+        with profiling.stage("catalog", source=str(self.directory)):
+            pack = open_pack(self.directory)
+            self._entries = [
+                CatalogEntry(
+                    path=self.directory / member.name,
+                    group=PurePosixPath(member.name).parent.name or self.directory.stem,
+                    size=member.size,
+                    mtime_ns=member.mtime_ns,
+                    sha256=None,
+                    cell_count=None,
+                )
+                for member in pack.members
+            ]
+        return self._entries
+
+
+def template_catalog(directory: str) -> TemplateCatalog | PackCatalog:
+    """Returns the catalog of a templates directory or of a template pack.
+
+    Args:
+        directory (str): The path to the templates directory or to a zip or tar pack.
+
+    Returns:
+        TemplateCatalog | PackCatalog: The catalog.
+    """
+    return PackCatalog(directory) if is_pack(directory) else TemplateCatalog(directory)
@@ -0,0 +1,260 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+_hooks: list[Callable[["StageRecord"], None]] = []
+_hooks_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StageRecord:
+    """The measurements of one pipeline stage for one input.
+
+    Attributes:
+        stage (str): The name of the stage, such as "catalog", "read", "validate", "merge" or "write".
+        source (str | None): The notebook or directory the stage worked on, or None for whole-pipeline stages.
+        wall_seconds (float): The elapsed wall-clock time.
+        cpu_seconds (float): The CPU time used by the thread that ran the stage.
+        bytes_read (int): The number of bytes read from disk.
+        bytes_written (int): The number of bytes written to disk.
+        cells (int): The number of cells the stage handled.
+        peak_rss_bytes (int | None): The peak resident set size of the process at the end of the stage, or None
+                                     where the platform does not report it.
+    """
+
+    stage: str
+    source: str | None
+    wall_seconds: float
+    cpu_seconds: float
+    bytes_read: int = 0
+    bytes_written: int = 0
+    cells: int = 0
+    peak_rss_bytes: int | None = None
+
+
+@dataclass
+class StageMetrics:
+    """The counters a stage fills in while it runs. See ``stage``."""
+
+    bytes_read: int = 0
+    bytes_written: int = 0
+    cells: int = 0
+
+
+def _peak_rss() -> int | None:
+    """Returns the peak resident set size of the process in bytes."""
+    if resource is None:  # pragma: no cover - not available on Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024  # macOS reports bytes, Linux KiB
+
+
+def add_hook(hook: Callable[[StageRecord], None]) -> None:
+    """Registers a function that is called with the record of every completed stage.
+
+    Hooks are called from the thread that ran the stage, so they must be thread-safe.
+
+    Args:
+        hook (Callable[[StageRecord], None]): The function to call.
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[StageRecord], None]) -> None:
+    """Unregisters a hook added with ``add_hook``. Unknown hooks are ignored.
+
+    Args:
+        hook (Callable[[StageRecord], None]): The function to unregister.
+    """
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def is_active() -> bool:
+    """Returns True if any hook is registered, that is, if stages are being measured."""
+    return bool(_hooks)
+
+
+def emit(record: StageRecord) -> None:
+    """Passes a stage record to every registered hook, for example a record measured in a worker process.
+
+    Args:
+        record (StageRecord): The record to pass on.
+    """
+    with _hooks_lock:
+        hooks = tuple(_hooks)
+    for hook in hooks:
+        hook(record)
+
+
+@contextmanager
+def stage(name: str, source: str | None = None) -> Iterator[StageMetrics]:
+    """Measures a pipeline stage and reports it to the registered hooks.
+
+    The stage fills in the yielded counters; wall time, CPU time and peak RSS are measured here. When no hook is
+    registered nothing is measured, so instrumented code pays almost nothing when profiling is off. A stage that
+    raises is still reported.
+
+    Example:
+        .. code-block:: python
+
+            with profiling.stage("read", source=path) as metrics:
+                data = Path(path).read_bytes()
+                metrics.bytes_read = len(data)
+
+    Args:
+        name (str): The name of the stage.
+        source (str | None): The notebook or directory the stage works on.
+
+    Yields:
+        StageMetrics: The counters for the stage to fill in.
+    """
+    metrics = StageMetrics()
+    if not _hooks:
+        yield metrics
+        return
+
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield metrics
+    finally:
+        emit(
+            StageRecord(
+                stage=name,
+                source=None if source is None else str(source),
+                wall_seconds=time.perf_counter() - wall_start,
+                cpu_seconds=time.thread_time() - cpu_start,
+                bytes_read=metrics.bytes_read,
+                bytes_written=metrics.bytes_written,
+                cells=metrics.cells,
+                peak_rss_bytes=_peak_rss(),
+            )
+        )
+
+
+class Profiler:
+    """Collects the stage records of a pipeline run and reports them.
+
+    The profiler registers itself as a hook while it is active, either as a context manager or between ``start``
+    and ``stop``. It can also run the pipeline under ``cProfile`` and dump the statistics to a file that can be
+    read with ``pstats`` or tools such as snakeviz.
+
+    Stages can nest: the merge stage includes the validation of each notebook, so the totals of different stages
+    should not be added up.
+
+    Attributes:
+        records (list[StageRecord]): The records collected so far, in completion order.
+        cprofile_path (Path | None): Where the cProfile statistics are dumped, or None to not run cProfile.
+    """
+
+    def __init__(self, cprofile_path: str | None = None) -> None:
+        """Initializes the Profiler.
+
+        Args:
+            cprofile_path (str | None): The file to dump cProfile statistics to. Defaults to not running cProfile.
+        """
+        self.records = []
+        self.cprofile_path = Path(cprofile_path) if cprofile_path is not None else None
+        self._lock = threading.Lock()
+        self._cprofile = None
+
+    def __call__(self, record: StageRecord) -> None:
+        """Collects a stage record. This is the hook registered while the profiler is active."""
+        with self._lock:
+            self.records.append(record)
+
+    def __enter__(self) -> "Profiler":
+        """Starts collecting records."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stops collecting records."""
+        self.stop()
+
+    def start(self) -> None:
+        """Registers the profiler as a hook and starts cProfile if requested."""
+        add_hook(self)
+        if self.cprofile_path is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        """Unregisters the profiler and dumps the cProfile statistics if requested.
+
+        Raises:
+            OSError: If the cProfile statistics cannot be written.
+        """
+        remove_hook(self)
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+
+    def totals(self) -> dict[str, StageRecord]:
+        """Sums the records of each stage over all inputs.
+
+        Returns:
+            dict[str, StageRecord]: One record per stage, in order of first completion. The peak RSS is the highest
+                                    peak seen for the stage.
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.get(record.stage)
+            if total is None:
+                totals[record.stage] = StageRecord(**{**asdict(record), "source": None})
+                continue
+            peaks = [peak for peak in (total.peak_rss_bytes, record.peak_rss_bytes) if peak is not None]
+            totals[record.stage] = StageRecord(
+                stage=record.stage,
+                source=None,
+                wall_seconds=total.wall_seconds + record.wall_seconds,
+                cpu_seconds=total.cpu_seconds + record.cpu_seconds,
+                bytes_read=total.bytes_read + record.bytes_read,
+                bytes_written=total.bytes_written + record.bytes_written,
+                cells=total.cells + record.cells,
+                peak_rss_bytes=max(peaks) if peaks else None,
+            )
+        return totals
+
+    def to_json(self) -> str:
+        """Returns the records and the per-stage totals as a JSON document."""
+        report = {
+            "records": [asdict(record) for record in self.records],
+            "totals": {name: asdict(total) for name, total in self.totals().items()},
+        }
+        return json.dumps(report, indent=2)
+
+    def format_table(self) -> str:
+        """Returns the records and the per-stage totals as a human-readable table."""
+        header = f"{'stage':<10} {'source':<40} {'wall ms':>9} {'cpu ms':>9} {'read':>10} {'written':>10} {'cells':>7} "
+        header += f"{'peak MiB':>9}"
+        lines = [header, "-" * len(header)]
+
+        def row(record: StageRecord, source: str) -> str:
+            peak = "-" if record.peak_rss_bytes is None else f"{record.peak_rss_bytes / 2**20:.1f}"
+            if len(source) > 40:  # noqa: PLR2004
+                source = "..." + source[-37:]
+            return (
+                f"{record.stage:<10} {source:<40} {record.wall_seconds * 1000:>9.1f} {record.cpu_seconds * 1000:>9.1f} "
+                f"{record.bytes_read:>10} {record.bytes_written:>10} {record.cells:>7} {peak:>9}"
+            )
+
+        lines.extend(row(record, record.source or "") for record in self.records)
+        lines.append("-" * len(header))
+        lines.extend(row(total, "(total)") for total in self.totals().values())
+        return "\n".join(lines)
@@ -1,7 +1,31 @@
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 import nbformat
 
+from mltc import jsonio, packs, profiling
+from mltc.compact import CompactNotebook
+
+
+@dataclass(frozen=True)
+class ReadResult:
+    """The outcome of reading a single notebook in a bulk read.
+
+    Attributes:
+        path (str): The path that was read.
+        notebook (nbformat.NotebookNode | CompactNotebook | None): The notebook object, or None if reading failed.
+        error (Exception | None): The error raised while reading, or None if reading succeeded.
+    """
+
+    path: str
+    notebook: nbformat.NotebookNode | CompactNotebook | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the notebook was read successfully."""
+        return self.error is None
+
 
 class NotebookReader:
     """Jupyter notebook reader class.
@@ -10,27 +34,102 @@ class NotebookReader:
     """
 
     @staticmethod
-    def read_notebook(path: str) -> nbformat.NotebookNode:
+    def parse_notebook(data: bytes, *, compact: bool = False) -> nbformat.NotebookNode | CompactNotebook:
+        """Parses a notebook from the raw bytes of an .ipynb file.
+
+        The bytes are decoded by the JSON parser directly instead of being decoded to a string first, and the
+        notebook is converted to version 4 if necessary. Unlike ``nbformat.read``, the notebook is not validated
+        here, since that is the job of the NotebookValidator.
+
+        Args:
+            data (bytes): The contents of the notebook file.
+            compact (bool): Whether to return a CompactNotebook, whose cells keep the parsed JSON instead of being
+                            converted to NotebookNodes. The merger and writer accept it as is.
+
+        Returns:
+            nbformat.NotebookNode | CompactNotebook: The notebook object.
+
+        Raises:
+            nbformat.reader.NotJSONError: If the data is not valid JSON.
+            nbformat.ValidationError: If the notebook is missing keys required to read it.
+            nbformat.NBFormatError: If the notebook version is not supported.
+        """
+        try:
+            nb_dict = jsonio.loads(data)
+        except ValueError as err:
+            err_msg = f"Notebook does not appear to be JSON: {data[:40]!r}..."
+            raise nbformat.reader.NotJSONError(err_msg) from err
+
+        major, minor = nbformat.reader.get_version(nb_dict)
+        if major not in nbformat.versions:
+            err_msg = f"Unsupported nbformat version {major}"
+            raise nbformat.NBFormatError(err_msg)
+        if compact and major == nbformat.v4.nbformat:
+            return CompactNotebook.from_dict(nb_dict)
+        try:
+            notebook = nbformat.versions[major].to_notebook_json(nb_dict, minor=minor)
+        except AttributeError as err:
+            err_msg = f"The notebook is invalid and is missing an expected key: {err}"
+            raise nbformat.ValidationError(err_msg) from None
+        if major != nbformat.v4.nbformat:
+            notebook = nbformat.convert(notebook, nbformat.v4.nbformat)
+        return CompactNotebook.from_notebook(notebook) if compact else notebook
+
+    @staticmethod
+    def read_notebook(path: str, *, compact: bool = False) -> nbformat.NotebookNode | CompactNotebook:
         """Reads the Jupyter notebook from the provided file path.
 
+        The path may name a notebook inside a zip or tar template pack, such as ``templates.zip/setup/setup.ipynb``;
+        the notebook is then read from the archive without extracting it.
+
         Args:
             path (str): The file path to the notebook.
+            compact (bool): Whether to return a CompactNotebook. See ``parse_notebook``.
 
         Returns:
-            nbformat.NotebookNode: The notebook object.
+            nbformat.NotebookNode | CompactNotebook: The notebook object.
 
         Raises:
             FileNotFoundError: If the notebook file does not exist.
             OSError: For other OS related issues.
         """
-        path_obj = Path(path)
-        if not path_obj.exists():
-            err_msg = f"The notebook file {path} does not exist."
-            raise FileNotFoundError(err_msg)
+        with profiling.stage("read", source=str(path)) as metrics:
+            try:
+                data = packs.read_bytes(path)
+            except FileNotFoundError as err:
+                err_msg = f"The notebook file {path} does not exist."
+                raise FileNotFoundError(err_msg) from err
+            except OSError as err:
+                err_msg = f"OS error reading {path}: {err}"
+                raise OSError(err_msg) from err
+            metrics.bytes_read = len(data)
+            notebook = NotebookReader.parse_notebook(data, compact=compact)
+            metrics.cells = len(notebook.cells)
+        return notebook
 
-        try:
-            with path_obj.open() as f:
-                return nbformat.read(f, as_version=4)
-        except OSError as err:
-            err_msg = f"OS error reading {path}: {err}"
-            raise OSError(err_msg) from err
+    @staticmethod
+    def read_notebooks(paths: list[str], max_workers: int | None = None, *, compact: bool = False) -> list[ReadResult]:
+        """Reads several Jupyter notebooks concurrently.
+
+        Files are read and parsed in a thread pool. A failure to read one notebook does not affect the others;
+        the error is recorded in that notebook's result instead of being raised.
+
+        Args:
+            paths (list[str]): The file paths to the notebooks.
+            max_workers (int | None): The maximum number of threads to use. Defaults to the executor's default.
+            compact (bool): Whether to read CompactNotebooks. See ``parse_notebook``.
+
+        Returns:
+            list[ReadResult]: One result per path, in the same order as the paths.
+        """
+
+        def read(path: str) -> ReadResult:
+            try:
+                return ReadResult(str(path), notebook=NotebookReader.read_notebook(path, compact=compact))
+            except (OSError, ValueError, nbformat.ValidationError, nbformat.NBFormatError) as err:
+                return ReadResult(str(path), error=err)
+
+        if len(paths) <= 1:
+            return [read(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(read, paths))
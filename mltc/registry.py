@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+from urllib.parse import quote, urljoin, urlsplit
+
+from mltc import profiling
+from mltc.cache import default_cache_dir
+
+if TYPE_CHECKING:  # http.client is imported when syncing, so that the CLI does not load it for local templates
+    import http.client
+
+REGISTRY_SCHEMES = ("http", "https")
+STATE_VERSION = 1
+
+
+class RegistryError(Exception):
+    """Exception raised when a template registry cannot be synced."""
+
+    def __init__(self, url: str, reason: str) -> None:
+        """Initializes the RegistryError with the registry URL and the reason it cannot be synced.
+
+        Args:
+            url (str): The URL of the registry manifest.
+            reason (str): A description of the problem.
+        """
+        self.url = url
+        self.reason = reason
+        super().__init__(f"Template registry {url}: {reason}")
+
+
+def is_registry_url(value: str | Path) -> bool:
+    """Returns whether a templates directory is given as the URL of a template registry.
+
+    Args:
+        value (str | Path): The templates directory, template pack or registry URL.
+
+    Returns:
+        bool: True for an http or https URL.
+    """
+    return isinstance(value, str) and urlsplit(value).scheme in REGISTRY_SCHEMES
+
+
+@dataclass(frozen=True)
+class RegistryEntry:
+    """A template listed in a registry manifest.
+
+    Attributes:
+        path (str): The path of the template in the local copy, with forward slashes.
+        url (str): The absolute URL the template is downloaded from.
+        sha256 (str | None): The SHA-256 digest of the template, if the manifest lists it.
+    """
+
+    path: str
+    url: str
+    sha256: str | None = None
+
+
+class _ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections, reused across requests to the same host."""
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, scheme: str, netloc: str) -> tuple["http.client.HTTPConnection", bool]:
+        import http.client
+
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+            self.opened += 1
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout), False
+
+    def get(self, url: str, headers: dict[str, str]) -> tuple[int, "http.client.HTTPMessage", bytes]:
+        """Sends a GET request, retrying once on a fresh connection if a reused one was closed by the server."""
+        import http.client
+
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        while True:
+            connection, reused = self._acquire(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._lock:
+                    self._idle.setdefault((parts.scheme, parts.netloc), []).append(connection)
+            return response.status, response.headers, body
+
+    def close(self) -> None:
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+class TemplateRegistry:
+    """A set of templates served over HTTP, synced into a local copy that can be used as a templates directory.
+
+    The registry is described by a JSON manifest at its URL, listing the templates as
+    ``{"templates": [{"path": "modelling/binary.ipynb"}, ...]}``. Each template is downloaded from its ``url``,
+    resolved against the manifest URL, or by default from its path. A template may also list its ``sha256``.
+
+    Syncing downloads the templates concurrently over a pool of keep-alive connections into a local copy in the
+    cache directory. The ETag and Last-Modified headers of the manifest and of every template are recorded, so
+    that later syncs send conditional requests and only download what changed; a template whose listed digest
+    matches the local copy is not requested at all. Templates no longer listed are removed from the local copy.
+    Offline, the local copy is used as it is.
+
+    Example:
+        .. code-block:: python
+
+            registry = TemplateRegistry("https://templates.example.com/manifest.json")
+            selector = NotebookSelector(str(registry.sync()))
+
+    Attributes:
+        url (str): The URL of the manifest.
+        cache_dir (Path): The directory holding the local copy and the recorded headers.
+        directory (Path): The local copy of the templates.
+        offline (bool): Whether to use the local copy without connecting to the registry.
+        max_workers (int): The maximum number of concurrent downloads.
+        timeout (float): The timeout of each request in seconds.
+        downloaded (int): The number of templates downloaded by the last sync.
+        unchanged (int): The number of templates found unchanged by the last sync.
+        removed (int): The number of templates removed from the local copy by the last sync.
+        connections (int): The number of connections opened by the last sync.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cache_dir: str | None = None,
+        *,
+        offline: bool = False,
+        max_workers: int = 8,
+        timeout: float = 30.0,
+    ) -> None:
+        """Initializes the TemplateRegistry.
+
+        Args:
+            url (str): The http or https URL of the manifest.
+            cache_dir (str | None): The directory holding the local copy. Defaults to a directory per registry
+                                    under ``registries`` in the mltc cache directory.
+            offline (bool): Whether to use the local copy without connecting to the registry.
+            max_workers (int): The maximum number of concurrent downloads.
+            timeout (float): The timeout of each request in seconds.
+        """
+        self.url = url
+        if cache_dir is None:
+            digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+            cache_dir = default_cache_dir() / "registries" / digest
+        self.cache_dir = Path(cache_dir)
+        self.directory = self.cache_dir / "templates"
+        self.offline = offline
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.downloaded = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.connections = 0
+
+    @property
+    def state_path(self) -> Path:
+        """Path: The file recording the manifest and the headers of the downloaded templates."""
+        return self.cache_dir / "state.json"
+
+    def sync(self) -> Path:
+        """Brings the local copy up to date with the registry, or checks that there is one when offline.
+
+        Returns:
+            Path: The local copy of the templates, to be used as a templates directory.
+
+        Raises:
+            RegistryError: If the registry cannot be reached, its manifest is invalid, a template cannot be
+                           downloaded, or there is no local copy to use offline.
+        """
+        if self.offline:
+            if not self.directory.is_dir():
+                raise RegistryError(self.url, "there is no local copy to use offline, sync it once online first")
+            return self.directory
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        state = self._load_state()
+        records = state.get("templates", {})
+        pool = _ConnectionPool(self.timeout)
+        try:
+            with profiling.stage("registry", source=self.url) as metrics:
+                manifest = self._fetch_manifest(pool, state)
+                entries = self._entries(manifest)
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    results = list(executor.map(lambda entry: self._sync_entry(pool, entry, records), entries))
+                metrics.bytes_read = sum(size for _, size, _ in results)
+        finally:
+            pool.close()
+            self.connections = pool.opened
+
+        synced = {entry.path: record for entry, (record, _, _) in zip(entries, results, strict=True) if record}
+        self.downloaded = sum(downloaded for _, _, downloaded in results)
+        self.unchanged = len(synced) - self.downloaded
+        self.removed = self._remove_unlisted(records, synced)
+        self._save_state({**state, "templates": synced})
+        errors = [error for _, _, error in results if isinstance(error, RegistryError)]
+        if errors:
+            raise errors[0]
+        return self.directory
+
+    def _get(
+        self, pool: _ConnectionPool, url: str, record: dict | None
+    ) -> tuple[int, "http.client.HTTPMessage", bytes]:
+        """Sends a GET request, conditional on the headers recorded for the resource, if any."""
+        import http.client
+
+        headers = {"Accept-Encoding": "identity"}
+        if record is not None and record.get("url") == url:
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+        try:
+            return pool.get(url, headers)
+        except (http.client.HTTPException, OSError) as err:
+            raise RegistryError(self.url, f"cannot download {url}: {err}") from err
+
+    @staticmethod
+    def _record(url: str, headers: "http.client.HTTPMessage", body: bytes) -> dict:
+        return {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "sha256": hashlib.sha256(body).hexdigest(),
+        }
+
+    def _fetch_manifest(self, pool: _ConnectionPool, state: dict) -> dict:
+        """Returns the manifest, reusing the recorded one if the registry reports it unchanged."""
+        saved = state.get("manifest")
+        status, headers, body = self._get(pool, self.url, saved)
+        if status == HTTPStatus.NOT_MODIFIED and saved is not None:
+            return saved["content"]
+        if status != HTTPStatus.OK:
+            raise RegistryError(self.url, f"the manifest request failed with HTTP status {status}")
+        try:
+            manifest = json.loads(body)
+        except ValueError as err:
+            raise RegistryError(self.url, f"the manifest is not valid JSON: {err}") from err
+        state["manifest"] = {**self._record(self.url, headers, body), "content": manifest}
+        return manifest
+
+    def _entries(self, manifest: dict) -> list[RegistryEntry]:
+        """Returns the templates listed in the manifest, rejecting paths that would leave the local copy."""
+        templates = manifest.get("templates") if isinstance(manifest, dict) else None
+        if not isinstance(templates, list):
+            raise RegistryError(self.url, 'the manifest must be an object with a "templates" list')
+        entries = []
+        for template in templates:
+            item = {"path": template} if isinstance(template, str) else template
+            path = item.get("path") if isinstance(item, dict) else None
+            if not isinstance(path, str):
+                raise RegistryError(self.url, f"the manifest lists a template without a path: {template!r}")
+            parts = PurePosixPath(path).parts
+            if not parts or path.startswith("/") or ".." in parts or not path.endswith(".ipynb"):
+                raise RegistryError(self.url, f"the manifest lists an invalid template path: {path!r}")
+            url = urljoin(self.url, item.get("url") or quote(path))
+            entries.append(RegistryEntry(path=path, url=url, sha256=item.get("sha256")))
+        return entries
+
+    def _sync_entry(
+        self, pool: _ConnectionPool, entry: RegistryEntry, records: dict[str, dict]
+    ) -> tuple[dict | None, int, bool | RegistryError]:
+        """Downloads a template if it changed.
+
+        Returns:
+            tuple[dict | None, int, bool | RegistryError]: The record of the template, or None if it could not be
+                                                          synced, the bytes downloaded, and whether it was
+                                                          downloaded or the error that prevented it.
+        """
+        record = records.get(entry.path)
+        local_path = self.directory / entry.path
+        if record is not None and not local_path.is_file():
+            record = None
+        if record is not None and entry.sha256 is not None and entry.sha256 == record.get("sha256"):
+            return record, 0, False
+        try:
+            status, headers, body = self._get(pool, entry.url, record)
+        except RegistryError as err:
+            return record, 0, err
+        if status == HTTPStatus.NOT_MODIFIED and record is not None:
+            return record, 0, False
+        if status != HTTPStatus.OK:
+            return record, 0, RegistryError(self.url, f"downloading {entry.url} failed with HTTP status {status}")
+        try:
+            _write_atomically(local_path, body)
+        except OSError as err:
+            return record, 0, RegistryError(self.url, f"cannot save {entry.path}: {err}")
+        return self._record(entry.url, headers, body), len(body), True
+
+    def _remove_unlisted(self, records: dict[str, dict], synced: dict[str, dict]) -> int:
+        """Removes the templates that the manifest no longer lists from the local copy."""
+        removed = 0
+        for path in records.keys() - synced.keys():
+            try:
+                (self.directory / path).unlink()
+            except FileNotFoundError:
+                continue
+            except OSError:
+                synced[path] = records[path]  # keep tracking it, so that the next sync tries again
+                continue
+            removed += 1
+        return removed
+
+    def _load_state(self) -> dict:
+        """Loads the recorded headers, returning an empty state if they are missing, unreadable or outdated."""
+        try:
+            state = json.loads(self.state_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get("version") != STATE_VERSION or state.get("url") != self.url:
+            return {}
+        return state
+
+    def _save_state(self, state: dict) -> None:
+        """Saves the recorded headers atomically. Failures are ignored; the next sync then downloads everything."""
+        try:
+            _write_atomically(self.state_path, json.dumps({**state, "version": STATE_VERSION, "url": self.url}))
+        except OSError:
+            return
+
+
+def _write_atomically(path: Path, data: bytes | str) -> None:
+    """Writes a file through a temporary file that replaces it, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, str):
+            temp_path.write_text(data)
+        else:
+            temp_path.write_bytes(data)
+        temp_path.replace(path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,314 @@
+import itertools
+import json
+import os
+import re
+import shlex
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from mltc import jsonio, packs, profiling
+from mltc.catalog import CatalogEntry, TemplateCatalog
+from mltc.packs import PackCatalog
+
+INDEX_VERSION = 1
+
+# The fields a query can search. A term without a field matches any of them.
+FIELDS = ("heading", "text", "tag", "import", "path")
+# Fields whose values are matched whole, rather than split into words.
+_EXACT_FIELDS = ("tag", "import")
+
+_WORD = re.compile(r"\w+")
+_HEADING = re.compile(r"^ {0,3}#{1,6}\s+(.*?)(?:\s+#+)?\s*$", re.MULTILINE)
+_IMPORT = re.compile(r"^\s*import\s+([\w.]+(?:\s+as\s+\w+)?(?:\s*,\s*[\w.]+(?:\s+as\s+\w+)?)*)", re.MULTILINE)
+_FROM_IMPORT = re.compile(r"^\s*from\s+(\w[\w.]*)\s+import\b", re.MULTILINE)
+
+
+class InvalidQueryError(Exception):
+    """Exception raised when a search query cannot be parsed."""
+
+    def __init__(self, query: str, reason: str) -> None:
+        """Initializes the InvalidQueryError with the query and what is wrong with it.
+
+        Args:
+            query (str): The query.
+            reason (str): A description of the problem.
+        """
+        self.query = query
+        self.reason = reason
+        super().__init__(f"Invalid query {query!r}: {reason}")
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    """A single term of a search query, such as ``tag:classification`` or ``-heading:"Missing Data"``.
+
+    Attributes:
+        field (str | None): The field to search, or None to search every field.
+        value (str): The value to look for, lowercased.
+        negated (bool): Whether templates that match the term are excluded rather than selected.
+    """
+
+    field: str | None
+    value: str
+    negated: bool = False
+
+
+def parse_query(query: str) -> list[QueryTerm]:
+    """Parses a search query into its terms.
+
+    A query is a list of terms separated by spaces, all of which a template must match. A term is a word or a
+    quoted phrase, optionally prefixed with a field and a colon, such as ``heading:"Missing Data"``, and with a
+    ``-`` to exclude the templates that match it.
+
+    Args:
+        query (str): The query.
+
+    Returns:
+        list[QueryTerm]: The terms of the query.
+
+    Raises:
+        InvalidQueryError: If the query is empty, has unbalanced quotes or names an unknown field.
+    """
+    try:
+        parts = shlex.split(query)
+    except ValueError as err:
+        raise InvalidQueryError(query, str(err).lower()) from err
+    if not parts:
+        raise InvalidQueryError(query, "the query is empty")
+
+    terms = []
+    for part in parts:
+        negated = part.startswith("-")
+        field, separator, value = part.removeprefix("-").partition(":")
+        if not separator:
+            field, value = None, field
+        elif field not in FIELDS:
+            raise InvalidQueryError(query, f"unknown field {field!r}, expected one of {', '.join(FIELDS)}")
+        if not value.strip():
+            raise InvalidQueryError(query, f"{part!r} has no value")
+        terms.append(QueryTerm(field, value.strip().lower(), negated))
+    return terms
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _text(source: str | list[str]) -> str:
+    return "".join(source) if isinstance(source, list) else source if isinstance(source, str) else ""
+
+
+def _imports(source: str) -> set[str]:
+    """Returns the modules a code cell imports, each as its full dotted name and its top-level package."""
+    names = set(_FROM_IMPORT.findall(source))
+    for clause in _IMPORT.findall(source):
+        names.update(name.split()[0] for name in clause.split(","))
+    modules = set()
+    for name in names:
+        modules.update((name.lower(), name.split(".")[0].lower()))
+    return modules
+
+
+def extract_fields(notebook: dict, name: str) -> dict:
+    """Extracts the searchable contents of a notebook.
+
+    Args:
+        notebook (dict): The notebook, as parsed from JSON.
+        name (str): The path of the notebook relative to the templates directory.
+
+    Returns:
+        dict: The terms of each field, sorted, and the headings as lists of words, for matching phrases.
+    """
+    fields = {field: set() for field in FIELDS}
+    headings = []
+    cells = notebook.get("cells") if isinstance(notebook, dict) else None
+    for cell in cells if isinstance(cells, list) else ():
+        if not isinstance(cell, dict):
+            continue
+        source = _text(cell.get("source", ""))
+        if cell.get("cell_type") == "markdown":
+            fields["text"].update(_words(source))
+            for heading in _HEADING.findall(source):
+                words = _words(heading)
+                headings.append(words)
+                fields["heading"].update(words)
+                fields["heading"].update(_pairs(words))
+        elif cell.get("cell_type") == "code":
+            fields["import"].update(_imports(source))
+        metadata = cell.get("metadata")
+        tags = metadata.get("tags") if isinstance(metadata, dict) else None
+        if isinstance(tags, list):
+            fields["tag"].update(tag.lower() for tag in tags if isinstance(tag, str))
+    fields["path"].update(_words(PurePosixPath(name).with_suffix("").as_posix()))
+    return {"terms": {field: sorted(terms) for field, terms in fields.items()}, "headings": headings}
+
+
+def _pairs(words: list[str]) -> list[str]:
+    """Returns the pairs of consecutive words, which index headings by phrase as well as by word."""
+    return [f"{first} {second}" for first, second in itertools.pairwise(words)]
+
+
+def _contains(words: list[str], phrase: list[str]) -> bool:
+    return any(words[start : start + len(phrase)] == phrase for start in range(len(words) - len(phrase) + 1))
+
+
+class TemplateIndex:
+    """A persistent inverted index over the headings, markdown text, cell tags and imports of the templates.
+
+    The index maps every term of every field to the templates that contain it, so that a query is answered with
+    set lookups instead of opening the notebooks. It is saved in a hidden ``.mltc`` directory alongside the
+    templates, or next to a template pack, and kept in sync with the template catalog: when it is refreshed, only
+    the templates whose contents changed since they were indexed, according to the catalog, are read again.
+
+    Matching ignores case. A word in the heading, text or path field matches a whole word; a phrase in the heading
+    field matches consecutive words of one heading, and in the other word fields all of its words. Tags and imports
+    are matched whole, and an import matches both ``sklearn.metrics`` and ``sklearn``.
+
+    Attributes:
+        catalog (TemplateCatalog | PackCatalog): The catalog of the indexed templates.
+        index_path (Path): The path where the index is saved.
+    """
+
+    def __init__(self, catalog: TemplateCatalog | PackCatalog, index_path: str | None = None) -> None:
+        """Initializes the TemplateIndex.
+
+        Args:
+            catalog (TemplateCatalog | PackCatalog): The catalog of the templates to index.
+            index_path (str | None): The path where the index is saved. Defaults to ``.mltc/search-index.json``
+                                     in the templates directory, or ``.mltc/<pack name>.search-index.json`` next
+                                     to a template pack.
+        """
+        self.catalog = catalog
+        if index_path is None:
+            directory = catalog.directory
+            if isinstance(catalog, PackCatalog):
+                index_path = directory.parent / ".mltc" / f"{directory.name}.search-index.json"
+            else:
+                index_path = directory / ".mltc" / "search-index.json"
+        self.index_path = Path(index_path)
+        self._entries = None
+        self._documents = None
+        self._postings = None
+
+    def refresh(self) -> list[CatalogEntry]:
+        """Brings the index up to date with the catalog, and saves it if it changed.
+
+        Returns:
+            list[CatalogEntry]: The catalog entries, in the order that search results are returned in.
+        """
+        with profiling.stage("index", source=str(self.catalog.directory)) as metrics:
+            entries = self.catalog.entries
+            saved = self._load()
+            documents = {}
+            names = []
+            prefix = len(str(self.catalog.directory)) + 1
+            for entry in entries:
+                name = str(entry.path)[prefix:].replace(os.sep, "/")
+                signature = entry.sha256 or f"{entry.size}:{entry.mtime_ns}"
+                document = saved.get("documents", {}).get(name)
+                if document is None or document.get("signature") != signature:
+                    document = {"signature": signature, **self._index(entry.path, name)}
+                    metrics.bytes_read += entry.size
+                documents[name] = document
+                names.append(name)
+
+            postings = saved.get("postings")
+            if saved.get("names") != names or saved.get("documents") != documents:
+                postings = self._invert(names, documents)
+                self._save({"version": INDEX_VERSION, "names": names, "documents": documents, "postings": postings})
+            metrics.cells = len(names)
+        self._entries, self._documents, self._postings = entries, [documents[name] for name in names], postings
+        return entries
+
+    @staticmethod
+    def _index(path: Path, name: str) -> dict:
+        """Reads a template and extracts its fields, indexing an unreadable template by its path only."""
+        try:
+            data = packs.read_bytes(path)
+            notebook = jsonio.loads(data)
+        except (OSError, ValueError):
+            notebook = {}
+        return extract_fields(notebook, name)
+
+    @staticmethod
+    def _invert(names: list[str], documents: dict[str, dict]) -> dict[str, dict[str, list[int]]]:
+        """Builds the postings of every field: each term with the sorted numbers of the templates containing it."""
+        postings = {field: {} for field in FIELDS}
+        for number, name in enumerate(names):
+            for field, terms in documents[name]["terms"].items():
+                for term in terms:
+                    postings[field].setdefault(term, []).append(number)
+        return postings
+
+    def search(self, query: str) -> list[CatalogEntry]:
+        """Finds the templates that match a query.
+
+        Args:
+            query (str): The query, such as ``tag:classification heading:"Missing Data"``. See ``parse_query``.
+
+        Returns:
+            list[CatalogEntry]: The matching templates, in catalog order.
+
+        Raises:
+            InvalidQueryError: If the query cannot be parsed.
+        """
+        terms = parse_query(query)
+        if self._entries is None:
+            self.refresh()
+        with profiling.stage("search", source=query) as metrics:
+            selected = None
+            excluded = set()
+            for term in terms:
+                matches = self._matches(term)
+                if term.negated:
+                    excluded |= matches
+                else:
+                    selected = matches if selected is None else selected & matches
+            if selected is None:
+                selected = set(range(len(self._entries)))
+            numbers = sorted(selected - excluded)
+            metrics.cells = len(numbers)
+        return [self._entries[number] for number in numbers]
+
+    def _matches(self, term: QueryTerm) -> set[int]:
+        """Returns the numbers of the templates that match a term, ignoring its negation."""
+        matches = set()
+        for field in (term.field,) if term.field else FIELDS:
+            if field in _EXACT_FIELDS:
+                matches.update(self._postings[field].get(term.value, ()))
+                continue
+            words = _words(term.value)
+            if not words:
+                continue
+            keys = _pairs(words) if field == "heading" and len(words) > 1 else words
+            found = set(self._postings[field].get(keys[0], ()))
+            for key in keys[1:]:
+                found.intersection_update(self._postings[field].get(key, ()))
+            if len(keys) > 1 and field == "heading":  # the pairs of a longer phrase may come from different headings
+                found = {number for number in found if self._in_heading(number, words)}
+            matches |= found
+        return matches
+
+    def _in_heading(self, number: int, phrase: list[str]) -> bool:
+        return any(_contains(heading, phrase) for heading in self._documents[number]["headings"])
+
+    def _load(self) -> dict:
+        """Loads the saved index, returning an empty index if it is missing, unreadable or outdated."""
+        try:
+            data = self.index_path.read_bytes()
+            saved = jsonio.loads(data)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(saved, dict) or saved.get("version") != INDEX_VERSION:
+            return {}
+        return saved
+
+    def _save(self, index: dict) -> None:
+        """Saves the index atomically. Failures are ignored, since the index can always be rebuilt."""
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(index))
+            temp_path.replace(self.index_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
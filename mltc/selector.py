@@ -2,65 +2,102 @@ from pathlib import Path
 
 import click
 
+from mltc.catalog import CatalogEntry, TemplateCatalog
+from mltc.packs import PackCatalog, template_catalog
+from mltc.registry import TemplateRegistry, is_registry_url
+from mltc.search import TemplateIndex
+
 
 class NotebookSelector:
-    """Facilitates the selection of Jupyter notebooks from a specified directory.
+    """Facilitates the selection of Jupyter notebooks from a specified directory or template pack.
 
     This class is designed to list and display Jupyter notebooks (.ipynb files) located in a given directory
     and its subdirectories, allowing for an organized selection process based on the directory structure.
+    The notebooks are read from a TemplateCatalog, so the directory tree is walked at most once per selector
+    and the numbering shown to users matches the order of ``list_notebooks``. A zip or tar template pack can be
+    used in place of the directory; its notebooks are listed from the archive without extracting it. So can the URL
+    of a template registry, which is synced into its local copy first.
 
     Attributes:
         directory (Path): The directory containing the notebooks. This attribute stores the path
                           as a Path object, facilitating operations on file paths.
+        catalog (TemplateCatalog | PackCatalog): The catalog of the notebooks in the directory or pack.
     """
 
-    def __init__(self, directory: str) -> None:
+    def __init__(self, directory: str, catalog: TemplateCatalog | PackCatalog | None = None) -> None:
         """Initializes the NotebookSelector with the specified directory.
 
         Args:
-            directory (str): The path to the directory where the notebooks are located. The path is
-                             converted to a Path object for internal use.
+            directory (str): The path to the directory where the notebooks are located, or to a template pack, or
+                             the URL of a template registry. The path is converted to a Path object for internal
+                             use.
+            catalog (TemplateCatalog | PackCatalog | None): The catalog to read the notebooks from. Defaults to the
+                                                            persistent catalog of the directory, or the catalog of
+                                                            the pack.
+
+        Raises:
+            RegistryError: If the directory is the URL of a template registry that cannot be synced.
         """
+        if is_registry_url(directory):
+            directory = TemplateRegistry(directory).sync()
         self.directory = Path(directory)
+        self.catalog = catalog if catalog is not None else template_catalog(directory)
 
-    def display_notebooks(self) -> None:
+    def display_notebooks(self, query: str | None = None) -> None:
         """Displays the available notebooks, grouped by their subdirectories.
 
         This method organizes notebooks into their respective subdirectories and displays them with
         continuous numbering across all groups. The display format includes the group name (subdirectory)
         followed by the list of notebooks in that group, each prefixed with a unique number.
+
+        Args:
+            query (str | None): A search query. If given, only the matching notebooks are displayed, keeping the
+                                numbers they have in the full list.
+
+        Raises:
+            InvalidQueryError: If the query cannot be parsed.
         """
-        notebooks = self.list_notebooks()
+        matches = None if query is None else set(self.search(query))
         grouped_notebooks = {}
-        for notebook in notebooks:
-            dir_name = notebook.parent.name
-            if dir_name not in grouped_notebooks:
-                grouped_notebooks[dir_name] = []
-            grouped_notebooks[dir_name].append(notebook)
+        for number, entry in enumerate(self.list_entries(), start=1):
+            if matches is None or entry in matches:
+                grouped_notebooks.setdefault(entry.group, []).append((number, entry.path))
 
-        notebook_count = 1  # continuous numbering from 1
         for group, files in grouped_notebooks.items():
             click.echo(f"{group.capitalize()}:")
-            for file in files:
-                click.echo(f"{notebook_count}: {file}")
-                notebook_count += 1
+            for number, file in files:
+                click.echo(f"{number}: {file}")
             click.echo()  # for readability
 
-    def list_notebooks(self) -> list[str]:
+    def list_entries(self) -> list[CatalogEntry]:
+        """Lists the catalog entries of all Jupyter notebooks in the directory and its subdirectories.
+
+        Returns:
+            list[CatalogEntry]: The catalog entries, in the order used for numbering.
+        """
+        return self.catalog.entries
+
+    def list_notebooks(self) -> list[Path]:
         """Lists all Jupyter notebook files (.ipynb) in the directory and its subdirectories.
 
-        This method searches recursively through the specified directory and its subdirectories to find
-        all .ipynb files, compiling a list of their paths. Files located outside the target directory
-        are skipped to ensure that only relevant notebooks are included.
+        Hidden directories such as ``.git`` and ``.ipynb_checkpoints`` are skipped.
 
         Returns:
             list[Path]: A list of paths to the Jupyter notebooks found within the specified directory
                         and its subdirectories.
         """
-        notebooks = []
-        for file in self.directory.rglob("*.ipynb"):
-            if self.directory in file.parents:
-                notebooks.append(file)
-            else:
-                click.echo(f"Skipping file outside the target directory: {file}")
-        return notebooks
+        return [entry.path for entry in self.list_entries()]
+
+    def search(self, query: str) -> list[CatalogEntry]:
+        """Finds the notebooks whose contents match a query, using the search index of the directory or pack.
+
+        Args:
+            query (str): The query, such as ``tag:classification heading:"Missing Data"``.
+
+        Returns:
+            list[CatalogEntry]: The catalog entries of the matching notebooks, in the order used for numbering.
+
+        Raises:
+            InvalidQueryError: If the query cannot be parsed.
+        """
+        return TemplateIndex(self.catalog).search(query)
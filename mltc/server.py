@@ -0,0 +1,444 @@
+import json
+import os
+import socketserver
+import stat
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import nbformat
+
+from mltc import packs
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.transforms import TransformPipeline
+from mltc.validator import NotebookValidationError, NotebookValidator, VerdictMemo
+from mltc.writer import NotebookWriter, iter_notebook_json
+
+# The number of recent requests whose latencies are kept for the percentiles reported by /stats.
+LATENCY_WINDOW = 1024
+
+
+class TemplateNotFoundError(Exception):
+    """Exception raised when a merge request names a template that does not exist."""
+
+    def __init__(self, template_id: str) -> None:
+        """Initializes the TemplateNotFoundError with the requested template id.
+
+        Args:
+            template_id (str): The id of the template, its path relative to the templates directory.
+        """
+        self.template_id = template_id
+        super().__init__(f"Unknown template {template_id!r}.")
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Removes a socket file left behind at a path by an earlier server, refusing to remove anything else."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        err_msg = f"Cannot listen on {path}: it exists and is not a socket."
+        raise FileExistsError(err_msg)
+    Path(path).unlink(missing_ok=True)
+
+
+class ServerStats:
+    """Thread-safe request counters and latencies of a merge server."""
+
+    def __init__(self) -> None:
+        """Initializes the ServerStats with zeroed counters."""
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.merges = 0
+
+    def record(self, started: float, *, error: bool = False, merge: bool = False) -> None:
+        """Records a completed request.
+
+        Args:
+            started (float): The ``time.perf_counter`` value when the request was received.
+            error (bool): Whether the request failed.
+            merge (bool): Whether the request merged a notebook.
+        """
+        latency = time.perf_counter() - started
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self.merges += merge and not error
+            self._latencies.append(latency)
+
+    def snapshot(self) -> dict:
+        """Returns the counters, throughput and latency percentiles of the recent requests, in seconds."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            uptime = time.monotonic() - self._started
+            snapshot = {
+                "uptime_seconds": uptime,
+                "requests": self.requests,
+                "errors": self.errors,
+                "merges": self.merges,
+                "requests_per_second": self.requests / uptime if uptime else 0.0,
+            }
+        if latencies:
+            snapshot["latency_seconds"] = {
+                "mean": sum(latencies) / len(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "max": latencies[-1],
+            }
+        return snapshot
+
+
+class TemplateStore:
+    """Keeps parsed and validated templates in memory for the lifetime of a server.
+
+    A template is read and validated the first time it is requested. Every later request only stats the file and
+    reuses the parsed notebook if its modification time and size are unchanged, so edited templates are picked up
+    without restarting the server. Templates in a pack are all read again when the pack changes.
+
+    Attributes:
+        directory (Path): The templates directory or template pack. Template ids are paths relative to it.
+        validator (NotebookValidator): The validator used when a template is loaded.
+        verdicts (VerdictMemo): The verdicts on the loaded valid templates, which merges reuse instead of
+                                validating the templates again.
+        hits (int): The number of requests served from memory.
+        loads (int): The number of times a template was read and validated.
+    """
+
+    def __init__(self, directory: str, validator: NotebookValidator | None = None) -> None:
+        """Initializes the TemplateStore.
+
+        Args:
+            directory (str): The templates directory.
+            validator (NotebookValidator | None): The validator used when a template is loaded. Defaults to a
+                                                  plain NotebookValidator.
+        """
+        self.directory = Path(directory).resolve()
+        self.validator = validator or NotebookValidator()
+        self.verdicts = VerdictMemo(self.validator)
+        self.catalog = packs.template_catalog(str(self.directory))
+        self.hits = 0
+        self.loads = 0
+        self._templates = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def list_templates(self) -> list[dict]:
+        """Lists the templates in the directory, refreshing the catalog.
+
+        Returns:
+            list[dict]: The id, group and cell count of every template, in catalog order.
+        """
+        with self._lock:
+            entries = self.catalog.refresh()
+        return [
+            {
+                "id": entry.path.relative_to(self.directory).as_posix(),
+                "group": entry.group,
+                "cells": entry.cell_count,
+            }
+            for entry in entries
+        ]
+
+    def get(self, template_id: str) -> nbformat.NotebookNode:
+        """Returns a parsed and validated template, reading it again only if it changed on disk.
+
+        The returned notebook is shared between requests and must not be modified.
+
+        Args:
+            template_id (str): The path of the template relative to the templates directory.
+
+        Returns:
+            nbformat.NotebookNode: The template.
+
+        Raises:
+            TemplateNotFoundError: If the id does not name a notebook inside the templates directory.
+            NotebookValidationError: If the template is not a valid notebook.
+        """
+        path = (self.directory / template_id).resolve()
+        if path.suffix != ".ipynb" or not path.is_relative_to(self.directory):
+            raise TemplateNotFoundError(template_id)
+        try:
+            stat = packs.stat(path)
+        except OSError as err:
+            raise TemplateNotFoundError(template_id) from err
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._templates.get(path)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return self._result(cached[1])
+            path_lock = self._loading.setdefault(path, threading.Lock())
+
+        # Concurrent requests for the same changed template wait for one load instead of all loading it.
+        with path_lock:
+            with self._lock:
+                cached = self._templates.get(path)
+                if cached is not None and cached[0] == version:
+                    self.hits += 1
+                    return self._result(cached[1])
+            return self._load(path, template_id, version)
+
+    def _load(self, path: Path, template_id: str, version: tuple[int, int]) -> nbformat.NotebookNode:
+        """Reads and validates a template and stores the outcome, valid or not."""
+        try:
+            notebook = NotebookReader.read_notebook(str(path))
+            self.validator.is_valid(notebook, source=template_id)
+            result = notebook
+        except FileNotFoundError as err:
+            raise TemplateNotFoundError(template_id) from err
+        except (OSError, ValueError, nbformat.ValidationError, nbformat.NBFormatError) as err:
+            result = NotebookValidationError(f"Cannot read template {template_id}: {err}")
+        except NotebookValidationError as err:
+            result = err
+
+        with self._lock:
+            self.loads += 1
+            replaced = self._templates.get(path)
+            if replaced is not None and isinstance(replaced[1], dict):
+                self.verdicts.forget(replaced[1])
+            self._templates[path] = (version, result)
+            if isinstance(result, dict):
+                self.verdicts.record(result)
+        return self._result(result)
+
+    @staticmethod
+    def _result(result: nbformat.NotebookNode | NotebookValidationError) -> nbformat.NotebookNode:
+        if isinstance(result, NotebookValidationError):
+            raise NotebookValidationError(result.message)
+        return result
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Serves the merge API. The server it belongs to is a MergeServer's HTTP server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        started = time.perf_counter()
+        merge_server = self.server.merge_server
+        if self.path == "/templates":
+            self._send_json(started, HTTPStatus.OK, {"templates": merge_server.store.list_templates()})
+        elif self.path == "/stats":
+            self._send_json(started, HTTPStatus.OK, merge_server.snapshot())
+        else:
+            self._send_error(started, HTTPStatus.NOT_FOUND, f"Unknown path {self.path}.")
+
+    def do_POST(self) -> None:  # noqa: N802
+        started = time.perf_counter()
+        if self.path != "/merge":
+            self._send_error(started, HTTPStatus.NOT_FOUND, f"Unknown path {self.path}.")
+            return
+        request = self._read_merge_request()
+        if request is None:
+            message = 'Expected a JSON object with a "templates" list of template ids and an optional "output".'
+            self._send_error(started, HTTPStatus.BAD_REQUEST, message)
+            return
+        template_ids, output = request
+
+        merge_server = self.server.merge_server
+        try:
+            merged = merge_server.merge(template_ids)
+            if output is not None:
+                output_path = merge_server.write(merged, output)
+                body = {"output": str(output_path), "cells": len(merged.cells)}
+                self._send_json(started, HTTPStatus.OK, body, merge=True)
+            else:
+                data = "".join(iter_notebook_json(merged)).encode()
+                self._send(started, HTTPStatus.OK, "application/x-ipynb+json", data, merge=True)
+        except TemplateNotFoundError as err:
+            self._send_error(started, HTTPStatus.NOT_FOUND, str(err))
+        except NotebookValidationError as err:
+            self._send_error(started, HTTPStatus.UNPROCESSABLE_ENTITY, err.message)
+        except OSError as err:
+            status = HTTPStatus.FORBIDDEN if isinstance(err, PermissionError) else HTTPStatus.INTERNAL_SERVER_ERROR
+            self._send_error(started, status, str(err))
+
+    def _read_merge_request(self) -> tuple[list[str], str | None] | None:
+        """Returns the template ids and output path of a merge request, or None if the request is malformed."""
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            return None
+        if not isinstance(request, dict):
+            return None
+        template_ids = request.get("templates")
+        output = request.get("output")
+        if not isinstance(template_ids, list) or not all(isinstance(item, str) for item in template_ids):
+            return None
+        if output is not None and not isinstance(output, str):
+            return None
+        return template_ids, output
+
+    def _send(self, started: float, status: HTTPStatus, content_type: str, data: bytes, *, merge: bool = False) -> None:
+        """Sends a response. The request is counted before the response is sent, so clients see up-to-date stats."""
+        self.server.merge_server.stats.record(started, error=status >= HTTPStatus.BAD_REQUEST, merge=merge)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, started: float, status: HTTPStatus, body: dict, *, merge: bool = False) -> None:
+        self._send(started, status, "application/json", json.dumps(body).encode(), merge=merge)
+
+    def _send_error(self, started: float, status: HTTPStatus, message: str) -> None:
+        self._send_json(started, status, {"error": message})
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        if self.server.merge_server.verbose:
+            super().log_message(format, *args)
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """An HTTP server on a Unix socket that handles each connection in its own thread."""
+
+    daemon_threads = True
+
+
+class MergeServer:
+    """Long-running merge server that keeps templates warm in memory.
+
+    The server speaks a small JSON API over HTTP, either on a localhost TCP port or on a Unix socket, and handles
+    every connection in its own thread:
+
+    - ``GET /templates`` lists the template ids, their groups and cell counts.
+    - ``POST /merge`` with ``{"templates": [ids...]}`` returns the merged notebook, or with an additional
+      ``"output"`` path writes it below the output directory and returns its path.
+    - ``GET /stats`` returns request counters, throughput, latency percentiles and template cache counters.
+
+    Attributes:
+        store (TemplateStore): The in-memory template cache.
+        stats (ServerStats): The request counters.
+        output_dir (Path | None): The directory merged notebooks may be written to, or None to only return them.
+        stream (bool): Whether merged notebooks are streamed to disk with an atomic replace.
+        verbose (bool): Whether each request is logged to standard error.
+        transforms (TransformPipeline | None): The transforms applied to the cells of every merged notebook.
+    """
+
+    def __init__(
+        self,
+        store: TemplateStore,
+        output_dir: str | None = None,
+        *,
+        stream: bool = False,
+        verbose: bool = False,
+        transforms: TransformPipeline | None = None,
+    ) -> None:
+        """Initializes the MergeServer.
+
+        Args:
+            store (TemplateStore): The template cache to merge from.
+            output_dir (str | None): The directory merged notebooks may be written to. Requests with an output path
+                                     are refused if it is None.
+            stream (bool): Whether to stream merged notebooks to disk cell by cell with an atomic replace.
+            verbose (bool): Whether to log each request to standard error.
+            transforms (TransformPipeline | None): The transforms applied to the cells of every merged notebook.
+        """
+        self.store = store
+        self.stats = ServerStats()
+        self.output_dir = Path(output_dir).resolve() if output_dir is not None else None
+        self.stream = stream
+        self.verbose = verbose
+        self.transforms = transforms
+        self.httpd = None
+
+    def merge(self, template_ids: list[str]) -> nbformat.NotebookNode:
+        """Merges templates from the store.
+
+        Args:
+            template_ids (list[str]): The ordered ids of the templates to merge.
+
+        Returns:
+            nbformat.NotebookNode: The merged notebook.
+
+        Raises:
+            TemplateNotFoundError: If a template does not exist.
+            NotebookValidationError: If a template is not a valid notebook.
+        """
+        notebooks = [self.store.get(template_id) for template_id in template_ids]
+        merger = NotebookMerger(validator=self.store.verdicts, transforms=self.transforms)
+        # The merger gives cells with duplicate ids new ids on copies, so validating the merged notebook when it is
+        # written never renames cells of the shared templates.
+        return merger.merge_notebooks(notebooks, sources=template_ids)
+
+    def write(self, notebook: nbformat.NotebookNode, output: str) -> Path:
+        """Writes a merged notebook below the output directory.
+
+        Args:
+            notebook (nbformat.NotebookNode): The merged notebook.
+            output (str): The output path, relative to the output directory.
+
+        Returns:
+            Path: The path the notebook was written to.
+
+        Raises:
+            PermissionError: If writing is disabled or the path is outside the output directory.
+            OSError: If the notebook cannot be written.
+        """
+        if self.output_dir is None:
+            err_msg = "Writing merged notebooks is disabled; start the server with an output directory."
+            raise PermissionError(err_msg)
+        path = (self.output_dir / output).resolve()
+        if not path.is_relative_to(self.output_dir):
+            err_msg = f"Output path {output} is outside the output directory."
+            raise PermissionError(err_msg)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        NotebookWriter.write_notebook(notebook, str(path), stream=self.stream)
+        return path
+
+    def snapshot(self) -> dict:
+        """Returns the request counters together with the template cache counters."""
+        snapshot = self.stats.snapshot()
+        snapshot["templates"] = {"hits": self.store.hits, "loads": self.store.loads}
+        return snapshot
+
+    def bind(self, host: str = "127.0.0.1", port: int = 0, socket_path: str | None = None) -> str:
+        """Binds the server to a Unix socket or to a TCP port.
+
+        Args:
+            host (str): The host to listen on. Defaults to localhost only.
+            port (int): The TCP port to listen on. Defaults to a free port.
+            socket_path (str | None): The Unix socket to listen on instead of a TCP port. A stale socket file
+                                      at the path is replaced.
+
+        Returns:
+            str: The address the server listens on, as a URL or a socket path.
+
+        Raises:
+            FileExistsError: If something other than a socket exists at the socket path.
+            OSError: If the server cannot listen on the address.
+        """
+        if socket_path is not None:
+            _remove_stale_socket(socket_path)
+            self.httpd = _ThreadingUnixHTTPServer(socket_path, _RequestHandler)
+            address = socket_path
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+            address = f"http://{host}:{self.httpd.server_address[1]}"
+        self.httpd.merge_server = self
+        return address
+
+    def serve_forever(self) -> None:
+        """Handles requests until ``shutdown`` is called from another thread."""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            if isinstance(self.httpd, _ThreadingUnixHTTPServer):
+                Path(self.httpd.server_address).unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """Stops ``serve_forever``."""
+        self.httpd.shutdown()
@@ -0,0 +1,150 @@
+import os
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from mltc import jsonio
+
+if TYPE_CHECKING:  # mltc.compact imports nbformat, which the CLI only loads when it merges
+    from mltc.compact import CompactCell
+
+# Outputs larger than this many bytes, typically embedded images, are spilled by default.
+DEFAULT_SPILL_THRESHOLD = 64 * 1024
+
+
+class SpilledOutput:
+    """A reference to a cell output stored in a SpillStore's file.
+
+    Attributes:
+        offset (int): The position of the output's JSON in the spill file.
+        length (int): The length of the output's JSON in bytes.
+    """
+
+    __slots__ = ("length", "offset")
+
+    def __init__(self, offset: int, length: int) -> None:
+        """Initializes the SpilledOutput.
+
+        Args:
+            offset (int): The position of the output's JSON in the spill file.
+            length (int): The length of the output's JSON in bytes.
+        """
+        self.offset = offset
+        self.length = length
+
+
+class SpillStore:
+    """Keeps large cell outputs in a temporary file instead of in memory until the merged notebook is written.
+
+    Every output is measured as compact JSON. Outputs larger than the threshold are written to the spill file and
+    replaced in their cell by a SpilledOutput. If a memory budget is set, smaller outputs are spilled too once the
+    outputs kept in memory add up to the budget. ``restore_cells`` reads the outputs back one cell at a time, so
+    that streaming the merged notebook to disk only ever holds one cell's outputs.
+
+    The spill file is deleted when the store is closed.
+
+    Attributes:
+        threshold (int): The size in bytes above which outputs are always spilled.
+        budget (int | None): The total size in bytes of the outputs kept in memory, or None for no limit.
+        kept_bytes (int): The size of the outputs kept in memory so far.
+        spilled_bytes (int): The size of the outputs spilled so far.
+        spilled_outputs (int): The number of outputs spilled so far.
+    """
+
+    def __init__(
+        self, threshold: int = DEFAULT_SPILL_THRESHOLD, budget: int | None = None, directory: str | None = None
+    ) -> None:
+        """Initializes the SpillStore and creates its spill file.
+
+        Args:
+            threshold (int): The size in bytes above which outputs are always spilled.
+            budget (int | None): The total size in bytes of the outputs kept in memory. Defaults to no limit.
+            directory (str | None): The directory of the spill file. Defaults to the system's temporary directory.
+
+        Raises:
+            OSError: If the spill file cannot be created.
+        """
+        self.threshold = threshold
+        self.budget = budget
+        self.kept_bytes = 0
+        self.spilled_bytes = 0
+        self.spilled_outputs = 0
+        self._file = tempfile.TemporaryFile(dir=directory, prefix="mltc-spill-")
+
+    def spill_cell(self, cell: "CompactCell") -> "CompactCell":
+        """Spills the large outputs of a cell.
+
+        Args:
+            cell (CompactCell): The cell.
+
+        Returns:
+            CompactCell: The cell, or a copy whose large outputs are SpilledOutputs. The given cell is not modified.
+
+        Raises:
+            OSError: If the spill file cannot be written.
+        """
+        value = cell.to_dict()
+        outputs = value.get("outputs")
+        if not outputs:
+            return cell
+        kept = []
+        spilled = False
+        for output in outputs:
+            data = jsonio.dumps(output)
+            if len(data) > self.threshold or (self.budget is not None and self.kept_bytes + len(data) > self.budget):
+                kept.append(self._write(data))
+                spilled = True
+            else:
+                kept.append(output)
+                self.kept_bytes += len(data)
+        if not spilled:
+            return cell
+        from mltc.compact import CompactCell
+
+        return CompactCell({**value, "outputs": kept})
+
+    def _write(self, data: bytes) -> SpilledOutput:
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self.spilled_bytes += len(data)
+        self.spilled_outputs += 1
+        return SpilledOutput(offset, len(data))
+
+    def restore_cells(self, cells: Iterable["CompactCell"]) -> Iterator[dict]:
+        """Yields the cells as dicts with their spilled outputs read back, one cell at a time.
+
+        Args:
+            cells (Iterable[CompactCell]): The cells, some of which may have spilled outputs.
+
+        Yields:
+            dict: The cells with all their outputs.
+
+        Raises:
+            OSError: If the spill file cannot be read.
+        """
+        self._file.flush()
+        for cell in cells:
+            value = cell.to_dict()
+            outputs = value.get("outputs")
+            if outputs and any(isinstance(output, SpilledOutput) for output in outputs):
+                value = {**value, "outputs": [self._read(output) for output in outputs]}
+            yield value
+
+    def _read(self, output: dict | SpilledOutput) -> dict:
+        if not isinstance(output, SpilledOutput):
+            return output
+        self._file.seek(output.offset)
+        data = self._file.read(output.length)
+        return jsonio.loads(data)
+
+    def close(self) -> None:
+        """Deletes the spill file."""
+        self._file.close()
+
+    def __enter__(self) -> "SpillStore":
+        """Returns the store."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Deletes the spill file."""
+        self.close()
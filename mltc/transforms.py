@@ -0,0 +1,335 @@
+import hashlib
+import json
+import re
+from collections.abc import Callable, Iterable, Iterator
+from importlib.metadata import entry_points
+
+import nbformat
+
+# A cell transform takes a cell and returns the transformed cell, or None to drop it.
+CellTransform = Callable[[nbformat.NotebookNode], nbformat.NotebookNode | None]
+
+ENTRY_POINT_GROUP = "mltc.transforms"
+
+_REGISTRY: dict[str, Callable[..., CellTransform]] = {}
+
+
+class UnknownTransformError(Exception):
+    """Exception raised when a transform name is not registered."""
+
+    def __init__(self, name: str) -> None:
+        """Initializes the UnknownTransformError with the requested name.
+
+        Args:
+            name (str): The name of the transform.
+        """
+        self.name = name
+        super().__init__(f"Unknown transform {name!r}. Available transforms: {', '.join(available_transforms())}.")
+
+
+def register_transform(name: str) -> Callable[[Callable[..., CellTransform]], Callable[..., CellTransform]]:
+    """Registers a transform factory under a name.
+
+    A factory takes the transform's options as keyword arguments and returns a cell transform: a function that
+    receives a cell and returns it, transformed, or None to drop it. The cell it receives is a shallow copy owned
+    by the pipeline, so a transform may set its keys, but must replace nested values such as ``outputs`` or
+    ``metadata`` instead of modifying them in place, because they are shared with the input notebook.
+
+    Transforms can also be registered by installed packages, under the ``mltc.transforms`` entry point group.
+
+    Example:
+        .. code-block:: python
+
+            @register_transform("uppercase-markdown")
+            def uppercase_markdown() -> CellTransform:
+                def transform(cell):
+                    if cell.cell_type == "markdown":
+                        cell["source"] = cell.source.upper()
+                    return cell
+
+                return transform
+
+    Args:
+        name (str): The name of the transform, used on the command line and in build fingerprints.
+
+    Returns:
+        Callable: A decorator that registers the factory and returns it unchanged.
+    """
+
+    def decorator(factory: Callable[..., CellTransform]) -> Callable[..., CellTransform]:
+        _REGISTRY[name] = factory
+        return factory
+
+    return decorator
+
+
+def available_transforms() -> list[str]:
+    """Returns the names of the registered transforms, including those provided by entry points."""
+    names = set(_REGISTRY)
+    names.update(entry_point.name for entry_point in entry_points(group=ENTRY_POINT_GROUP))
+    return sorted(names)
+
+
+def get_transform(name: str, **options: object) -> CellTransform:
+    """Creates a registered transform.
+
+    Args:
+        name (str): The name of the transform.
+        **options (object): The options passed to the transform's factory.
+
+    Returns:
+        CellTransform: The cell transform.
+
+    Raises:
+        UnknownTransformError: If no transform is registered under the name.
+    """
+    factory = _REGISTRY.get(name)
+    if factory is None:
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=name):
+            factory = _REGISTRY.setdefault(name, entry_point.load())
+            break
+        else:
+            raise UnknownTransformError(name)
+    return factory(**options)
+
+
+class TransformPipeline:
+    """Applies a sequence of cell transforms to every cell in a single pass.
+
+    Each cell is shallow-copied once and passed through every transform in turn, stopping as soon as one of them
+    drops it, so the input notebooks are never modified and no transform needs a pass of its own.
+
+    The pipeline is defined by the names and options of its transforms. They are recorded in build fingerprints,
+    and the pipeline is pickled as them, so it can be sent to worker processes.
+
+    Some transforms, such as deduplication, keep state across the notebooks of one merge. The merger therefore
+    runs a ``fresh`` copy of the pipeline for every merge, and reports the ``summaries`` of its transforms.
+
+    Attributes:
+        specs (list[tuple[str, dict]]): The name and options of each transform, in the order they are applied.
+    """
+
+    def __init__(self, specs: Iterable[tuple[str, dict]] = ()) -> None:
+        """Initializes the TransformPipeline.
+
+        Args:
+            specs (Iterable[tuple[str, dict]]): The name and options of each transform, in the order they are applied.
+
+        Raises:
+            UnknownTransformError: If a transform is not registered.
+        """
+        self.specs = [(name, dict(options)) for name, options in specs]
+        self._transforms = [get_transform(name, **options) for name, options in self.specs]
+
+    def __bool__(self) -> bool:
+        """Returns True if the pipeline has any transforms."""
+        return bool(self.specs)
+
+    def __call__(self, cells: Iterable[nbformat.NotebookNode]) -> Iterator[nbformat.NotebookNode]:
+        """Transforms cells lazily.
+
+        Args:
+            cells (Iterable[nbformat.NotebookNode]): The cells to transform.
+
+        Yields:
+            nbformat.NotebookNode: The transformed cells that were not dropped.
+        """
+        for cell in cells:
+            transformed = nbformat.NotebookNode(cell)
+            for transform in self._transforms:
+                transformed = transform(transformed)
+                if transformed is None:
+                    break
+            else:
+                yield transformed
+
+    def fresh(self) -> "TransformPipeline":
+        """Returns a new pipeline with the same transforms, without any state left by a previous merge."""
+        return TransformPipeline(self.specs)
+
+    def summaries(self) -> list[str]:
+        """Returns what the transforms that report on their work, such as deduplication, did so far."""
+        return [transform.summary() for transform in self._transforms if hasattr(transform, "summary")]
+
+    def __getstate__(self) -> dict:
+        """Pickles the pipeline as its specs, since transforms are usually closures."""
+        return {"specs": self.specs}
+
+    def __setstate__(self, state: dict) -> None:
+        """Rebuilds the transforms from their specs."""
+        self.__init__(state["specs"])
+
+    def fingerprint_options(self) -> dict:
+        """Returns the build options recorded in the fingerprint of a notebook merged with this pipeline.
+
+        An empty pipeline gives no options, so that its fingerprints match those of a merge without transforms.
+        """
+        return {"transforms": [[name, options] for name, options in self.specs]} if self.specs else {}
+
+
+@register_transform("strip-outputs")
+def strip_outputs() -> CellTransform:
+    """Removes the outputs of code cells."""
+
+    def transform(cell: nbformat.NotebookNode) -> nbformat.NotebookNode:
+        if cell.get("cell_type") == "code":
+            cell["outputs"] = []
+        return cell
+
+    return transform
+
+
+@register_transform("clear-execution-counts")
+def clear_execution_counts() -> CellTransform:
+    """Resets the execution counts of code cells and their execute_result outputs."""
+
+    def transform(cell: nbformat.NotebookNode) -> nbformat.NotebookNode:
+        if cell.get("cell_type") == "code":
+            cell["execution_count"] = None
+            cell["outputs"] = [
+                nbformat.NotebookNode({**output, "execution_count": None}) if "execution_count" in output else output
+                for output in cell.get("outputs", ())
+            ]
+        return cell
+
+    return transform
+
+
+@register_transform("drop-tags")
+def drop_tags(tags: Iterable[str]) -> CellTransform:
+    """Drops cells that carry any of the given tags in their metadata."""
+    tags = frozenset(tags)
+
+    def transform(cell: nbformat.NotebookNode) -> nbformat.NotebookNode | None:
+        return None if tags.intersection(cell.get("metadata", {}).get("tags", ())) else cell
+
+    return transform
+
+
+@register_transform("drop-cell-types")
+def drop_cell_types(cell_types: Iterable[str]) -> CellTransform:
+    """Drops cells of the given types, such as "raw" or "markdown"."""
+    cell_types = frozenset(cell_types)
+
+    def transform(cell: nbformat.NotebookNode) -> nbformat.NotebookNode | None:
+        return None if cell.get("cell_type") in cell_types else cell
+
+    return transform
+
+
+@register_transform("cap-outputs")
+def cap_outputs(max_bytes: int) -> CellTransform:
+    """Replaces outputs larger than a size limit, such as embedded images, with a short note."""
+
+    def transform(cell: nbformat.NotebookNode) -> nbformat.NotebookNode:
+        if cell.get("cell_type") != "code" or not cell.get("outputs"):
+            return cell
+        outputs = []
+        for output in cell["outputs"]:
+            size = len(json.dumps(output, ensure_ascii=False).encode())
+            if size <= max_bytes:
+                outputs.append(output)
+                continue
+            note = f"[{output.get('output_type', 'output')} output of {size} bytes removed by mltc]\n"
+            outputs.append(nbformat.v4.new_output("stream", name="stdout", text=note))
+        cell["outputs"] = outputs
+        return cell
+
+    return transform
+
+
+class CellDeduplicator:
+    """Drops cells that repeat an earlier cell, and attachments that repeat within a cell.
+
+    Cells are identified by a hash of their type, source and attachments, so outputs, ids and metadata are ignored.
+    Only the first cell with a given hash is kept. Within a markdown cell, attachments with the same payload are
+    stored once and the references to the others in the source are pointed at it. The notebook format has no way
+    to share an attachment between cells, so repeats across cells that are not duplicates are kept.
+
+    The deduplicator keeps state across the notebooks of a merge; see ``TransformPipeline.fresh``.
+
+    Attributes:
+        cell_types (frozenset[str]): The cell types to deduplicate, or empty for all types.
+        tags (frozenset[str]): The tags of the cells to deduplicate, or empty for all cells.
+        cells_dropped (int): The number of duplicate cells dropped.
+        attachments_dropped (int): The number of duplicate attachments dropped.
+        bytes_saved (int): The size of the dropped cells and attachments as compact JSON.
+    """
+
+    def __init__(self, cell_types: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        """Initializes the CellDeduplicator.
+
+        A cell is deduplicated if it matches both filters; an empty filter matches every cell.
+
+        Args:
+            cell_types (Iterable[str]): The cell types to deduplicate. Defaults to all types.
+            tags (Iterable[str]): The tags of the cells to deduplicate. Defaults to all cells.
+        """
+        self.cell_types = frozenset(cell_types)
+        self.tags = frozenset(tags)
+        self.cells_dropped = 0
+        self.attachments_dropped = 0
+        self.bytes_saved = 0
+        self._seen = set()
+
+    def __call__(self, cell: nbformat.NotebookNode) -> nbformat.NotebookNode | None:
+        """Returns the cell with its duplicate attachments removed, or None if the cell is a duplicate."""
+        if self.cell_types and cell.get("cell_type") not in self.cell_types:
+            return cell
+        if self.tags and not self.tags.intersection(cell.get("metadata", {}).get("tags", ())):
+            return cell
+
+        if cell.get("attachments"):
+            cell = self._dedup_attachments(cell)
+        key = {"cell_type": cell.get("cell_type"), "source": _source(cell), "attachments": cell.get("attachments")}
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).digest()
+        if digest in self._seen:
+            self.cells_dropped += 1
+            self.bytes_saved += _json_size(cell)
+            return None
+        self._seen.add(digest)
+        return cell
+
+    def _dedup_attachments(self, cell: nbformat.NotebookNode) -> nbformat.NotebookNode:
+        attachments = {}
+        renamed = {}
+        first_by_payload = {}
+        for name, payload in cell["attachments"].items():
+            digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).digest()
+            first = first_by_payload.setdefault(digest, name)
+            if first == name:
+                attachments[name] = payload
+                continue
+            renamed[name] = first
+            self.attachments_dropped += 1
+            self.bytes_saved += _json_size(payload)
+        if renamed:
+            names = "|".join(re.escape(name) for name in sorted(renamed, key=len, reverse=True))
+            pattern = re.compile(f"attachment:({names})(?![^\\s)\"'>])")
+            cell["source"] = pattern.sub(lambda match: f"attachment:{renamed[match.group(1)]}", _source(cell))
+            cell["attachments"] = nbformat.NotebookNode(attachments)
+        return cell
+
+    def summary(self) -> str:
+        """Returns a one-line report of what was removed."""
+        return (
+            f"Deduplication removed {self.cells_dropped} cells and {self.attachments_dropped} attachments, "
+            f"saving {self.bytes_saved} bytes."
+        )
+
+
+def _source(cell: nbformat.NotebookNode) -> str:
+    """Returns the source of a cell as a string, also when it is stored as a list of lines."""
+    source = cell.get("source", "")
+    return "".join(source) if isinstance(source, list) else source
+
+
+def _json_size(value: object) -> int:
+    """Returns the size of a value serialized as compact JSON."""
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+@register_transform("dedup")
+def dedup(cell_types: Iterable[str] = (), tags: Iterable[str] = ()) -> CellTransform:
+    """Drops duplicate cells and attachments. See ``CellDeduplicator``."""
+    return CellDeduplicator(cell_types=cell_types, tags=tags)
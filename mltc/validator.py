@@ -1,5 +1,20 @@
+import re
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
 import nbformat
 
+from mltc import profiling
+from mltc.cache import ValidationCache
+from mltc.compact import CompactNotebook
+from mltc.engine import CompiledSchemaEngine
+
+if TYPE_CHECKING:
+    from mltc.incremental import IncrementalNotebook
+
+_CELL_LOCATION = re.compile(r"\bCell (\d+): ")
+
 
 class NotebookValidationError(Exception):
     """Exception raised for notebook validation errors."""
@@ -10,20 +25,44 @@ class NotebookValidationError(Exception):
         super().__init__(self.message)
 
 
+def _with_source(message: str, source: str | None) -> str:
+    """Inserts the notebook's path into the cell locations of a message that was produced without it."""
+    if source is None:
+        return message
+    return _CELL_LOCATION.sub(lambda match: f"Cell {match[1]} of {source}: ", message)
+
+
 class NotebookValidator:
     """Jupyter notebook validator class.
 
     This class provides methods to validate Jupyter notebooks based on the Jupyter notebook format schema.
+
+    Attributes:
+        cache (ValidationCache | None): An optional cache of validation verdicts. Notebooks with a cached verdict
+                                        skip schema validation entirely.
+        engine (CompiledSchemaEngine | None): An optional engine that validates the notebook envelope and each cell
+                                              separately against a precompiled schema. If None, ``nbformat.validate``
+                                              is used.
     """
 
-    @staticmethod
-    def is_valid(notebook: nbformat.NotebookNode) -> bool:
+    def __init__(self, cache: ValidationCache | None = None, engine: CompiledSchemaEngine | None = None) -> None:
+        """Initializes the NotebookValidator.
+
+        Args:
+            cache (ValidationCache | None): An optional cache of validation verdicts.
+            engine (CompiledSchemaEngine | None): An optional compiled schema engine to validate with.
+        """
+        self.cache = cache
+        self.engine = engine
+
+    def is_valid(self, notebook: nbformat.NotebookNode | CompactNotebook, source: str | None = None) -> bool:
         """Validates the notebook's adherence to the Jupyter notebook format schema.
 
         Returns True if the notebook is valid, False otherwise.
 
         Args:
-            notebook (nbformat.NotebookNode): The notebook object.
+            notebook (nbformat.NotebookNode | CompactNotebook): The notebook object.
+            source (str | None): The notebook's path or name, used to report invalid cells.
 
         Returns:
             bool: True if the notebook is valid, False otherwise.
@@ -31,6 +70,86 @@ class NotebookValidator:
         Raises:
             NotebookValidationError: If the notebook fails validation checks.
         """
+        if isinstance(notebook, CompactNotebook):
+            notebook = notebook.to_dict()
+        with profiling.stage("validate", source=source) as metrics:
+            if isinstance(notebook, dict) and isinstance(notebook.get("cells"), list):
+                metrics.cells = len(notebook["cells"])
+            return self._check(notebook, source)
+
+    def is_valid_incremental(self, notebook: "IncrementalNotebook", source: str | None = None) -> bool:
+        """Validates a notebook that is read incrementally, one cell at a time.
+
+        The envelope is validated without cells, and each cell as the only cell of a notebook with the same
+        envelope. The schema constrains every cell on its own, so the verdict is the same as for the whole notebook,
+        but only one cell is held in memory at a time. With a compiled engine, a cell id that repeats an earlier
+        one is reported as for whole notebooks. The validation cache is not used.
+
+        Args:
+            notebook (IncrementalNotebook): The notebook.
+            source (str | None): The notebook's path or name, used to report invalid cells.
+
+        Returns:
+            bool: True if the notebook is valid.
+
+        Raises:
+            NotebookValidationError: If the notebook fails validation checks.
+            nbformat.reader.NotJSONError: If the notebook is not well-formed JSON.
+        """
+        with profiling.stage("validate", source=source) as metrics:
+            envelope = notebook.envelope
+            self._validate({**envelope, "cells": []}, source)
+            seen_ids = set()
+            for index, cell in enumerate(notebook.iter_cells()):
+                value = cell.to_dict()
+                try:
+                    self._validate({**envelope, "cells": [value]}, None)
+                    reason = None
+                except NotebookValidationError:
+                    reason = "is invalid."
+                cell_id = value.get("id")
+                if reason is None and self.engine is not None and cell_id is not None:
+                    reason = f"has the duplicate cell id {cell_id!r}." if cell_id in seen_ids else None
+                    seen_ids.add(cell_id)
+                if reason is not None:
+                    location = f"Cell {index}" if source is None else f"Cell {index} of {source}"
+                    err_msg = (
+                        f"The notebook does not conform to the Jupyter notebook format schema. {location} {reason}"
+                    )
+                    raise NotebookValidationError(err_msg)
+                metrics.cells = index + 1
+        return True
+
+    def _check(self, notebook: nbformat.NotebookNode, source: str | None) -> bool:
+        """Validates a notebook, consulting the cache if there is one.
+
+        Notebooks are validated without their source when the verdict is cached, so that the cached message does
+        not depend on the path the notebook was read from; the source is inserted again when the error is raised.
+        """
+        if self.cache is None or not isinstance(notebook, dict):
+            return self._validate(notebook, source)
+        try:
+            key = self.cache.key(notebook, "nbformat" if self.engine is None else self.engine.name)
+        except (TypeError, ValueError):
+            return self._validate(notebook, source)  # not serializable, so it cannot be cached
+        verdict = self.cache.get(key)
+        if verdict is not None:
+            valid, message = verdict
+            if not valid:
+                raise NotebookValidationError(_with_source(message, source))
+            return True
+
+        try:
+            self._validate(notebook, None)
+        except NotebookValidationError as err:
+            self.cache.put(key, valid=False, message=err.message)
+            raise NotebookValidationError(_with_source(err.message, source)) from err.__cause__
+        self.cache.put(key, valid=True)
+        return True
+
+    def _validate(self, notebook: nbformat.NotebookNode, source: str | None) -> bool:
+        if self.engine is not None:
+            return self._validate_with_engine(notebook, source)
         try:
             nbformat.validate(notebook)
         except nbformat.ValidationError as err:
@@ -40,3 +159,97 @@ class NotebookValidator:
             err_msg = "Invalid input: The provided object is not a valid notebook."
             raise NotebookValidationError(err_msg) from err
         return True
+
+    def _validate_with_engine(self, notebook: nbformat.NotebookNode, source: str | None) -> bool:
+        try:
+            errors = self.engine.find_errors(notebook, source)
+        except (TypeError, ValueError) as err:
+            err_msg = "Invalid input: The provided object is not a valid notebook."
+            raise NotebookValidationError(err_msg) from err
+        if errors:
+            details = "; ".join(str(error) for error in errors)
+            err_msg = f"The notebook does not conform to the Jupyter notebook format schema. {details}"
+            raise NotebookValidationError(err_msg) from errors[0]
+        return True
+
+
+class VerdictMemo(NotebookValidator):
+    """Remembers the verdict on every notebook object it validates, so that each object is validated only once.
+
+    Verdicts are kept per notebook object, together with the object, so that they are never mistaken for the verdict
+    on another object that reuses its id. A notebook that is read again is a new object and is validated again.
+    Verdicts reached elsewhere can be recorded with ``record``, and ``forget`` and ``retain`` drop the verdicts on
+    notebooks that are no longer used. The memo can be shared between threads.
+
+    Attributes:
+        validator (NotebookValidator): The validator that checks notebooks without a verdict.
+    """
+
+    def __init__(self, validator: NotebookValidator | None = None) -> None:
+        """Initializes the VerdictMemo.
+
+        Args:
+            validator (NotebookValidator | None): The validator that checks notebooks without a verdict. Defaults to
+                                                  a plain NotebookValidator.
+        """
+        validator = validator or NotebookValidator()
+        super().__init__(cache=validator.cache, engine=validator.engine)
+        self.validator = validator
+        self._verdicts = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """Drops the verdicts and the lock, which mean nothing to the other process, when sent to a worker."""
+        state = self.__dict__.copy()
+        state["_verdicts"] = {}
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the memo in a worker process with a fresh lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def is_valid(self, notebook: nbformat.NotebookNode | CompactNotebook, source: str | None = None) -> bool:
+        """Validates the notebook, unless it has a verdict already.
+
+        Raises:
+            NotebookValidationError: If the notebook fails validation checks, now or before.
+        """
+        known = self.verdict(notebook)
+        if known is None:
+            try:
+                self.validator.is_valid(notebook, source=source)
+                known = True, None
+            except NotebookValidationError as err:
+                known = False, err.message
+            self.record(notebook, known[1])
+        if not known[0]:
+            raise NotebookValidationError(known[1])
+        return True
+
+    def verdict(self, notebook: nbformat.NotebookNode | CompactNotebook) -> tuple[bool, str | None] | None:
+        """Returns the verdict on a notebook object and its validation error message, or None if it has none."""
+        with self._lock:
+            known = self._verdicts.get(id(notebook))
+        if known is None or known[0] is not notebook:
+            return None
+        return known[1] is None, known[1]
+
+    def record(self, notebook: nbformat.NotebookNode | CompactNotebook, message: str | None = None) -> None:
+        """Records the verdict on a notebook object: valid, or invalid with a validation error message."""
+        with self._lock:
+            self._verdicts[id(notebook)] = (notebook, message)
+
+    def forget(self, notebook: nbformat.NotebookNode | CompactNotebook) -> None:
+        """Forgets the verdict on a notebook object."""
+        with self._lock:
+            known = self._verdicts.get(id(notebook))
+            if known is not None and known[0] is notebook:
+                del self._verdicts[id(notebook)]
+
+    def retain(self, notebooks: Iterable[nbformat.NotebookNode | CompactNotebook]) -> None:
+        """Forgets the verdicts on every notebook except the given ones."""
+        keep = {id(notebook) for notebook in notebooks}
+        with self._lock:
+            self._verdicts = {key: known for key, known in self._verdicts.items() if key in keep}
@@ -0,0 +1,208 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from mltc import packs
+
+# The seconds to wait after a change for more changes, so that a burst of saves triggers a single rebuild.
+DEFAULT_DEBOUNCE = 0.2
+# The seconds between two checks of the watched files when inotify is not available.
+DEFAULT_POLL_INTERVAL = 0.5
+
+# inotify event flags, from <sys/inotify.h>.
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_IN_EVENT = struct.Struct("iIII")
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    """Returns the modification time and size of a file, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _PollingBackend:
+    """Detects changes by comparing the modification time and size of the watched files at regular intervals."""
+
+    name = "polling"
+
+    def __init__(self, files: Iterable[Path], interval: float) -> None:
+        self.interval = interval
+        self._signatures = {path: _signature(path) for path in files}
+
+    def poll(self, timeout: float) -> set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, signature in self._signatures.items():
+                current = _signature(path)
+                if current != signature:
+                    self._signatures[path] = current
+                    changed.add(path)
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyBackend:
+    """Detects changes with Linux inotify, watching the directories that contain the watched files.
+
+    Directories are watched rather than the files themselves, since editors often save by writing a new file and
+    renaming it over the old one, which an inotify watch on the old file would not report.
+    """
+
+    name = "inotify"
+
+    def __init__(self, files: Iterable[Path]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._files = set(files)
+        self._directories = {}
+        try:
+            for directory in {path.parent for path in self._files}:
+                self._directories[self._add_watch(libc, directory)] = directory
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self, libc: ctypes.CDLL, directory: Path) -> int:
+        descriptor = libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_WATCH_MASK)
+        if descriptor < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        return descriptor
+
+    def poll(self, timeout: float) -> set[Path]:
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not readable:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+            name = data[offset + _IN_EVENT.size : offset + _IN_EVENT.size + length].rstrip(b"\0")
+            offset += _IN_EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                return set(self._files)  # events were lost, so anything may have changed
+            directory = self._directories.get(descriptor)
+            if directory is not None and name:
+                path = directory / os.fsdecode(name)
+                if path in self._files:
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class TemplateWatcher:
+    """Waits for changes to a set of template files.
+
+    Changes are detected with inotify on Linux and by polling elsewhere, or if inotify cannot be used. Bursts of
+    changes, such as an editor saving several files, are debounced: after the first change the watcher waits until
+    no more changes arrive for ``debounce`` seconds, and reports them all at once.
+
+    Templates inside a pack are watched through the pack; a change to the pack reports every watched template in it.
+
+    Example:
+        .. code-block:: python
+
+            with TemplateWatcher(paths) as watcher:
+                while True:
+                    changed = watcher.wait()
+
+    Attributes:
+        paths (list[Path]): The watched template paths.
+        debounce (float): The seconds to wait for more changes after a change.
+        backend (str): The change detection in use, either "inotify" or "polling".
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str | Path],
+        *,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ) -> None:
+        """Initializes the TemplateWatcher and starts watching.
+
+        Args:
+            paths (Iterable[str | Path]): The template paths to watch.
+            debounce (float): The seconds to wait for more changes after a change.
+            poll_interval (float): The seconds between two checks when polling.
+            use_inotify (bool): Whether to use inotify where it is available. Defaults to True.
+        """
+        self.paths = [Path(path) for path in paths]
+        self.debounce = debounce
+        self._templates = {}
+        for path in self.paths:
+            split = packs.split_pack_path(path)
+            self._templates.setdefault(split[0] if split is not None else path, []).append(path)
+
+        self._backend = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._backend = _InotifyBackend(self._templates)
+            except (OSError, AttributeError):  # no inotify, or the watch limit is reached
+                self._backend = None
+        if self._backend is None:
+            self._backend = _PollingBackend(self._templates, poll_interval)
+        self.backend = self._backend.name
+
+    def wait(self, timeout: float | None = None) -> list[Path]:
+        """Waits until watched templates change.
+
+        Args:
+            timeout (float | None): The maximum number of seconds to wait for a first change. Defaults to no limit.
+
+        Returns:
+            list[Path]: The templates that changed, in the order they were given, or an empty list on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = 1.0 if deadline is None else min(deadline - time.monotonic(), 1.0)
+            if remaining <= 0:
+                return []
+            changed = self._backend.poll(remaining)
+        while more := self._backend.poll(self.debounce):
+            changed |= more
+        return [path for path in self.paths if any(path in self._templates[file] for file in changed)]
+
+    def close(self) -> None:
+        """Stops watching."""
+        self._backend.close()
+
+    def __enter__(self) -> "TemplateWatcher":
+        """Returns the watcher."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stops watching."""
+        self.close()
@@ -1,29 +1,213 @@
+import copy
+import json
+import os
+import secrets
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
 from pathlib import Path
+from typing import TextIO
 
 import nbformat
+from nbformat.v4.nbjson import BytesEncoder
+
+from mltc import profiling
+from mltc.compact import CompactCell, CompactNotebook
+from mltc.locking import output_lock
+
+# Same layout as nbformat.write, so that streamed and regular output are byte for byte identical.
+_ENCODER = BytesEncoder(indent=1, sort_keys=True, separators=(",", ": "), ensure_ascii=False)
+_TRANSIENT_METADATA = ("orig_nbformat", "orig_nbformat_minor", "signature")
+# Besides text/*, the mimetypes whose string values nbformat splits into lines, as in nbformat.v4.rwbase.
+_NON_TEXT_SPLIT_MIMES = frozenset({"application/javascript", "image/svg+xml"})
+
+
+def _split_mimebundle(data: dict) -> None:
+    """Splits the multiline string values of a mimebundle into lines in place, as ``nbformat.write`` does."""
+    for key, value in data.items():
+        if isinstance(value, str) and (key.startswith("text/") or key in _NON_TEXT_SPLIT_MIMES):
+            data[key] = value.splitlines(keepends=True)
+
+
+def _prepare_cell(cell: nbformat.NotebookNode) -> dict:
+    """Returns a copy of a cell in its on-disk form, with multiline strings split into lines.
+
+    This mirrors what ``nbformat.write`` does to the whole notebook, one cell at a time.
+    """
+    cell = copy.deepcopy(cell)
+    source = cell.get("source")
+    if isinstance(source, str):
+        cell["source"] = source.splitlines(keepends=True)
+    for attachment in cell.get("attachments", {}).values():
+        _split_mimebundle(attachment)
+    for output in cell.get("outputs", ()):
+        if output.get("output_type") in {"execute_result", "display_data"}:
+            _split_mimebundle(output.get("data", {}))
+        elif output.get("output_type") == "stream" and isinstance(output.get("text"), str):
+            output["text"] = output["text"].splitlines(keepends=True)
+    cell.get("metadata", {}).pop("trusted", None)
+    return cell
+
+
+def _indented(chunks: Iterator[str], indent: str) -> Iterator[str]:
+    """Indents JSON chunks produced by the encoder to nest them at a deeper level."""
+    for chunk in chunks:
+        yield chunk.replace("\n", "\n" + indent)
+
+
+def iter_notebook_json(
+    notebook: nbformat.NotebookNode | CompactNotebook, cells: Iterable[dict | CompactCell] | None = None
+) -> Iterator[str]:
+    """Serializes a notebook in chunks, one cell at a time.
+
+    The output is identical to ``nbformat.writes`` followed by a newline, but the whole JSON document is never
+    held in memory: only one cell is copied and encoded at a time, and it is emitted in the encoder's chunks.
+
+    Args:
+        notebook (nbformat.NotebookNode | CompactNotebook): The notebook whose envelope (metadata and version
+                                                            fields) is written.
+        cells (Iterable[dict | CompactCell] | None): The cells to write. Defaults to the notebook's own cells; pass
+                                                     an iterable to write cells that are produced lazily.
+
+    Yields:
+        str: Consecutive chunks of the notebook's JSON representation.
+    """
+    if isinstance(notebook, CompactNotebook):
+        notebook = notebook.to_dict()
+    envelope = {key: value for key, value in notebook.items() if key != "cells"}
+    envelope["metadata"] = {
+        key: value for key, value in envelope.get("metadata", {}).items() if key not in _TRANSIENT_METADATA
+    }
+    envelope["cells"] = notebook.get("cells", []) if cells is None else cells
+
+    yield "{"
+    for position, key in enumerate(sorted(envelope)):
+        yield ",\n " if position else "\n "
+        yield json.dumps(key, ensure_ascii=False) + ": "
+        if key != "cells":
+            yield from _indented(_ENCODER.iterencode(envelope[key]), " ")
+            continue
+
+        empty = True
+        for cell in envelope["cells"]:
+            yield "[\n  " if empty else ",\n  "
+            empty = False
+            value = cell.to_dict() if isinstance(cell, CompactCell) else cell
+            yield from _indented(_ENCODER.iterencode(_prepare_cell(value)), "  ")
+        yield "[]" if empty else "\n ]"
+    yield "\n}\n"
+
+
+def _create_temp_file(path: Path) -> tuple[int, Path]:
+    """Creates a temporary file next to a path and opens it for writing.
+
+    Unlike ``tempfile.mkstemp``, which makes the file private to the user, the file is created with the mode a plain
+    ``open()`` would give a new file, so that the process umask applies without having to be read.
+    """
+    while True:
+        temp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def _replace_atomically(path: str, write: Callable[[TextIO], None]) -> None:
+    """Writes a file through a temporary file next to it, which is flushed to disk and renamed over the target.
+
+    The output lock of the target is held meanwhile, so concurrent writers of the same path take turns, and readers
+    only ever see a complete file.
+
+    Args:
+        path (str): The path of the file.
+        write (Callable[[TextIO], None]): Writes the contents to the temporary file.
+
+    Raises:
+        OSError: If an error occurs while writing the file.
+    """
+    path_obj = Path(path)
+    try:
+        with output_lock(path_obj):
+            fd, temp_path = _create_temp_file(path_obj)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    write(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                try:
+                    mode = path_obj.stat().st_mode & 0o777
+                except FileNotFoundError:
+                    mode = None  # a new file keeps the mode it was created with
+                if mode is not None:
+                    temp_path.chmod(mode)
+                temp_path.replace(path_obj)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+    except OSError as e:
+        err_msg = f"Error writing to file {path}: {e}"
+        raise OSError(err_msg) from e
 
 
 class NotebookWriter:
     """Jupyter notebook writer class.
 
-    This class provides methods to write Jupyter notebooks to file paths.
+    This class provides methods to write Jupyter notebooks to file paths. Notebooks are written to a temporary file
+    that atomically replaces the target, while holding the target's output lock, so that concurrent writers of the
+    same path never interleave or truncate each other's output.
     """
 
     @staticmethod
-    def write_notebook(notebook: nbformat.NotebookNode, path: str) -> None:
+    def write_notebook(
+        notebook: nbformat.NotebookNode | CompactNotebook,
+        path: str,
+        *,
+        stream: bool = False,
+        cells: Iterable[dict | CompactCell] | None = None,
+    ) -> None:
         """Writes the Jupyter notebook to the provided file path.
 
+        A CompactNotebook is serialized by ``iter_notebook_json`` without converting it to a NotebookNode. The
+        output is the same as for the equivalent NotebookNode, but it is not validated before it is written.
+
         Args:
-            notebook (nbformat.NotebookNode): The notebook object to be written.
+            notebook (nbformat.NotebookNode | CompactNotebook): The notebook object to be written.
             path (str): The file path where the notebook will be saved.
+            stream (bool): Whether to serialize the notebook cell by cell while writing it, instead of with
+                           ``nbformat.write``. See ``stream_notebook``.
+            cells (Iterable[dict | CompactCell] | None): The cells to write instead of the notebook's own cells,
+                                                         such as the cells of a SpillStore with their outputs read
+                                                         back. Implies ``stream``.
 
         Raises:
             OSError: If an error occurs while writing the notebook to file.
         """
-        try:
-            path_obj = Path(path)
-            with path_obj.open("w") as f:
-                nbformat.write(notebook, f)
-        except OSError as e:
-            err_msg = f"Error writing to file {path}: {e}"
-            raise OSError(err_msg) from e
+        with profiling.stage("write", source=str(path)) as metrics:
+            metrics.cells = len(notebook.cells if isinstance(notebook, CompactNotebook) else notebook.get("cells", ()))
+            if stream or cells is not None or isinstance(notebook, CompactNotebook):
+                NotebookWriter.stream_notebook(notebook, path, cells)
+            else:
+                _replace_atomically(path, partial(nbformat.write, notebook))
+            if profiling.is_active():
+                metrics.bytes_written = Path(path).stat().st_size
+
+    @staticmethod
+    def stream_notebook(
+        notebook: nbformat.NotebookNode | CompactNotebook, path: str, cells: Iterable[dict | CompactCell] | None = None
+    ) -> None:
+        """Streams the Jupyter notebook to the provided file path, one cell at a time.
+
+        The notebook envelope and then each cell are serialized in chunks to a temporary file next to the target,
+        which is flushed to disk and atomically renamed over the target. Peak memory is bounded by the largest
+        cell rather than the whole notebook, and a crash never leaves a truncated notebook at the target path.
+        Unlike ``write_notebook``, the notebook is not validated before it is written.
+
+        Args:
+            notebook (nbformat.NotebookNode | CompactNotebook): The notebook object to be written.
+            path (str): The file path where the notebook will be saved.
+            cells (Iterable[dict | CompactCell] | None): The cells to write instead of the notebook's own cells,
+                                                         for example a generator that produces them lazily.
+
+        Raises:
+            OSError: If an error occurs while writing the notebook to file.
+        """
+        _replace_atomically(path, lambda f: f.writelines(iter_notebook_json(notebook, cells)))
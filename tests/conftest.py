@@ -0,0 +1,33 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import nbformat
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch) -> None:
+    """Keeps the catalogs and caches written during tests out of the user's cache directory."""
+    monkeypatch.setenv("MLTC_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.fixture()
+def write_template() -> Callable[..., Path]:
+    """Returns a function that writes a template notebook with the given cells, creating its directory.
+
+    The function takes the path, the cells and, optionally, the notebook ``metadata`` and ``nbformat_minor``. Cell ids
+    are removed from templates older than nbformat 4.5, which introduced them.
+    """
+
+    def write(path: Path, cells: list, *, metadata: dict | None = None, nbformat_minor: int = 5) -> Path:
+        notebook = nbformat.v4.new_notebook(metadata=metadata or {}, nbformat_minor=nbformat_minor)
+        notebook.cells = cells
+        if nbformat_minor < 5:  # noqa: PLR2004 - cell ids were added in nbformat 4.5
+            for cell in notebook.cells:
+                cell.pop("id", None)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            nbformat.write(notebook, f)
+        return path
+
+    return write
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import nbformat
+import pytest
+
+from mltc import aio
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.validator import NotebookValidator
+
+
+class TestMergePaths:
+    @pytest.fixture()
+    def paths(self, tmp_path):
+        """Fixture to write two valid notebooks and an invalid one."""
+        paths = []
+        for name in ("first", "second"):
+            nb = nbformat.v4.new_notebook()
+            nb.cells.append(nbformat.v4.new_code_cell(f"print('{name}')", id=name))
+            paths.append(tmp_path / f"{name}.ipynb")
+            with paths[-1].open("w") as f:
+                nbformat.write(nb, f)
+        invalid = nbformat.v4.new_notebook()
+        invalid.cells.append(nbformat.v4.new_code_cell("x", id="x"))
+        invalid.cells[0].cell_type = "invalid"
+        paths.insert(1, tmp_path / "invalid.ipynb")
+        with paths[1].open("w") as f:
+            nbformat.write(invalid, f, version=nbformat.NO_CONVERT)
+        return [str(path) for path in paths]
+
+    def test_matches_merge_notebooks(self, paths):
+        notebooks = [NotebookReader.read_notebook(path) for path in paths]
+        expected = NotebookMerger(NotebookValidator()).merge_notebooks(notebooks, sources=paths)
+        merged = asyncio.run(aio.merge_paths(paths))
+        assert merged == expected
+        assert [cell.source for cell in merged.cells] == ["print('first')", "print('second')"]
+
+    def test_writes_output_and_skips_missing(self, paths, tmp_path, capsys):
+        output = tmp_path / "merged.ipynb"
+        asyncio.run(aio.merge_paths([*paths, str(tmp_path / "missing.ipynb")], str(output), stream=True))
+        with output.open() as f:
+            assert len(nbformat.read(f, as_version=4).cells) == 2  # noqa: PLR2004
+        assert "File not found" in capsys.readouterr().out
+
+    def test_timeout(self, mocker, paths):
+        mocker.patch("mltc.aio.NotebookReader.parse_notebook", side_effect=lambda _: time.sleep(0.5))
+        with pytest.raises(TimeoutError):
+            asyncio.run(aio.merge_paths(paths, timeout=0.05))
+
+    def test_cancellation(self, mocker, paths):
+        cancelled = []
+
+        async def slow_read(path: str, *_: object) -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(path)
+                raise
+
+        mocker.patch("mltc.aio.read_notebook", new=slow_read)
+
+        async def cancel_merge() -> None:
+            task = asyncio.create_task(aio.merge_paths(paths))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(cancel_merge())
+        assert sorted(cancelled) == sorted(paths)
@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.batch import BatchBuilder, BatchEntry, BatchResult, InvalidManifestError, build_entry, read_manifest
+from mltc.main import main
+
+
+class TestBatch:
+    @pytest.fixture()
+    def templates_dir(self, tmp_path):
+        templates_dir = tmp_path / "templates"
+        (templates_dir / "setup").mkdir(parents=True)
+        for name in ("first", "second"):
+            nb = nbformat.v4.new_notebook()
+            nb.cells.append(nbformat.v4.new_code_cell(f"print('{name}')"))
+            with (templates_dir / "setup" / f"{name}.ipynb").open("w") as f:
+                nbformat.write(nb, f)
+        return templates_dir
+
+    @pytest.fixture()
+    def manifest(self, tmp_path):
+        manifest = [
+            {"output": str(tmp_path / "a.ipynb"), "templates": ["setup/first.ipynb", "setup/second.ipynb"]},
+            {"output": str(tmp_path / "b.ipynb"), "templates": ["setup/second.ipynb"]},
+        ]
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps(manifest))
+        return path
+
+    def test_read_manifest_resolves_templates(self, manifest, templates_dir):
+        entries = read_manifest(str(manifest), str(templates_dir))
+        assert [Path(template).name for template in entries[0].templates] == ["first.ipynb", "second.ipynb"]
+        assert all(Path(template).is_absolute() for template in entries[0].templates)
+
+    def test_read_manifest_invalid_structure(self, tmp_path, templates_dir):
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps([{"output": "a.ipynb"}]))
+        with pytest.raises(InvalidManifestError):
+            read_manifest(str(path), str(templates_dir))
+
+    def test_build_entry_missing_template(self, tmp_path):
+        entry = BatchEntry(str(tmp_path / "out.ipynb"), (str(tmp_path / "missing.ipynb"),))
+        result = build_entry(entry)
+        assert not result.ok
+        assert "FileNotFoundError" in result.error
+
+    def test_build_preserves_entry_order(self, manifest, templates_dir):
+        entries = read_manifest(str(manifest), str(templates_dir))
+        results = BatchBuilder(max_workers=2).build(entries)
+        assert [result.output_path for result in results] == [entry.output_path for entry in entries]
+        assert all(result.ok for result in results)
+        with Path(entries[0].output_path).open() as f:
+            merged = nbformat.read(f, as_version=4)
+        assert [cell.source for cell in merged.cells] == ["print('first')", "print('second')"]
+
+    def test_batch_command_exit_code(self, tmp_path, templates_dir):
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps([{"output": str(tmp_path / "a.ipynb"), "templates": ["setup/missing.ipynb"]}]))
+        result = CliRunner().invoke(main, ["--templates-dir", str(templates_dir), "batch", str(path)])
+        assert result.exit_code == 1
+        assert "FAILED" in result.output
+
+    def test_build_skips_up_to_date_entries(self, manifest, templates_dir):
+        entries = read_manifest(str(manifest), str(templates_dir))
+        assert [result.status for result in BatchBuilder(max_workers=1).build(entries)] == [BatchResult.BUILT] * 2
+
+        Path(entries[1].templates[0]).write_text(Path(entries[1].templates[0]).read_text() + "\n")
+        dry_run = BatchBuilder(max_workers=1, dry_run=True).build(entries)
+        assert [result.status for result in dry_run] == [BatchResult.STALE, BatchResult.STALE]
+
+        Path(entries[1].output_path).unlink()
+        build_entry(entries[0])
+        assert build_entry(entries[0]).status == BatchResult.UP_TO_DATE
+        assert build_entry(entries[0], force=True).status == BatchResult.BUILT
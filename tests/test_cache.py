@@ -0,0 +1,56 @@
+import nbformat
+import pytest
+
+from mltc.cache import ValidationCache, canonical_bytes
+
+
+class TestValidationCache:
+    @pytest.fixture()
+    def cache(self, tmp_path):
+        return ValidationCache(str(tmp_path / "validation.sqlite3"), max_entries=2)
+
+    def test_key_ignores_key_order(self, cache):
+        first = nbformat.from_dict({"a": 1, "b": [1, 2]})
+        second = nbformat.from_dict({"b": [1, 2], "a": 1})
+        assert canonical_bytes(first) == canonical_bytes(second)
+        assert cache.key(first) == cache.key(second)
+
+    def test_key_changes_with_content(self, cache):
+        notebook = nbformat.v4.new_notebook()
+        key = cache.key(notebook)
+        notebook.cells.append(nbformat.v4.new_markdown_cell("# Test"))
+        assert cache.key(notebook) != key
+
+    def test_key_changes_with_engine(self, cache):
+        notebook = nbformat.v4.new_notebook()
+        assert cache.key(notebook) == cache.key(notebook, "nbformat")
+        assert cache.key(notebook, "compiled-schema") != cache.key(notebook)
+
+    def test_put_and_get(self, cache):
+        cache.put("valid", valid=True)
+        cache.put("invalid", valid=False, message="Broken")
+        assert cache.get("valid") == (True, None)
+        assert cache.get("invalid") == (False, "Broken")
+        assert cache.get("missing") is None
+
+    def test_least_recently_used_entry_evicted(self, cache, mocker):
+        mocker.patch("time.time", side_effect=[1.0, 2.0, 3.0, 4.0])
+        cache.put("first", valid=True)
+        cache.put("second", valid=True)
+        cache.get("first")
+        cache.put("third", valid=True)
+        mocker.stopall()
+        assert cache.get("second") is None
+        assert cache.get("first") == (True, None)
+        assert cache.get("third") == (True, None)
+
+    def test_clear(self, cache):
+        cache.put("valid", valid=True)
+        cache.clear()
+        assert cache.get("valid") is None
+
+    def test_unwritable_cache_is_ignored(self, tmp_path):
+        (tmp_path / "file").write_text("not a directory")
+        cache = ValidationCache(str(tmp_path / "file" / "validation.sqlite3"))
+        cache.put("valid", valid=True)
+        assert cache.get("valid") is None
@@ -0,0 +1,79 @@
+import os
+
+import nbformat
+import pytest
+
+from mltc.catalog import TemplateCatalog
+
+
+class TestTemplateCatalog:
+    @pytest.fixture()
+    def templates_dir(self, tmp_path):
+        templates_dir = tmp_path / "templates"
+        for group, name, cells in (("setup", "setup", 1), ("modelling", "binary", 2), ("modelling", "multi", 0)):
+            (templates_dir / group).mkdir(parents=True, exist_ok=True)
+            nb = nbformat.v4.new_notebook()
+            nb.cells.extend(nbformat.v4.new_markdown_cell(f"# {index}") for index in range(cells))
+            with (templates_dir / group / f"{name}.ipynb").open("w") as f:
+                nbformat.write(nb, f)
+        (templates_dir / "setup" / ".ipynb_checkpoints").mkdir()
+        (templates_dir / "setup" / ".ipynb_checkpoints" / "setup-checkpoint.ipynb").write_text("{}")
+        (templates_dir / ".git").mkdir()
+        (templates_dir / ".git" / "stale.ipynb").write_text("{}")
+        return templates_dir
+
+    @pytest.fixture()
+    def catalog(self, templates_dir, tmp_path):
+        return TemplateCatalog(str(templates_dir), index_path=str(tmp_path / "catalog.json"))
+
+    def test_entries_sorted_and_hidden_directories_pruned(self, catalog, templates_dir):
+        assert [entry.path for entry in catalog.entries] == [
+            templates_dir / "modelling" / "binary.ipynb",
+            templates_dir / "modelling" / "multi.ipynb",
+            templates_dir / "setup" / "setup.ipynb",
+        ]
+        assert [entry.group for entry in catalog.entries] == ["modelling", "modelling", "setup"]
+        assert [entry.cell_count for entry in catalog.entries] == [2, 0, 1]
+
+    def test_unchanged_directories_are_not_listed_again(self, catalog, templates_dir, tmp_path, mocker):
+        catalog.refresh()
+        scandir = mocker.spy(os, "scandir")
+        reloaded = TemplateCatalog(str(templates_dir), index_path=str(tmp_path / "catalog.json"))
+        assert reloaded.entries == catalog.entries
+        assert scandir.call_count == 0
+
+    def test_new_notebook_picked_up(self, catalog, templates_dir):
+        catalog.refresh()
+        (templates_dir / "setup" / "extra.ipynb").write_text("not json")
+        entries = catalog.refresh()
+        extra = next(entry for entry in entries if entry.path.name == "extra.ipynb")
+        expected_notebooks_count = 4
+        assert extra.cell_count is None
+        assert len(entries) == expected_notebooks_count
+
+    def test_changed_notebook_hashed_again(self, catalog, templates_dir):
+        before = {entry.path.name: entry.sha256 for entry in catalog.entries}
+        path = templates_dir / "setup" / "setup.ipynb"
+        path.write_text(path.read_text().replace("# 0", "# changed"))
+        after = {entry.path.name: entry.sha256 for entry in catalog.refresh(rescan=True)}
+        assert after["setup.ipynb"] != before["setup.ipynb"]
+        assert after["binary.ipynb"] == before["binary.ipynb"]
+
+    def test_notebook_edited_in_place_hashed_again(self, catalog, templates_dir):
+        before = {entry.path.name: entry.sha256 for entry in catalog.entries}
+        directory_mtime = (templates_dir / "setup").stat().st_mtime_ns
+        path = templates_dir / "setup" / "setup.ipynb"
+        with path.open("r+") as f:
+            text = f.read()
+            f.seek(0)
+            f.write(text.replace("# 0", "# edited"))
+        assert (templates_dir / "setup").stat().st_mtime_ns == directory_mtime
+        reloaded = TemplateCatalog(str(templates_dir), index_path=str(catalog.index_path))
+        after = {entry.path.name: entry.sha256 for entry in reloaded.refresh()}
+        assert after["setup.ipynb"] != before["setup.ipynb"]
+        assert after["binary.ipynb"] == before["binary.ipynb"]
+
+    def test_failed_save_leaves_no_temporary_file(self, catalog, mocker):
+        mocker.patch("pathlib.Path.replace", side_effect=OSError("Disk full"))
+        catalog.refresh()
+        assert list(catalog.index_path.parent.glob("*.tmp")) == []
@@ -0,0 +1,64 @@
+import pickle
+
+import nbformat
+import pytest
+
+from mltc.compact import CompactCell, CompactNotebook
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.transforms import TransformPipeline
+from mltc.validator import NotebookValidationError, NotebookValidator
+from mltc.writer import NotebookWriter
+
+
+def _notebook_bytes(name: str) -> bytes:
+    notebook = nbformat.v4.new_notebook()
+    notebook.cells.append(nbformat.v4.new_markdown_cell(f"# {name}\n\nSome notes.", id=f"{name}-title"))
+    output = nbformat.v4.new_output("stream", name="stdout", text="line 1\nline 2\n")
+    notebook.cells.append(nbformat.v4.new_code_cell("print(1)\nprint(2)", id=f"{name}-code", outputs=[output]))
+    return nbformat.writes(notebook).encode()
+
+
+class TestCompactNotebook:
+    @pytest.fixture()
+    def data(self):
+        return [_notebook_bytes("setup"), _notebook_bytes("modelling")]
+
+    def test_parse_keeps_plain_cells(self, data):
+        notebook = NotebookReader.parse_notebook(data[0], compact=True)
+        assert isinstance(notebook, CompactNotebook)
+        assert all(isinstance(cell, CompactCell) for cell in notebook.cells)
+        assert not isinstance(notebook.cells[1].to_dict(), nbformat.NotebookNode)
+        assert notebook.cells[1].to_dict()["source"] == ["print(1)\n", "print(2)"]
+
+    def test_to_notebook_matches_regular_read(self, data):
+        compact = NotebookReader.parse_notebook(data[0], compact=True)
+        assert compact.to_notebook() == NotebookReader.parse_notebook(data[0])
+        assert isinstance(compact.cells[0].to_node(), nbformat.NotebookNode)
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_merge_and_write_match_regular_pipeline(self, data, tmp_path, stream):
+        validator = NotebookValidator()
+        compact = NotebookMerger(validator).merge_notebooks(
+            [NotebookReader.parse_notebook(item, compact=True) for item in data]
+        )
+        regular = NotebookMerger(validator).merge_notebooks([NotebookReader.parse_notebook(item) for item in data])
+        assert isinstance(compact, CompactNotebook)
+
+        NotebookWriter.write_notebook(compact, str(tmp_path / "compact.ipynb"), stream=stream)
+        NotebookWriter.write_notebook(regular, str(tmp_path / "regular.ipynb"), stream=stream)
+        assert (tmp_path / "compact.ipynb").read_bytes() == (tmp_path / "regular.ipynb").read_bytes()
+
+    def test_transforms_keep_merge_compact(self, data):
+        notebooks = [NotebookReader.parse_notebook(item, compact=True) for item in data]
+        merger = NotebookMerger(NotebookValidator(), transforms=TransformPipeline([("strip-outputs", {})]))
+        merged = merger.merge_notebooks(notebooks)
+        assert isinstance(merged, CompactNotebook)
+        assert [cell.to_dict().get("outputs") for cell in merged.cells] == [None, [], None, []]
+        assert notebooks[0].cells[1].to_dict()["outputs"] != []
+
+    def test_invalid_compact_notebook(self, data):
+        notebook = pickle.loads(pickle.dumps(NotebookReader.parse_notebook(data[0], compact=True)))  # noqa: S301
+        notebook.cells[0].to_dict()["cell_type"] = "unknown"
+        with pytest.raises(NotebookValidationError):
+            NotebookValidator().is_valid(notebook)
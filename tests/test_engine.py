@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from mltc.engine import CellValidationError, CompiledSchemaEngine
+from mltc.validator import NotebookValidationError, NotebookValidator
+
+
+class TestCompiledSchemaEngine:
+    @pytest.fixture()
+    def notebook(self):
+        notebook = nbformat.v4.new_notebook()
+        notebook.cells.append(nbformat.v4.new_markdown_cell("# Test"))
+        notebook.cells.append(nbformat.v4.new_code_cell("print('Hello, World!')"))
+        return notebook
+
+    def test_valid_notebook(self, notebook):
+        assert CompiledSchemaEngine.find_errors(notebook) == []
+
+    def test_invalid_cells_reported_with_index_and_source(self, notebook):
+        notebook.cells[1].cell_type = "invalid"
+        notebook.cells.append(nbformat.from_dict({"cell_type": "code", "id": "x", "metadata": {}}))
+        errors = CompiledSchemaEngine.find_errors(notebook, source="setup.ipynb")
+        assert [error.index for error in errors] == [1, 2]
+        assert all(isinstance(error, CellValidationError) for error in errors)
+        assert str(errors[0]).startswith("Cell 1 of setup.ipynb:")
+
+    def test_duplicate_cell_ids_reported(self, notebook):
+        notebook.cells[1].id = notebook.cells[0].id
+        errors = CompiledSchemaEngine.find_errors(notebook)
+        assert len(errors) == 1
+        assert "duplicate cell id" in errors[0].reason
+
+    def test_invalid_envelope_reported(self, notebook):
+        notebook.metadata = []
+        errors = CompiledSchemaEngine.find_errors(notebook)
+        assert len(errors) == 1
+        assert isinstance(errors[0], nbformat.ValidationError)
+
+    def test_not_a_notebook(self):
+        with pytest.raises(TypeError):
+            CompiledSchemaEngine.find_errors("invalid")
+
+    def test_agrees_with_nbformat_on_templates(self):
+        for path in ("mltc/templates/setup/setup.ipynb", "examples/iris/iris.ipynb"):
+            with Path(path).open() as f:
+                notebook = nbformat.read(f, as_version=4)
+            assert CompiledSchemaEngine.find_errors(notebook) == []
+
+    def test_validator_reports_cell_errors(self, notebook):
+        notebook.cells[0].cell_type = "invalid"
+        validator = NotebookValidator(engine=CompiledSchemaEngine())
+        with pytest.raises(NotebookValidationError, match="Cell 0 of setup.ipynb"):
+            validator.is_valid(notebook, source="setup.ipynb")
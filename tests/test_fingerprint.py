@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from mltc.fingerprint import BuildFingerprint
+
+
+class TestBuildFingerprint:
+    @pytest.fixture()
+    def inputs(self, tmp_path):
+        paths = []
+        for name in ("first", "second"):
+            nb = nbformat.v4.new_notebook()
+            nb.cells.append(nbformat.v4.new_code_cell(f"print('{name}')"))
+            path = tmp_path / f"{name}.ipynb"
+            with path.open("w") as f:
+                nbformat.write(nb, f)
+            paths.append(str(path))
+        return paths
+
+    @pytest.fixture()
+    def output_path(self, tmp_path, inputs):
+        """Fixture to write a merged notebook stamped with the fingerprint of the inputs."""
+        merged = nbformat.v4.new_notebook()
+        BuildFingerprint.compute(inputs).stamp(merged)
+        path = tmp_path / "merged.ipynb"
+        with path.open("w") as f:
+            nbformat.write(merged, f)
+        return str(path)
+
+    def test_stamped_output_is_up_to_date(self, inputs, output_path):
+        assert BuildFingerprint.read(output_path) == BuildFingerprint.compute(inputs)
+        assert BuildFingerprint.compute(inputs).is_up_to_date(output_path)
+
+    def test_changed_input_is_stale(self, inputs, output_path):
+        with Path(inputs[1]).open("a") as f:
+            f.write("\n")
+        assert not BuildFingerprint.compute(inputs).is_up_to_date(output_path)
+
+    def test_with_changes_hashes_only_changed_inputs(self, inputs):
+        fingerprint = BuildFingerprint.compute(inputs, options={"stream": True})
+        with Path(inputs[1]).open("a") as f:
+            f.write("\n")
+        Path(inputs[0]).write_text("changed, but not reported")
+        updated = fingerprint.with_changes([inputs[1], "unrelated.ipynb"])
+        assert updated.inputs[0] == fingerprint.inputs[0]
+        assert updated.inputs[1] == BuildFingerprint.compute(inputs).inputs[1] != fingerprint.inputs[1]
+        assert updated.options == {"stream": True}
+
+    def test_reordered_inputs_are_stale(self, inputs, output_path):
+        assert not BuildFingerprint.compute(list(reversed(inputs))).is_up_to_date(output_path)
+
+    def test_different_version_or_options_are_stale(self, inputs, output_path):
+        fingerprint = BuildFingerprint.compute(inputs)
+        assert not BuildFingerprint(fingerprint.inputs, version="0.0.0").is_up_to_date(output_path)
+        assert not BuildFingerprint.compute(inputs, options={"stream": True}).is_up_to_date(output_path)
+
+    def test_missing_or_unstamped_output(self, tmp_path, inputs):
+        fingerprint = BuildFingerprint.compute(inputs)
+        assert not fingerprint.is_up_to_date(str(tmp_path / "missing.ipynb"))
+        assert not fingerprint.is_up_to_date(inputs[0])
+
+    def test_missing_input_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            BuildFingerprint.compute([str(tmp_path / "missing.ipynb")])
@@ -0,0 +1,84 @@
+import json
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.engine import CompiledSchemaEngine
+from mltc.incremental import IncrementalNotebook, MalformedNotebookError
+from mltc.main import main
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.validator import NotebookValidationError, NotebookValidator
+from mltc.writer import NotebookWriter
+
+KERNELSPEC = {"kernelspec": {"name": "python3", "display_name": "Python 3"}}
+
+
+def _cells(name: str) -> list:
+    output = nbformat.v4.new_output("stream", name="stdout", text='a "quoted" ] line\\\nC:\\path\\\n')
+    return [
+        nbformat.v4.new_markdown_cell(f'# {name} [draft] {{"x": 1}}', id=f"{name}-title"),
+        nbformat.v4.new_code_cell('print("}")', id=f"{name}-code", outputs=[output]),
+    ]
+
+
+class TestIncrementalNotebook:
+    @pytest.fixture()
+    def paths(self, tmp_path, write_template):
+        paths = [tmp_path / "templates" / name / f"{name}.ipynb" for name in ("setup", "modelling")]
+        for path in paths:
+            write_template(path, _cells(path.stem), metadata=KERNELSPEC)
+        return [str(path) for path in paths]
+
+    def test_cells_match_regular_read(self, paths):
+        compact = NotebookReader.read_notebook(paths[0], compact=True)
+        with IncrementalNotebook(paths[0]) as notebook:
+            assert [cell.to_dict() for cell in notebook.iter_cells()] == [cell.to_dict() for cell in compact.cells]
+            assert notebook.metadata == compact.metadata
+            assert (notebook.nbformat, notebook.nbformat_minor) == (compact.nbformat, compact.nbformat_minor)
+
+    def test_fields_are_available_before_cells(self, paths):
+        with IncrementalNotebook(paths[0]) as notebook:
+            assert notebook.metadata["kernelspec"]["name"] == "python3"
+            assert notebook.cell_count == len(list(notebook.iter_cells()))
+
+    @pytest.mark.parametrize(
+        "data", [b"", b"[]", b'{"cells": [{"source": "x"}', b'{"cells": [1]}', b'{"cells": [], "metadata": {]}']
+    )
+    def test_malformed_notebooks_are_rejected(self, tmp_path, data):
+        path = tmp_path / "broken.ipynb"
+        path.write_bytes(data)
+        with IncrementalNotebook(str(path)) as notebook, pytest.raises(MalformedNotebookError):
+            list(notebook.iter_cells())
+
+    @pytest.mark.parametrize("engine", [None, CompiledSchemaEngine()])
+    def test_invalid_cells_are_reported_by_index(self, tmp_path, engine):
+        notebook = json.loads(nbformat.writes(nbformat.v4.new_notebook()))
+        notebook["cells"] = [
+            nbformat.v4.new_markdown_cell("ok", id="one"),
+            {"cell_type": "markdown", "id": "two", "metadata": {}},
+        ]
+        path = tmp_path / "invalid.ipynb"
+        path.write_text(json.dumps(notebook))
+        with IncrementalNotebook(str(path)) as incremental, pytest.raises(NotebookValidationError, match="Cell 1 of"):
+            NotebookValidator(engine=engine).is_valid_incremental(incremental, source=str(path))
+
+    def test_merged_cells_stream_to_same_output(self, paths, tmp_path):
+        validator = NotebookValidator()
+        notebooks = [NotebookReader.read_notebook(path) for path in paths]
+        regular = NotebookMerger(validator).merge_notebooks(notebooks, sources=paths)
+        NotebookWriter.write_notebook(regular, str(tmp_path / "regular.ipynb"))
+
+        cells = NotebookMerger(validator).iter_merged_cells(paths)
+        NotebookWriter.write_notebook(nbformat.v4.new_notebook(), str(tmp_path / "incremental.ipynb"), cells=cells)
+        assert (tmp_path / "incremental.ipynb").read_bytes() == (tmp_path / "regular.ipynb").read_bytes()
+
+    @pytest.mark.usefixtures("paths")
+    def test_incremental_option(self, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        args = ["--templates-dir", str(tmp_path / "templates"), "--output-path", str(output), "--incremental"]
+        result = CliRunner().invoke(main, args, input="2 1\n")
+        assert result.exit_code == 0, result.output
+        merged = nbformat.read(output, as_version=4)
+        assert [cell.id for cell in merged.cells] == ["setup-title", "setup-code", "modelling-title", "modelling-code"]
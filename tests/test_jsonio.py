@@ -0,0 +1,44 @@
+import pytest
+
+from mltc import jsonio
+
+
+class TestJsonio:
+    @pytest.fixture(params=["orjson", "json"])
+    def backend(self, request, monkeypatch):
+        if request.param == "json":
+            monkeypatch.setattr(jsonio, "orjson", None)
+        elif jsonio.orjson is None:
+            pytest.skip("orjson is not installed")
+        return request.param
+
+    @pytest.mark.usefixtures("backend")
+    def test_loads_bytes_and_strings(self):
+        assert jsonio.loads(b'{"a": [1, "\xc3\xa9"]}') == {"a": [1, "é"]}
+        assert jsonio.loads('{"a": null}') == {"a": None}
+
+    @pytest.mark.usefixtures("backend")
+    def test_loads_invalid_json_raises_value_error(self):
+        with pytest.raises(ValueError):  # noqa: PT011
+            jsonio.loads(b"{not json")
+
+    @pytest.mark.usefixtures("backend")
+    def test_dumps_compact_utf8(self):
+        assert jsonio.dumps({"b": ["é", 1], "a": None}) == '{"b":["é",1],"a":null}'.encode()
+
+    @pytest.mark.usefixtures("backend")
+    def test_dumps_sorted_keys(self):
+        assert jsonio.dumps({"b": {"d": 1, "c": 2}, "a": 0}, sort_keys=True) == b'{"a":0,"b":{"c":2,"d":1}}'
+
+    @pytest.mark.usefixtures("backend")
+    def test_dumps_unserializable_raises_type_error(self):
+        with pytest.raises(TypeError):
+            jsonio.dumps({"a": object()})
+
+    def test_backends_agree(self, monkeypatch):
+        if jsonio.orjson is None:
+            pytest.skip("orjson is not installed")
+        value = {"text": 'line\nwith "quotes" and é', "numbers": [0, -1, 2.5], "nested": {"z": True, "y": False}}
+        expected = jsonio.dumps(value, sort_keys=True)
+        monkeypatch.setattr(jsonio, "orjson", None)
+        assert jsonio.dumps(value, sort_keys=True) == expected
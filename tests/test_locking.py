@@ -0,0 +1,124 @@
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import nbformat
+import pytest
+
+from mltc.batch import BatchEntry, BatchResult, build_entry
+from mltc.fingerprint import BuildFingerprint
+from mltc.locking import build_lock, lock_path, output_lock
+from mltc.writer import NotebookWriter
+
+
+def _notebook(name: str, cells: int) -> nbformat.NotebookNode:
+    notebook = nbformat.v4.new_notebook(metadata={"writer": name})
+    notebook.cells.extend(nbformat.v4.new_markdown_cell(f"{name} {index}" * 50) for index in range(cells))
+    return notebook
+
+
+class TestOutputLock:
+    @pytest.fixture()
+    def templates(self, tmp_path):
+        paths = []
+        for name in ("setup", "modelling"):
+            path = tmp_path / "templates" / f"{name}.ipynb"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w") as f:
+                nbformat.write(_notebook(name, 20), f)
+            paths.append(str(path))
+        return paths
+
+    def test_lock_is_reentrant_and_leaves_no_lock_file(self, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        with output_lock(output):
+            assert lock_path(output).exists()
+            with output_lock(str(output)):
+                NotebookWriter.write_notebook(_notebook("a", 1), str(output))
+        assert list(tmp_path.iterdir()) == [output]
+
+    def test_lock_excludes_other_threads(self, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        acquired = threading.Event()
+
+        def wait_for_lock() -> None:
+            with output_lock(output):
+                acquired.set()
+
+        with output_lock(output):
+            thread = threading.Thread(target=wait_for_lock)
+            thread.start()
+            assert not acquired.wait(0.2)
+        thread.join(5)
+        assert acquired.is_set()
+
+    def test_concurrent_writers_never_interleave(self, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        notebooks = {f"writer-{index}": _notebook(f"writer-{index}", 5 + index * 10) for index in range(16)}
+        expected = {name: nbformat.writes(notebook) + "\n" for name, notebook in notebooks.items()}
+        NotebookWriter.write_notebook(notebooks["writer-0"], str(output))
+        done = threading.Event()
+        torn = []
+
+        def read_while_writing() -> None:
+            while not done.is_set():
+                text = output.read_text()
+                try:
+                    writer = json.loads(text)["metadata"]["writer"]
+                except ValueError:
+                    writer = None
+                if expected.get(writer) != text:
+                    torn.append(text)
+
+        def write(name: str, *, stream: bool) -> None:
+            for _ in range(5):
+                NotebookWriter.write_notebook(notebooks[name], str(output), stream=stream)
+
+        reader = threading.Thread(target=read_while_writing)
+        reader.start()
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for index, name in enumerate(notebooks):
+                executor.submit(write, name, stream=index % 2 == 0)
+        done.set()
+        reader.join()
+        assert not torn
+        assert output.read_text() in expected.values()
+        assert list(tmp_path.iterdir()) == [output]
+
+    def test_concurrent_builds_are_coalesced(self, templates, tmp_path):
+        output = str(tmp_path / "merged.ipynb")
+        entry = BatchEntry(output_path=output, templates=tuple(templates))
+        with ProcessPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(build_entry, [entry] * 16))
+        statuses = [result.status for result in results]
+        assert all(result.ok for result in results), results
+        assert statuses.count(BatchResult.BUILT) == 1
+        assert BuildFingerprint.compute(templates).is_up_to_date(output)
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["merged.ipynb", "templates"]
+
+    def test_forced_build_waits_and_skips_only_if_output_was_replaced(self, templates, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        fingerprint = BuildFingerprint.compute(templates)
+        merged = _notebook("merged", 1)
+        fingerprint.stamp(merged)
+        NotebookWriter.write_notebook(merged, str(output))
+        with build_lock(output, fingerprint, force=True) as needed:
+            assert needed
+
+        results = []
+
+        def forced_build() -> None:
+            with build_lock(output, fingerprint, force=True) as needed:
+                results.append(needed)
+
+        with output_lock(output):
+            thread = threading.Thread(target=forced_build)
+            thread.start()
+            thread.join(0.2)
+            NotebookWriter.write_notebook(merged, str(output))
+        thread.join(5)
+        assert results == [False]
+
+    def test_build_without_fingerprint_always_goes_ahead(self, tmp_path):
+        with build_lock(tmp_path / "merged.ipynb", None) as needed:
+            assert needed
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.main import main
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _imported_modules(code: str) -> set[str]:
+    """Runs code in a fresh interpreter with ``-X importtime`` and returns the names of the imported modules."""
+    env = {**os.environ, "PYTHONPATH": str(PACKAGE_ROOT)}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    return {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+class TestMain:
+    @pytest.fixture()
+    def templates_dir(self, tmp_path):
+        templates_dir = tmp_path / "templates"
+        (templates_dir / "setup").mkdir(parents=True)
+        with (templates_dir / "setup" / "setup.ipynb").open("w") as f:
+            nbformat.write(nbformat.v4.new_notebook(), f)
+        return templates_dir
+
+    def test_entry_point_import_is_nbformat_free(self):
+        modules = _imported_modules("import mltc.main")
+        assert "mltc.main" in modules
+        assert not {"nbformat", "jsonschema", "mltc.merger", "mltc.validator"} & modules
+
+    def test_list_is_nbformat_free(self, templates_dir):
+        code = f"from mltc.main import main; main(['--templates-dir', {str(templates_dir)!r}, '--list'])"
+        modules = _imported_modules(code)
+        assert "mltc.catalog" in modules
+        assert "nbformat" not in modules
+
+    def test_list_prints_catalog(self, templates_dir):
+        result = CliRunner().invoke(main, ["--templates-dir", str(templates_dir), "--list"])
+        assert result.exit_code == 0
+        assert "Setup:" in result.output
+        assert f"1: {templates_dir / 'setup' / 'setup.ipynb'}" in result.output
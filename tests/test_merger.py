@@ -1,8 +1,18 @@
+import copy
+import hashlib
+import warnings
+from pathlib import Path
+
 import nbformat
 import pytest
+from click.testing import CliRunner
 
-from mltc.merger import NotebookMerger
-from mltc.validator import NotebookValidationError
+from mltc.compact import CompactCell, CompactNotebook
+from mltc.fingerprint import BuildFingerprint
+from mltc.main import main
+from mltc.merger import NotebookMerger, UntrackedNotebookError
+from mltc.reader import NotebookReader
+from mltc.validator import NotebookValidationError, NotebookValidator
 
 
 class TestNotebookMerger:
@@ -53,3 +63,170 @@ class TestNotebookMerger:
         mock_validator.is_valid.side_effect = NotebookValidationError("Validation error")
         result = notebook_merger.merge_notebooks([notebook])
         assert result.cells == []
+
+    @pytest.fixture()
+    def notebooks(self):
+        """Fixture to create four notebooks, the third of which is invalid."""
+        notebooks = []
+        for index in range(4):
+            notebook = nbformat.v4.new_notebook()
+            notebook.cells.append(nbformat.v4.new_code_cell(f"print({index})", id=f"cell-{index}"))
+            notebooks.append(notebook)
+        notebooks[2].cells[0].cell_type = "invalid"
+        return notebooks
+
+    def test_parallel_validation_matches_sequential(self, mocker, notebooks, capsys):
+        mocker.patch.object(NotebookMerger, "PARALLEL_MIN_CELLS", 0)
+        sources = [f"nb{index}.ipynb" for index in range(len(notebooks))]
+        sequential = NotebookMerger(NotebookValidator()).merge_notebooks(notebooks, sources=sources)
+        sequential_output = capsys.readouterr().out
+        parallel = NotebookMerger(NotebookValidator(), max_workers=2).merge_notebooks(notebooks, sources=sources)
+        assert parallel == sequential
+        assert [cell.source for cell in parallel.cells] == ["print(0)", "print(1)", "print(3)"]
+        assert capsys.readouterr().out == sequential_output
+        assert "Validation error" in sequential_output
+
+    def test_small_inputs_are_validated_in_process(self, mocker, notebooks):
+        pool = mocker.patch("mltc.merger.ProcessPoolExecutor")
+        merged = NotebookMerger(NotebookValidator(), max_workers=4).merge_notebooks(notebooks)
+        pool.assert_not_called()
+        assert len(merged.cells) == len(notebooks) - 1
+
+    def test_duplicate_cell_ids_are_renamed_on_copies(self):
+        notebooks = []
+        for _ in range(3):
+            notebook = nbformat.v4.new_notebook()
+            notebook.cells.append(nbformat.v4.new_code_cell("import pandas as pd", id="imports"))
+            notebook.cells.append(nbformat.v4.new_markdown_cell("# Notes", id="imports-1"))
+            notebooks.append(notebook)
+        original = copy.deepcopy(notebooks)
+
+        merged = NotebookMerger(NotebookValidator()).merge_notebooks(notebooks)
+        ids = [cell.id for cell in merged.cells]
+        assert ids == ["imports", "imports-1", "imports-2", "imports-1-1", "imports-3", "imports-1-2"]
+        assert notebooks == original
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            nbformat.validate(merged)
+
+    def test_cells_of_older_notebooks_get_ids(self):
+        old = nbformat.v4.new_notebook(nbformat_minor=4)
+        old.cells.append(nbformat.NotebookNode({"cell_type": "markdown", "metadata": {}, "source": "# Old"}))
+        new = nbformat.v4.new_notebook()
+        new.cells.append(nbformat.v4.new_markdown_cell("# New", id="cell-1"))
+
+        merged = NotebookMerger(NotebookValidator()).merge_notebooks([old, new])
+        assert merged.nbformat_minor == 5  # noqa: PLR2004
+        assert [cell.id for cell in merged.cells] == ["cell-2", "cell-1"]
+        assert "id" not in old.cells[0]
+
+
+def _cells(name: str, sources: list[str]) -> list:
+    return [nbformat.v4.new_code_cell(source, id=f"{name}-{i}") for i, source in enumerate(sources)]
+
+
+class TestUpdateNotebook:
+    @pytest.fixture()
+    def paths(self, tmp_path, write_template):
+        paths = {name: tmp_path / "templates" / name / f"{name}.ipynb" for name in ("setup", "modelling", "extra")}
+        write_template(paths["setup"], _cells("setup", ["import numpy", "import pandas"]))
+        write_template(paths["modelling"], _cells("modelling", ["fit()", "score()"]))
+        write_template(paths["extra"], _cells("extra", ["plot()"]))
+        return {name: str(path) for name, path in paths.items()}
+
+    @pytest.fixture()
+    def merger(self):
+        return NotebookMerger(NotebookValidator())
+
+    def _build(self, merger, paths) -> CompactNotebook:
+        merged = merger.merge_paths(paths)
+        BuildFingerprint.compute(paths).stamp(merged)
+        return merged
+
+    @staticmethod
+    def _sources(notebook) -> list[str]:
+        return ["".join(cell.to_dict()["source"]) for cell in notebook.cells]
+
+    def test_merged_cells_are_tagged(self, merger, paths):
+        merged = self._build(merger, [paths["setup"]])
+        tag = merged.cells[0].to_dict()["metadata"]["mltc"]
+        assert tag["template"] == paths["setup"]
+        assert len(tag["sha256"]) == len(hashlib.sha256().hexdigest())
+
+    def test_only_changed_templates_are_read(self, merger, paths, mocker, write_template):
+        selection = [paths["setup"], paths["modelling"]]
+        merged = self._build(merger, selection)
+        write_template(Path(paths["modelling"]), _cells("modelling", ["fit(epochs=3)", "score()"]))
+        read = mocker.spy(NotebookReader, "read_notebook")
+
+        updated = merger.update_notebook(merged, BuildFingerprint.compute(selection))
+        assert [call.args[0] for call in read.call_args_list] == [paths["modelling"]]
+        assert self._sources(updated) == ["import numpy", "import pandas", "fit(epochs=3)", "score()"]
+        assert updated.cells[0] is merged.cells[0]
+        assert BuildFingerprint.from_metadata(updated.metadata) == BuildFingerprint.compute(selection)
+
+    def test_edited_and_added_cells_are_kept(self, merger, paths, write_template):
+        selection = [paths["setup"], paths["modelling"]]
+        merged = self._build(merger, selection)
+        merged.cells[2].to_dict()["source"] = "fit(my_data)"
+        merged.cells.insert(3, CompactCell(nbformat.v4.new_markdown_cell("My notes", id="notes")))
+        write_template(Path(paths["modelling"]), _cells("modelling", ["fit()", "score(verbose=True)"]))
+
+        updated = merger.update_notebook(merged, BuildFingerprint.compute(selection))
+        assert self._sources(updated) == [
+            "import numpy",
+            "import pandas",
+            "fit(my_data)",
+            "score(verbose=True)",
+            "My notes",
+        ]
+
+    def test_edits_in_templates_without_ids_are_kept(self, merger, tmp_path, write_template):
+        path = tmp_path / "templates" / "legacy.ipynb"
+        write_template(path, _cells("legacy", ["A0", "A1"]), nbformat_minor=2)
+        merged = self._build(merger, [str(path)])
+        ids = [cell.to_dict()["id"] for cell in merged.cells]
+        merged.cells[0].to_dict()["source"] = "A0 edited"
+        write_template(path, _cells("legacy", ["A0", "A1 changed"]), nbformat_minor=2)
+
+        updated = merger.update_notebook(merged, BuildFingerprint.compute([str(path)]))
+        assert self._sources(updated) == ["A0 edited", "A1 changed"]
+        assert [cell.to_dict()["id"] for cell in updated.cells] == ids
+
+    def test_edits_in_cells_with_colliding_ids_are_kept(self, merger, paths, write_template):
+        write_template(Path(paths["modelling"]), _cells("setup", ["fit()", "score()"]))
+        selection = [paths["setup"], paths["modelling"]]
+        merged = self._build(merger, selection)
+        ids = [cell.to_dict()["id"] for cell in merged.cells]
+        merged.cells[2].to_dict()["source"] = "fit(my_data)"
+        write_template(Path(paths["modelling"]), _cells("setup", ["fit()", "score(verbose=True)"]))
+
+        updated = merger.update_notebook(merged, BuildFingerprint.compute(selection))
+        assert self._sources(updated) == ["import numpy", "import pandas", "fit(my_data)", "score(verbose=True)"]
+        assert [cell.to_dict()["id"] for cell in updated.cells] == ids
+
+    def test_new_templates_are_appended(self, merger, paths, capsys):
+        merged = self._build(merger, [paths["setup"]])
+        selection = [paths["extra"], paths["setup"]]
+        updated = merger.update_notebook(merged, BuildFingerprint.compute(selection))
+        assert self._sources(updated) == ["import numpy", "import pandas", "plot()"]
+        assert "Updated 0 and added 1 of 2 templates, keeping 0 edited cells." in capsys.readouterr().out
+
+    def test_untracked_notebook_is_rejected(self, merger, paths):
+        notebook = NotebookReader.read_notebook(paths["setup"], compact=True)
+        with pytest.raises(UntrackedNotebookError):
+            merger.update_notebook(notebook, BuildFingerprint.compute([paths["setup"]]))
+
+    def test_update_option_keeps_edits(self, paths, tmp_path, write_template):
+        output = tmp_path / "merged.ipynb"
+        args = ["--templates-dir", str(tmp_path / "templates"), "--output-path", str(output), "--update"]
+        CliRunner().invoke(main, args, input="3 2\n")
+        merged = nbformat.read(output, as_version=4)
+        merged.cells[0].source = "import numpy as np"
+        nbformat.write(merged, output)
+        write_template(Path(paths["setup"]), _cells("setup", ["import numpy", "import polars"]))
+
+        result = CliRunner().invoke(main, args, input="3 2\n")
+        assert "Updated notebook saved" in result.output
+        updated = nbformat.read(output, as_version=4)
+        assert [cell.source for cell in updated.cells] == ["import numpy as np", "import polars", "fit()", "score()"]
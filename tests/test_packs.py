@@ -0,0 +1,106 @@
+import gc
+import tarfile
+import zipfile
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.main import main
+from mltc.packs import InvalidPackError, TemplatePack, open_pack, read_bytes, split_pack_path, stat
+from mltc.reader import NotebookReader
+from mltc.selector import NotebookSelector
+
+MEMBERS = ("setup/setup.ipynb", "intro.ipynb", "modelling/train.ipynb", "modelling/deep/tune.ipynb")
+
+
+def _notebook_bytes(text: str) -> bytes:
+    notebook = nbformat.v4.new_notebook(
+        cells=[nbformat.v4.new_markdown_cell(text, id=text.replace("/", "-").replace(".", "-"))]
+    )
+    return nbformat.writes(notebook).encode()
+
+
+@pytest.fixture(params=["zip", "tar"])
+def pack_path(request, tmp_path):
+    path = tmp_path / f"templates.{request.param}"
+    if request.param == "zip":
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name in MEMBERS:
+                archive.writestr(name, _notebook_bytes(name))
+            archive.writestr(".ipynb_checkpoints/intro-checkpoint.ipynb", _notebook_bytes("checkpoint"))
+            archive.writestr("README.md", "not a notebook")
+    else:
+        source = tmp_path / "source"
+        for name in MEMBERS:
+            (source / name).parent.mkdir(parents=True, exist_ok=True)
+            (source / name).write_bytes(_notebook_bytes(name))
+        with tarfile.open(path, "w") as archive:
+            archive.add(source, arcname=".")
+    return path
+
+
+class TestTemplatePack:
+    def test_members_in_catalog_order(self, pack_path):
+        with TemplatePack(pack_path) as pack:
+            names = [member.name for member in pack.members]
+        assert names == ["intro.ipynb", "modelling/train.ipynb", "modelling/deep/tune.ipynb", "setup/setup.ipynb"]
+
+    def test_read_member(self, pack_path):
+        with TemplatePack(pack_path) as pack:
+            assert pack.read("modelling/train.ipynb") == _notebook_bytes("modelling/train.ipynb")
+            with pytest.raises(FileNotFoundError):
+                pack.read("missing.ipynb")
+            with pytest.raises(FileNotFoundError):
+                pack.read(".ipynb_checkpoints/intro-checkpoint.ipynb")
+            assert "intro.ipynb" in pack
+        with pytest.raises(FileNotFoundError):
+            stat(pack_path / "missing.ipynb")
+
+    def test_invalid_pack(self, tmp_path):
+        path = tmp_path / "broken.zip"
+        path.write_bytes(b"not an archive")
+        with pytest.raises(InvalidPackError):
+            TemplatePack(path)
+
+    def test_replaced_pack_closed_once_released(self, tmp_path):
+        path = tmp_path / "templates.zip"
+        for version in ("old", "newer"):
+            with zipfile.ZipFile(tmp_path / "templates.tmp", "w") as archive:
+                archive.writestr("intro.ipynb", _notebook_bytes(version))
+            (tmp_path / "templates.tmp").replace(path)
+            if version == "old":
+                old = open_pack(path)
+                assert open_pack(path) is old
+        new = open_pack(path)
+        assert new is not old
+        assert old.read("intro.ipynb") == _notebook_bytes("old")
+        released = old._finalizer  # noqa: SLF001
+        del old
+        gc.collect()
+        assert not released.alive
+        assert new.read("intro.ipynb") == _notebook_bytes("newer")
+
+    def test_read_notebook_from_pack(self, pack_path):
+        assert split_pack_path(pack_path / "setup" / "setup.ipynb") == (pack_path, "setup/setup.ipynb")
+        assert split_pack_path(pack_path.parent / "plain.ipynb") is None
+        assert read_bytes(pack_path / "intro.ipynb") == _notebook_bytes("intro.ipynb")
+        notebook = NotebookReader.read_notebook(str(pack_path / "setup" / "setup.ipynb"))
+        assert notebook.cells[0].source == "setup/setup.ipynb"
+
+    def test_selector_groups_pack(self, pack_path, mocker):
+        echo = mocker.patch("click.echo")
+        selector = NotebookSelector(str(pack_path))
+        assert selector.list_notebooks()[0] == pack_path / "intro.ipynb"
+        selector.display_notebooks()
+        printed = [call.args[0] for call in echo.call_args_list if call.args]
+        assert printed[:2] == ["Templates:", f"1: {pack_path / 'intro.ipynb'}"]
+        assert "Deep:" in printed
+
+    def test_cli_merges_from_pack(self, pack_path, tmp_path):
+        output_path = tmp_path / "merged.ipynb"
+        args = ["--templates-dir", str(pack_path), "--output-path", str(output_path)]
+        result = CliRunner().invoke(main, args, input="4 1\n")
+        assert result.exit_code == 0, result.output
+        merged = nbformat.read(output_path, as_version=4)
+        assert [cell.source for cell in merged.cells] == ["setup/setup.ipynb", "intro.ipynb"]
@@ -0,0 +1,66 @@
+import json
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc import profiling
+from mltc.main import main
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.validator import NotebookValidator
+from mltc.writer import NotebookWriter
+
+
+class TestProfiling:
+    @pytest.fixture()
+    def notebook_path(self, tmp_path):
+        notebook = nbformat.v4.new_notebook()
+        notebook.cells.append(nbformat.v4.new_code_cell("print('Hello')", id="hello"))
+        notebook.cells.append(nbformat.v4.new_markdown_cell("# Title", id="title"))
+        path = tmp_path / "templates" / "setup" / "setup.ipynb"
+        path.parent.mkdir(parents=True)
+        with path.open("w") as f:
+            nbformat.write(notebook, f)
+        return path
+
+    def test_stage_without_hooks_records_nothing(self, mocker):
+        hook = mocker.Mock()
+        with profiling.stage("read") as metrics:
+            metrics.cells = 1
+        profiling.add_hook(hook)
+        profiling.remove_hook(hook)
+        with profiling.stage("read"):
+            pass
+        hook.assert_not_called()
+        assert not profiling.is_active()
+
+    def test_stage_is_recorded_when_it_raises(self):
+        with profiling.Profiler() as profiler, pytest.raises(ValueError, match="boom"), profiling.stage("merge"):
+            raise ValueError("boom")  # noqa: EM101
+        assert [record.stage for record in profiler.records] == ["merge"]
+        assert not profiling.is_active()
+
+    def test_pipeline_stages(self, notebook_path, tmp_path):
+        output_path = tmp_path / "merged.ipynb"
+        with profiling.Profiler() as profiler:
+            notebook = NotebookReader.read_notebook(str(notebook_path))
+            merged = NotebookMerger(NotebookValidator()).merge_notebooks([notebook], sources=[str(notebook_path)])
+            NotebookWriter.write_notebook(merged, str(output_path))
+
+        assert [record.stage for record in profiler.records] == ["read", "validate", "merge", "write"]
+        totals = profiler.totals()
+        assert totals["read"].bytes_read == notebook_path.stat().st_size
+        assert totals["write"].bytes_written == output_path.stat().st_size
+        assert all(total.cells == len(notebook.cells) for total in totals.values())
+        assert "(total)" in profiler.format_table()
+
+    def test_cli_profile_json_and_cprofile(self, notebook_path, tmp_path):
+        cprofile_path = tmp_path / "pipeline.prof"
+        args = ["--templates-dir", str(notebook_path.parents[1]), "--output-path", str(tmp_path / "merged.ipynb")]
+        args += ["--profile", "--profile-format", "json", "--cprofile", str(cprofile_path)]
+        result = CliRunner().invoke(main, args, input="1\n")
+        assert result.exit_code == 0
+        report = json.loads(result.output[result.output.index("{") :])  # the report follows the merge messages
+        assert list(report["totals"]) == ["catalog", "read", "validate", "merge", "write"]
+        assert cprofile_path.stat().st_size > 0
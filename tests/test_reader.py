@@ -46,3 +46,23 @@ class TestNotebookReader:
         reader = NotebookReader()
         notebook = reader.read_notebook("tests/fixtures/empty.ipynb")
         assert len(notebook.cells) == 0
+
+    def test_read_notebooks_preserves_order(self):
+        reader = NotebookReader()
+        paths = ["tests/fixtures/empty.ipynb", "tests/fixtures/valid.ipynb", "tests/fixtures/empty.ipynb"]
+        results = reader.read_notebooks(paths)
+        assert [result.path for result in results] == paths
+        assert [len(result.notebook.cells) for result in results] == [0, 1, 0]
+
+    def test_read_notebooks_reports_errors_per_path(self):
+        reader = NotebookReader()
+        results = reader.read_notebooks(
+            ["tests/fixtures/non_existing_notebook.ipynb", "tests/fixtures/invalid.ipynb", "tests/fixtures/valid.ipynb"]
+        )
+        assert isinstance(results[0].error, FileNotFoundError)
+        assert isinstance(results[1].error, nbformat.reader.NotJSONError)
+        assert results[2].ok
+
+    def test_parse_notebook_matches_nbformat(self):
+        data = Path("tests/fixtures/valid.ipynb").read_bytes()
+        assert NotebookReader.parse_notebook(data) == nbformat.reads(data.decode(), as_version=4)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.main import main
+from mltc.registry import RegistryError, TemplateRegistry, is_registry_url
+from mltc.selector import NotebookSelector
+
+
+def _template(name: str) -> bytes:
+    notebook = nbformat.v4.new_notebook()
+    notebook.cells.append(nbformat.v4.new_markdown_cell(f"# {name}", id=f"{name}-title"))
+    return nbformat.writes(notebook).encode()
+
+
+class _Registry:
+    """A stand-in template registry that serves files from a dict with ETags, over keep-alive connections."""
+
+    def __init__(self) -> None:
+        self.files = {}
+        self.requests = []
+        self.ports = set()
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                registry.requests.append((self.path, self.headers.get("If-None-Match")))
+                registry.ports.add(self.client_address[1])
+                data = registry.files.get(self.path)
+                if data is None:
+                    self.send_response(HTTPStatus.NOT_FOUND)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(HTTPStatus.NOT_MODIFIED)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(HTTPStatus.OK)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/manifest.json"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+
+    def publish(self, templates: dict[str, bytes], *, digests: bool = False) -> None:
+        listing = [
+            {"path": path, **({"sha256": hashlib.sha256(data).hexdigest()} if digests else {})}
+            for path, data in templates.items()
+        ]
+        self.files = {f"/{path}": data for path, data in templates.items()}
+        self.files["/manifest.json"] = json.dumps({"templates": listing}).encode()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestTemplateRegistry:
+    @pytest.fixture()
+    def server(self):
+        server = _Registry()
+        server.publish({f"group/{name}.ipynb": _template(name) for name in ("setup", "modelling", "evaluation")})
+        yield server
+        server.close()
+
+    @pytest.fixture()
+    def registry(self, server, tmp_path):
+        return TemplateRegistry(server.url, cache_dir=str(tmp_path / "registry"), max_workers=2)
+
+    def test_is_registry_url(self):
+        assert is_registry_url("https://example.com/manifest.json")
+        assert not is_registry_url("templates.zip")
+
+    def test_sync_downloads_templates_over_pooled_connections(self, server, registry):
+        directory = registry.sync()
+        assert sorted(path.name for path in (directory / "group").iterdir()) == [
+            "evaluation.ipynb",
+            "modelling.ipynb",
+            "setup.ipynb",
+        ]
+        assert (registry.downloaded, registry.unchanged) == (3, 0)
+        assert len(server.ports) == registry.connections <= registry.max_workers
+        assert len(server.requests) == 1 + 3
+
+    def test_unchanged_templates_are_not_downloaded_again(self, server, registry):
+        registry.sync()
+        server.requests.clear()
+        server.files["/group/setup.ipynb"] = _template("changed")
+        registry.sync()
+        assert (registry.downloaded, registry.unchanged) == (1, 2)
+        assert all(etag is not None for _, etag in server.requests)
+        assert "changed" in (registry.directory / "group" / "setup.ipynb").read_text()
+
+    def test_listed_digests_skip_requests(self, server, registry):
+        server.publish({"group/setup.ipynb": _template("setup")}, digests=True)
+        registry.sync()
+        server.requests.clear()
+        registry.sync()
+        assert [path for path, _ in server.requests] == ["/manifest.json"]
+        assert registry.unchanged == 1
+
+    def test_removed_templates_leave_the_local_copy(self, server, registry):
+        registry.sync()
+        server.publish({"group/setup.ipynb": _template("setup")})
+        directory = registry.sync()
+        removed_templates = 2
+        assert registry.removed == removed_templates
+        assert [path.name for path in (directory / "group").iterdir()] == ["setup.ipynb"]
+
+    @pytest.mark.parametrize("path", ["../escape.ipynb", "/etc/passwd.ipynb", "notes.txt"])
+    def test_invalid_template_paths_are_rejected(self, server, registry, path):
+        server.files["/manifest.json"] = json.dumps({"templates": [path]}).encode()
+        with pytest.raises(RegistryError, match="invalid template path"):
+            registry.sync()
+
+    def test_offline_uses_local_copy(self, server, registry, tmp_path):
+        offline = TemplateRegistry(server.url, cache_dir=str(tmp_path / "registry"), offline=True)
+        with pytest.raises(RegistryError, match="no local copy"):
+            offline.sync()
+        registry.sync()
+        server.close()
+        assert [path.stem for path in NotebookSelector(str(offline.sync())).list_notebooks()] == [
+            "evaluation",
+            "modelling",
+            "setup",
+        ]
+
+    def test_templates_dir_option_accepts_registry_url(self, server, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        args = ["--templates-dir", server.url, "--output-path", str(output)]
+        result = CliRunner().invoke(main, [*args, "--list"])
+        assert result.exit_code == 0, result.stderr
+        assert "3 downloaded" in result.stderr
+        assert "1: " in result.stdout
+
+        server.close()
+        result = CliRunner().invoke(main, [*args, "--offline"], input="3\n")
+        assert result.exit_code == 0, result.stderr
+        assert nbformat.read(output, as_version=4).cells[0].source == "# setup"
+
+        result = CliRunner().invoke(main, args)
+        assert result.exit_code == 1
+        assert "cannot download" in result.stderr
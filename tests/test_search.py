@@ -0,0 +1,114 @@
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc import search
+from mltc.catalog import TemplateCatalog
+from mltc.main import main
+from mltc.search import InvalidQueryError, QueryTerm, TemplateIndex, parse_query
+
+
+def _cells(heading: str, code: str, tags: tuple[str, ...] = ()) -> list:
+    return [
+        nbformat.v4.new_markdown_cell(f"# {heading}\nSome notes on {heading.lower()}."),
+        nbformat.v4.new_code_cell(code, metadata={"tags": list(tags)}),
+    ]
+
+
+def _stems(entries: list) -> list[str]:
+    return [entry.path.stem for entry in entries]
+
+
+class TestTemplateIndex:
+    @pytest.fixture()
+    def templates_dir(self, tmp_path, write_template):
+        templates_dir = tmp_path / "templates"
+        write_template(
+            templates_dir / "modelling" / "binary.ipynb",
+            _cells(
+                "Binary Classification", "from sklearn.linear_model import LogisticRegression", tags=("classification",)
+            ),
+        )
+        write_template(
+            templates_dir / "modelling" / "regression.ipynb",
+            _cells("Regression", "import numpy as np, torch.nn as nn"),
+        )
+        write_template(
+            templates_dir / "preprocessing" / "missing.ipynb",
+            _cells("Handling Missing Data", "import pandas as pd", tags=("classification", "cleaning")),
+        )
+        return templates_dir
+
+    @pytest.fixture()
+    def index(self, templates_dir, tmp_path):
+        return TemplateIndex(TemplateCatalog(str(templates_dir), index_path=str(tmp_path / "catalog.json")))
+
+    def test_fields_are_extracted(self, templates_dir):
+        notebook = nbformat.read(templates_dir / "modelling" / "regression.ipynb", as_version=4)
+        fields = search.extract_fields(notebook, "modelling/regression.ipynb")
+        assert fields["terms"]["import"] == ["numpy", "torch", "torch.nn"]
+        assert fields["terms"]["heading"] == ["regression"]
+        assert fields["terms"]["path"] == ["modelling", "regression"]
+        assert "notes" in fields["terms"]["text"]
+        assert fields["headings"] == [["regression"]]
+
+    def test_parse_query(self):
+        assert parse_query('tag:Classification heading:"Missing Data" -import:torch notes') == [
+            QueryTerm("tag", "classification"),
+            QueryTerm("heading", "missing data"),
+            QueryTerm("import", "torch", negated=True),
+            QueryTerm(None, "notes"),
+        ]
+
+    @pytest.mark.parametrize("query", ["", "owner:me", 'heading:"Missing', "tag:"])
+    def test_invalid_queries_are_rejected(self, query):
+        with pytest.raises(InvalidQueryError):
+            parse_query(query)
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("tag:classification", ["binary", "missing"]),
+            ('tag:classification heading:"Missing Data"', ["missing"]),
+            ('heading:"Data Missing"', []),
+            ('heading:"handling missing data"', ["missing"]),
+            ("import:sklearn", ["binary"]),
+            ("import:torch.nn", ["regression"]),
+            ("-tag:cleaning", ["binary", "regression"]),
+            ("modelling notes", ["binary", "regression"]),
+        ],
+    )
+    def test_search(self, index, query, expected):
+        assert _stems(index.search(query)) == expected
+
+    def test_only_changed_templates_are_read_again(self, index, templates_dir, tmp_path, mocker, write_template):
+        index.refresh()
+        assert index.index_path == templates_dir / ".mltc" / "search-index.json"
+        write_template(templates_dir / "modelling" / "regression.ipynb", _cells("Regression", "import jax"))
+
+        read_bytes = mocker.spy(search.packs, "read_bytes")
+        reloaded = TemplateIndex(TemplateCatalog(str(templates_dir), index_path=str(tmp_path / "catalog.json")))
+        assert _stems(reloaded.search("import:jax")) == ["regression"]
+        assert _stems(reloaded.search("import:torch")) == []
+        assert read_bytes.call_count == 1
+
+    def test_failed_save_leaves_no_temporary_file(self, index, mocker):
+        mocker.patch("pathlib.Path.replace", side_effect=OSError("Disk full"))
+        assert _stems(index.search("import:numpy")) == ["regression"]
+        assert list(index.index_path.parent.iterdir()) == []
+
+    @pytest.mark.usefixtures("templates_dir")
+    def test_query_option(self, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        args = ["--templates-dir", str(tmp_path / "templates"), "--output-path", str(output)]
+        result = CliRunner().invoke(main, [*args, "--list", "--query", "tag:classification"])
+        assert result.exit_code == 0, result.output
+        assert "1: " in result.output
+        assert "2: " not in result.output
+        assert "3: " in result.output
+
+        result = CliRunner().invoke(main, [*args, "--query", "tag:classification"])
+        assert result.exit_code == 0, result.output
+        assert "Selected 2 templates" in result.output
+        merged = nbformat.read(output, as_version=4)
+        assert merged.cells[0].source.startswith("# Binary Classification")
@@ -0,0 +1,146 @@
+import http.client
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import nbformat
+import pytest
+
+from mltc.server import MergeServer, TemplateNotFoundError, TemplateStore
+
+CONCURRENT_REQUESTS = 16
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str) -> None:
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestMergeServer:
+    @pytest.fixture()
+    def templates_dir(self, tmp_path):
+        templates_dir = tmp_path / "templates"
+        (templates_dir / "setup").mkdir(parents=True)
+        for name in ("first", "second"):
+            nb = nbformat.v4.new_notebook()
+            nb.cells.append(nbformat.v4.new_code_cell(f"print('{name}')", id=name))
+            with (templates_dir / "setup" / f"{name}.ipynb").open("w") as f:
+                nbformat.write(nb, f)
+        return templates_dir
+
+    @pytest.fixture()
+    def server(self, templates_dir, tmp_path):
+        """Fixture to run a merge server on a free localhost port for the duration of a test."""
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        server = MergeServer(TemplateStore(str(templates_dir)), output_dir=str(output_dir))
+        url = server.bind(port=0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        yield server, url
+        server.shutdown()
+        thread.join()
+
+    @staticmethod
+    def _request(url: str, body: dict | None = None) -> tuple[int, bytes]:
+        data = None if body is None else json.dumps(body).encode()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:  # noqa: S310
+                return response.status, response.read()
+        except urllib.error.HTTPError as err:
+            return err.code, err.read()
+
+    def test_store_reloads_changed_templates(self, templates_dir):
+        store = TemplateStore(str(templates_dir))
+        first = store.get("setup/first.ipynb")
+        assert store.get("setup/first.ipynb") is first
+        assert (store.loads, store.hits) == (1, 1)
+
+        nb = nbformat.v4.new_notebook()
+        nb.cells.append(nbformat.v4.new_markdown_cell("# Changed", id="changed"))
+        with (templates_dir / "setup" / "first.ipynb").open("w") as f:
+            nbformat.write(nb, f)
+        assert store.get("setup/first.ipynb").cells[0].source == "# Changed"
+
+    def test_store_rejects_paths_outside_directory(self, templates_dir):
+        store = TemplateStore(str(templates_dir / "setup"))
+        with pytest.raises(TemplateNotFoundError):
+            store.get("../setup/first.ipynb/../../first.ipynb")
+        with pytest.raises(TemplateNotFoundError):
+            store.get("missing.ipynb")
+
+    def test_list_and_merge_body(self, server):
+        _, url = server
+        status, body = self._request(f"{url}/templates")
+        assert status == 200  # noqa: PLR2004
+        assert [template["id"] for template in json.loads(body)["templates"]] == [
+            "setup/first.ipynb",
+            "setup/second.ipynb",
+        ]
+
+        status, body = self._request(f"{url}/merge", {"templates": ["setup/second.ipynb", "setup/first.ipynb"]})
+        assert status == 200  # noqa: PLR2004
+        merged = nbformat.reads(body.decode(), as_version=4)
+        assert [cell.source for cell in merged.cells] == ["print('second')", "print('first')"]
+
+    def test_merge_to_output_and_errors(self, server, tmp_path):
+        merge_server, url = server
+        status, body = self._request(f"{url}/merge", {"templates": ["setup/first.ipynb"], "output": "a/b.ipynb"})
+        assert status == 200  # noqa: PLR2004
+        assert json.loads(body)["output"] == str(tmp_path / "out" / "a" / "b.ipynb")
+
+        assert self._request(f"{url}/merge", {"templates": ["setup/first.ipynb"], "output": "../x.ipynb"})[0] == 403  # noqa: PLR2004
+        assert self._request(f"{url}/merge", {"templates": ["missing.ipynb"]})[0] == 404  # noqa: PLR2004
+        assert self._request(f"{url}/merge", {"templates": "setup/first.ipynb"})[0] == 400  # noqa: PLR2004
+        stats = merge_server.snapshot()
+        assert (stats["requests"], stats["errors"], stats["merges"]) == (4, 3, 1)
+
+    def test_concurrent_requests(self, server):
+        merge_server, url = server
+        body = {"templates": ["setup/first.ipynb", "setup/second.ipynb"]}
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(lambda _: self._request(f"{url}/merge", body)[0], range(CONCURRENT_REQUESTS)))
+        assert statuses == [200] * CONCURRENT_REQUESTS
+        stats = json.loads(self._request(f"{url}/stats")[1])
+        assert stats["merges"] == CONCURRENT_REQUESTS
+        assert stats["templates"]["loads"] == 2  # noqa: PLR2004
+        assert stats["latency_seconds"]["max"] > 0
+
+    def test_unix_socket(self, templates_dir, tmp_path):
+        server = MergeServer(TemplateStore(str(templates_dir)))
+        socket_path = str(tmp_path / "mltc.sock")
+        server.bind(socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            connection = _UnixHTTPConnection(socket_path)
+            connection.request("POST", "/merge", body=json.dumps({"templates": ["setup/first.ipynb"]}))
+            response = connection.getresponse()
+            assert response.status == 200  # noqa: PLR2004
+            assert len(nbformat.reads(response.read().decode(), as_version=4).cells) == 1
+            connection.close()
+        finally:
+            server.shutdown()
+            thread.join()
+        assert not (tmp_path / "mltc.sock").exists()
+
+    def test_unix_socket_replaces_only_stale_sockets(self, templates_dir, tmp_path):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(tmp_path / "stale.sock"))
+        stale.close()
+        server = MergeServer(TemplateStore(str(templates_dir)))
+        server.bind(socket_path=str(tmp_path / "stale.sock"))
+        server.httpd.server_close()
+        assert (tmp_path / "stale.sock").is_socket()
+        (tmp_path / "notes.txt").write_text("keep me")
+        with pytest.raises(FileExistsError, match="is not a socket"):
+            MergeServer(TemplateStore(str(templates_dir))).bind(socket_path=str(tmp_path / "notes.txt"))
+        assert (tmp_path / "notes.txt").read_text() == "keep me"
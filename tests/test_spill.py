@@ -0,0 +1,82 @@
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.main import main
+from mltc.merger import NotebookMerger
+from mltc.reader import NotebookReader
+from mltc.spill import SpilledOutput, SpillStore
+from mltc.validator import NotebookValidator
+from mltc.writer import NotebookWriter
+
+
+def _cells(name: str, image_size: int) -> list:
+    outputs = [
+        nbformat.v4.new_output("stream", name="stdout", text="done\n"),
+        nbformat.v4.new_output("display_data", data={"image/png": "A" * image_size}),
+    ]
+    return [
+        nbformat.v4.new_markdown_cell(f"# {name}", id=f"{name}-title"),
+        nbformat.v4.new_code_cell("plot()", id=f"{name}-plot", outputs=outputs),
+    ]
+
+
+class TestSpillStore:
+    @pytest.fixture()
+    def paths(self, tmp_path, write_template):
+        paths = [tmp_path / "templates" / name / f"{name}.ipynb" for name in ("setup", "modelling")]
+        for path in paths:
+            write_template(path, _cells(path.stem, 4096))
+        return paths
+
+    def test_spills_large_outputs_and_restores_them(self, paths):
+        notebook = NotebookReader.read_notebook(str(paths[0]), compact=True)
+        original = notebook.cells[1].to_dict()
+        with SpillStore(threshold=1024) as spill:
+            cell = spill.spill_cell(notebook.cells[1])
+            stream, image = cell.to_dict()["outputs"]
+            assert isinstance(image, SpilledOutput)
+            assert not isinstance(stream, SpilledOutput)
+            assert spill.spilled_outputs == 1
+            assert list(spill.restore_cells([cell])) == [original]
+        assert not isinstance(original["outputs"][1], SpilledOutput)
+
+    def test_budget_spills_small_outputs(self, paths):
+        notebook = NotebookReader.read_notebook(str(paths[0]), compact=True)
+        with SpillStore(threshold=1024 * 1024, budget=10) as spill:
+            spill.spill_cell(notebook.cells[1])
+            assert spill.spilled_outputs == len(notebook.cells[1].to_dict()["outputs"])
+            assert spill.kept_bytes == 0
+
+    def test_cells_without_outputs_are_kept(self, paths):
+        notebook = NotebookReader.read_notebook(str(paths[0]), compact=True)
+        with SpillStore(threshold=0) as spill:
+            assert spill.spill_cell(notebook.cells[0]) is notebook.cells[0]
+
+    def test_merge_paths_matches_regular_merge(self, paths, tmp_path):
+        validator = NotebookValidator()
+        notebooks = [NotebookReader.read_notebook(str(path)) for path in paths]
+        regular = NotebookMerger(validator).merge_notebooks(notebooks, sources=[str(path) for path in paths])
+        NotebookWriter.write_notebook(regular, str(tmp_path / "regular.ipynb"))
+
+        with SpillStore(threshold=1024) as spill:
+            merged = NotebookMerger(validator).merge_paths([str(p) for p in paths], spill=spill)
+            cells = spill.restore_cells(merged.cells)
+            NotebookWriter.write_notebook(merged, str(tmp_path / "spilled.ipynb"), cells=cells)
+            assert spill.spilled_outputs == len(paths)
+        assert (tmp_path / "spilled.ipynb").read_bytes() == (tmp_path / "regular.ipynb").read_bytes()
+
+    def test_merge_paths_reports_missing_input(self, paths, capsys):
+        merged = NotebookMerger(NotebookValidator()).merge_paths([str(paths[0]), str(paths[0].with_name("gone.ipynb"))])
+        assert [cell.to_dict()["id"] for cell in merged.cells] == ["setup-title", "setup-plot"]
+        assert "File not found" in capsys.readouterr().out
+
+    @pytest.mark.usefixtures("paths")
+    def test_memory_budget_option(self, tmp_path):
+        output = tmp_path / "merged.ipynb"
+        args = ["--templates-dir", str(tmp_path / "templates"), "--output-path", str(output)]
+        result = CliRunner().invoke(main, [*args, "--memory-budget", "0", "--spill-threshold", "1024"], input="1 2\n")
+        assert result.exit_code == 0, result.output
+        assert "Spilled 4 outputs" in result.output
+        merged = nbformat.read(output, as_version=4)
+        assert merged.cells[1].outputs[1].data["image/png"] == "A" * 4096
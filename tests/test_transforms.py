@@ -0,0 +1,152 @@
+import copy
+import pickle
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from mltc.main import main
+from mltc.merger import NotebookMerger
+from mltc.transforms import CellTransform, TransformPipeline, UnknownTransformError, register_transform
+from mltc.validator import NotebookValidator
+
+MAX_OUTPUT_BYTES = 200
+
+
+class TestTransformPipeline:
+    @pytest.fixture()
+    def notebook(self):
+        notebook = nbformat.v4.new_notebook()
+        image = nbformat.v4.new_output("display_data", data={"image/png": "A" * 1000, "text/plain": "<Figure>"})
+        result = nbformat.v4.new_output("execute_result", data={"text/plain": "2"}, execution_count=3)
+        notebook.cells.append(
+            nbformat.v4.new_code_cell("plot()", id="plot", execution_count=3, outputs=[image, result])
+        )
+        notebook.cells.append(nbformat.v4.new_markdown_cell("# Notes", id="notes", metadata={"tags": ["private"]}))
+        notebook.cells.append(nbformat.v4.new_raw_cell("raw", id="raw"))
+        return notebook
+
+    def test_built_in_transforms_in_one_pass(self, notebook):
+        original = copy.deepcopy(notebook)
+        pipeline = TransformPipeline(
+            [
+                ("drop-tags", {"tags": ["private"]}),
+                ("drop-cell-types", {"cell_types": ["raw"]}),
+                ("clear-execution-counts", {}),
+                ("cap-outputs", {"max_bytes": MAX_OUTPUT_BYTES}),
+            ]
+        )
+        cells = list(pipeline(notebook.cells))
+        assert [cell.id for cell in cells] == ["plot"]
+        assert cells[0].execution_count is None
+        assert cells[0].outputs[0].output_type == "stream"
+        assert "removed by mltc" in cells[0].outputs[0].text
+        assert cells[0].outputs[1].execution_count is None
+        assert notebook == original
+
+    def test_strip_outputs(self, notebook):
+        cells = list(TransformPipeline([("strip-outputs", {})])(notebook.cells))
+        assert cells[0].outputs == []
+        assert len(notebook.cells[0].outputs) == 2  # noqa: PLR2004
+
+    def test_register_custom_transform_and_pickle(self, notebook):
+        @register_transform("upper-markdown")
+        def upper_markdown() -> CellTransform:
+            def transform(cell: nbformat.NotebookNode) -> nbformat.NotebookNode:
+                if cell.cell_type == "markdown":
+                    cell["source"] = cell.source.upper()
+                return cell
+
+            return transform
+
+        pipeline = pickle.loads(pickle.dumps(TransformPipeline([("upper-markdown", {})])))  # noqa: S301
+        assert [cell.source for cell in pipeline(notebook.cells)][1] == "# NOTES"
+
+    def test_unknown_transform(self):
+        with pytest.raises(UnknownTransformError, match="strip-outputs"):
+            TransformPipeline([("no-such-transform", {})])
+
+    def test_merger_applies_transforms(self, notebook):
+        merger = NotebookMerger(NotebookValidator(), transforms=TransformPipeline([("strip-outputs", {})]))
+        merged = merger.merge_notebooks([notebook, notebook])
+        assert len(merged.cells) == 2 * len(notebook.cells)
+        assert all(not cell.get("outputs") for cell in merged.cells)
+
+    def test_cli_transforms_change_fingerprint(self, notebook, tmp_path):
+        (tmp_path / "templates" / "setup").mkdir(parents=True)
+        with (tmp_path / "templates" / "setup" / "setup.ipynb").open("w") as f:
+            nbformat.write(notebook, f)
+        args = ["--templates-dir", str(tmp_path / "templates"), "--output-path", str(tmp_path / "out.ipynb")]
+
+        CliRunner().invoke(main, args, input="1\n")
+        result = CliRunner().invoke(main, [*args, "--strip-outputs", "--drop-cell-type", "raw"], input="1\n")
+        assert "Merged notebook saved" in result.output
+        with (tmp_path / "out.ipynb").open() as f:
+            merged = nbformat.read(f, as_version=4)
+        assert [cell.id for cell in merged.cells] == ["plot", "notes"]
+        assert merged.cells[0].outputs == []
+
+        result = CliRunner().invoke(main, [*args, "--strip-outputs", "--drop-cell-type", "raw"], input="1\n")
+        assert "is up to date" in result.output
+
+
+class TestCellDeduplicator:
+    @pytest.fixture()
+    def notebooks(self):
+        logo = {"image/png": "iVBORw0KGgo" * 50}
+        setup = nbformat.v4.new_notebook()
+        setup.cells.append(nbformat.v4.new_code_cell("import pandas as pd", id="setup-imports"))
+        setup.cells.append(
+            nbformat.v4.new_markdown_cell(
+                "![a](attachment:logo.png) ![b](attachment:logo-copy.png)",
+                id="setup-logo",
+                attachments={"logo.png": logo, "logo-copy.png": dict(logo)},
+            )
+        )
+        modelling = nbformat.v4.new_notebook()
+        modelling.cells.append(nbformat.v4.new_code_cell("import pandas as pd", id="modelling-imports"))
+        modelling.cells.append(nbformat.v4.new_markdown_cell("## Notes", id="modelling-notes"))
+        modelling.cells.append(nbformat.v4.new_markdown_cell("## Notes", id="modelling-notes-again"))
+        return [setup, modelling]
+
+    def test_merge_drops_duplicates_and_reports_savings(self, notebooks, mocker):
+        echo = mocker.patch("mltc.merger.click.echo")
+        original = copy.deepcopy(notebooks)
+        merger = NotebookMerger(NotebookValidator(), transforms=TransformPipeline([("dedup", {})]))
+        merged = merger.merge_notebooks(notebooks)
+
+        assert [cell.id for cell in merged.cells] == ["setup-imports", "setup-logo", "modelling-notes"]
+        assert list(merged.cells[1].attachments) == ["logo.png"]
+        assert merged.cells[1].source == "![a](attachment:logo.png) ![b](attachment:logo.png)"
+        summary = echo.call_args.args[0]
+        assert summary.startswith("Deduplication removed 2 cells and 1 attachments, saving ")
+        assert notebooks == original
+
+    def test_each_merge_starts_fresh(self, notebooks, mocker):
+        mocker.patch("mltc.merger.click.echo")
+        merger = NotebookMerger(NotebookValidator(), transforms=TransformPipeline([("dedup", {})]))
+        first = merger.merge_notebooks(notebooks)
+        second = merger.merge_notebooks(notebooks)
+        assert [cell.id for cell in first.cells] == [cell.id for cell in second.cells]
+
+    def test_restricted_to_cell_types(self, notebooks):
+        pipeline = TransformPipeline([("dedup", {"cell_types": ["markdown"]})])
+        cells = [cell for notebook in notebooks for cell in pipeline(notebook.cells)]
+        assert [cell.id for cell in cells] == [
+            "setup-imports",
+            "setup-logo",
+            "modelling-imports",
+            "modelling-notes",
+        ]
+
+    def test_restricted_to_tags(self, notebooks):
+        notebooks[1].cells[0].metadata["tags"] = ["boilerplate"]
+        notebooks[0].cells[0].metadata["tags"] = ["boilerplate"]
+        pipeline = TransformPipeline([("dedup", {"tags": ["boilerplate"]})])
+        cells = [cell for notebook in notebooks for cell in pipeline(notebook.cells)]
+        assert [cell.id for cell in cells] == [
+            "setup-imports",
+            "setup-logo",
+            "modelling-notes",
+            "modelling-notes-again",
+        ]
@@ -1,7 +1,9 @@
 import nbformat
 import pytest
 
-from mltc.validator import NotebookValidationError, NotebookValidator
+from mltc.cache import ValidationCache
+from mltc.engine import CompiledSchemaEngine
+from mltc.validator import NotebookValidationError, NotebookValidator, VerdictMemo
 
 
 class TestNotebookValidator:
@@ -40,3 +42,71 @@ class TestNotebookValidator:
     def test_is_valid_empty_notebook(self, validator):
         empty_notebook = nbformat.v4.new_notebook()
         assert validator.is_valid(empty_notebook)
+
+    def test_is_valid_uses_cached_verdict(self, tmp_path, mocker):
+        validator = NotebookValidator(cache=ValidationCache(str(tmp_path / "validation.sqlite3")))
+        notebook = nbformat.v4.new_notebook()
+        validate = mocker.spy(nbformat, "validate")
+        assert validator.is_valid(notebook)
+        assert validator.is_valid(notebook)
+        assert validate.call_count == 1
+
+    def test_is_valid_caches_validation_error_message(self, tmp_path, mocker):
+        validator = NotebookValidator(cache=ValidationCache(str(tmp_path / "validation.sqlite3")))
+        invalid_notebook = nbformat.v4.new_notebook()
+        invalid_notebook.cells.append(
+            nbformat.from_dict({"cell_type": "invalid", "id": "a", "metadata": {}, "source": ""})
+        )
+        with pytest.raises(NotebookValidationError) as first:
+            validator.is_valid(invalid_notebook)
+        validate = mocker.spy(nbformat, "validate")
+        with pytest.raises(NotebookValidationError) as second:
+            validator.is_valid(invalid_notebook)
+        assert validate.call_count == 0
+        assert second.value.message == first.value.message
+
+    def test_cached_verdicts_are_kept_per_engine_and_name_the_source(self, tmp_path):
+        cache = ValidationCache(str(tmp_path / "validation.sqlite3"))
+        invalid_notebook = nbformat.v4.new_notebook()
+        invalid_notebook.cells.append(
+            nbformat.from_dict({"cell_type": "invalid", "id": "a", "metadata": {}, "source": ""})
+        )
+        compiled = NotebookValidator(cache=cache, engine=CompiledSchemaEngine())
+        with pytest.raises(NotebookValidationError, match="Cell 0 of first.ipynb: "):
+            compiled.is_valid(invalid_notebook, "first.ipynb")
+        with pytest.raises(NotebookValidationError, match="Cell 0 of second.ipynb: ") as cached:
+            compiled.is_valid(invalid_notebook, "second.ipynb")
+        assert "first.ipynb" not in cached.value.message
+        with pytest.raises(NotebookValidationError) as default:
+            NotebookValidator(cache=cache).is_valid(invalid_notebook, "first.ipynb")
+        assert default.value.message == "The notebook does not conform to the Jupyter notebook format schema."
+
+
+class TestVerdictMemo:
+    def test_validates_each_notebook_once(self, mocker):
+        validator = NotebookValidator()
+        spy = mocker.spy(validator, "is_valid")
+        memo = VerdictMemo(validator)
+        valid = nbformat.v4.new_notebook()
+        invalid = nbformat.NotebookNode({"cells": "not a list"})
+        for _ in range(2):
+            assert memo.is_valid(valid)
+            with pytest.raises(NotebookValidationError):
+                memo.is_valid(invalid)
+        assert spy.call_count == 2  # noqa: PLR2004
+
+    def test_recorded_and_forgotten_verdicts(self, mocker):
+        validator = NotebookValidator()
+        spy = mocker.spy(validator, "is_valid")
+        memo = VerdictMemo(validator)
+        notebook = nbformat.NotebookNode({"cells": "not a list"})
+        memo.record(notebook)
+        assert memo.is_valid(notebook)
+        assert memo.verdict(notebook) == (True, None)
+        memo.forget(notebook)
+        assert memo.verdict(notebook) is None
+        with pytest.raises(NotebookValidationError):
+            memo.is_valid(notebook)
+        memo.retain([])
+        assert memo.verdict(notebook) is None
+        assert spy.call_count == 1
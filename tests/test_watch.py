@@ -0,0 +1,110 @@
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from mltc import fingerprint, main
+from mltc.main import _watch
+from mltc.validator import NotebookValidator
+from mltc.watch import TemplateWatcher
+
+
+def _write_notebook(path: Path, text: str) -> None:
+    notebook = nbformat.v4.new_notebook(cells=[nbformat.v4.new_markdown_cell(text, id=path.name.split(".")[0])])
+    with path.open("w") as f:
+        nbformat.write(notebook, f)
+
+
+class _ScriptedWatcher:
+    """Stands in for a TemplateWatcher: each wait applies the next edit and reports the edited path."""
+
+    backend = "scripted"
+
+    def __init__(self, edits: list[tuple[Path, str]]) -> None:
+        self.edits = list(edits)
+
+    def __enter__(self) -> "_ScriptedWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def wait(self) -> list[Path]:
+        path, text = self.edits.pop(0)
+        _write_notebook(path, text)
+        return [path]
+
+
+class TestTemplateWatcher:
+    @pytest.fixture()
+    def templates(self, tmp_path):
+        paths = [tmp_path / "setup.ipynb", tmp_path / "modelling.ipynb"]
+        for path in paths:
+            _write_notebook(path, path.stem)
+        return paths
+
+    @pytest.mark.parametrize("use_inotify", [False, True])
+    def test_detects_atomic_replace(self, templates, use_inotify):
+        with TemplateWatcher(templates, debounce=0.05, poll_interval=0.01, use_inotify=use_inotify) as watcher:
+            replacement = templates[1].with_name("modelling.ipynb.tmp")
+            _write_notebook(replacement, "edited")
+            replacement.replace(templates[1])
+            assert watcher.wait(timeout=5) == [templates[1]]
+
+    def test_debounces_burst(self, templates):
+        with TemplateWatcher(templates, debounce=0.3, poll_interval=0.01, use_inotify=False) as watcher:
+
+            def burst() -> None:
+                for text in ("one", "two", "three"):
+                    _write_notebook(templates[0], text * 10)
+                    time.sleep(0.05)
+                _write_notebook(templates[1], "edited")
+
+            thread = threading.Thread(target=burst)
+            thread.start()
+            assert watcher.wait(timeout=5) == templates
+            thread.join()
+            assert watcher.wait(timeout=0.1) == []
+
+    def test_pack_changes_report_members(self, tmp_path):
+        pack = tmp_path / "templates.zip"
+        with zipfile.ZipFile(pack, "w") as archive:
+            archive.writestr("setup/setup.ipynb", "{}")
+        member = pack / "setup" / "setup.ipynb"
+        with TemplateWatcher([member], debounce=0.05, poll_interval=0.01, use_inotify=False) as watcher:
+            with zipfile.ZipFile(pack, "a") as archive:
+                archive.writestr("modelling/train.ipynb", "{}")
+            assert watcher.wait(timeout=5) == [member]
+
+    def test_rebuilds_only_changed_notebooks(self, templates, tmp_path, mocker):
+        output_path = tmp_path / "merged.ipynb"
+        echo = mocker.patch("click.echo")
+        validator = NotebookValidator()
+        spy = mocker.spy(validator, "is_valid")
+        watcher = _ScriptedWatcher([(templates[1], "edited")])
+
+        _watch(templates, output_path, validator, watcher=watcher, max_rebuilds=1)
+
+        merged = nbformat.read(output_path, as_version=4)
+        assert [cell.source for cell in merged.cells] == ["setup", "edited"]
+        assert [call.kwargs.get("source") for call in spy.call_args_list] == [*map(str, templates), str(templates[1])]
+        messages = [call.args[0] for call in echo.call_args_list if call.args]
+        assert any(message.startswith("Rebuilt in ") and "(1 of 2 notebooks read)" in message for message in messages)
+
+    def test_rebuilds_hash_changed_notebooks_under_build_lock(self, templates, tmp_path, mocker):
+        output_path = tmp_path / "merged.ipynb"
+        echo = mocker.patch("click.echo")
+        sha256 = mocker.spy(fingerprint, "_sha256")
+        build_lock = mocker.spy(main, "build_lock")
+        watcher = _ScriptedWatcher([(templates[1], "edited"), (templates[1], "edited")])
+
+        _watch(templates, output_path, NotebookValidator(), watcher=watcher, max_rebuilds=2)
+
+        assert [call.args[0] for call in sha256.call_args_list] == [*map(str, templates), *[str(templates[1])] * 2]
+        assert [call.args[0] for call in build_lock.call_args_list] == [output_path] * 3
+        messages = [call.args[0] for call in echo.call_args_list if call.args]
+        assert messages[-1] == f"Merged notebook at {output_path} is up to date."
+        assert [cell.source for cell in nbformat.read(output_path, as_version=4).cells] == ["setup", "edited"]
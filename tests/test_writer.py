@@ -1,3 +1,5 @@
+import os
+
 import nbformat
 import pytest
 
@@ -27,3 +29,41 @@ class TestNotebookWriter:
         mocker.patch("nbformat.write", side_effect=OSError("Error writing to file"))
         with pytest.raises(OSError, match="Error writing to file"):
             NotebookWriter.write_notebook(mock_notebook, invalid_path)
+
+    def test_stream_notebook_matches_nbformat(self, valid_path):
+        notebook = nbformat.v4.new_notebook(metadata={"kernelspec": {"name": "python3", "display_name": "Python 3"}})
+        notebook.cells.append(nbformat.v4.new_markdown_cell("# Title\n\nText"))
+        data = {
+            "text/plain": "a\nb",
+            "image/png": "iVBORw0KGgo=",
+            "image/svg+xml": "<svg>\n</svg>",
+            "application/javascript": "x;\ny;",
+            "application/json": {"a": "b\nc"},
+        }
+        output = nbformat.v4.new_output("display_data", data=data)
+        notebook.cells.append(nbformat.v4.new_code_cell("x = 1\nx", outputs=[output]))
+        NotebookWriter.write_notebook(notebook, str(valid_path), stream=True)
+        assert valid_path.read_text() == nbformat.writes(notebook) + "\n"
+        assert list(valid_path.parent.iterdir()) == [valid_path]
+
+    def test_stream_notebook_failure_keeps_existing_file(self, mocker, mock_notebook, valid_path):
+        mock_notebook.cells.append(nbformat.v4.new_code_cell("print('Hello')"))
+        valid_path.write_text("original")
+        mocker.patch("mltc.writer._prepare_cell", side_effect=OSError("Disk full"))
+        with pytest.raises(OSError, match="Disk full"):
+            NotebookWriter.write_notebook(mock_notebook, str(valid_path), stream=True)
+        assert valid_path.read_text() == "original"
+        assert list(valid_path.parent.iterdir()) == [valid_path]
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_written_files_follow_umask_or_keep_their_mode(self, mock_notebook, valid_path, stream):
+        new_file_mode, kept_mode = 0o640, 0o604
+        previous = os.umask(0o027)
+        try:
+            NotebookWriter.write_notebook(mock_notebook, str(valid_path), stream=stream)
+            assert valid_path.stat().st_mode & 0o777 == new_file_mode
+            valid_path.chmod(kept_mode)
+            NotebookWriter.write_notebook(mock_notebook, str(valid_path), stream=stream)
+            assert valid_path.stat().st_mode & 0o777 == kept_mode
+        finally:
+            os.umask(previous)